@@ -0,0 +1,115 @@
+"""
+Adaptive (AIMD) vs fixed per-domain concurrency against local stub servers.
+
+Two stub domains: a "small store" that answers 429 whenever more than
+--store-capacity requests are in flight, and a "CDN" that serves anything
+with a fixed latency. Fetcher runs the same URL mix with fixed
+per-domain limits and with the AIMD controller; prints wall time,
+429s seen and, for AIMD, the limit each domain settled at.
+
+Usage (from the project root):
+    python benchmarks/adaptive_concurrency.py --urls 400
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch.fetcher import Fetcher  # noqa: E402
+
+
+STUB_HTML = b"<html><head><title>Stub Product</title></head><body>ok</body></html>"
+
+
+def make_handler(latency: float, capacity: int, counters: dict):
+    lock = threading.Lock()
+    state = {"in_flight": 0}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with lock:
+                state["in_flight"] += 1
+                overloaded = capacity and state["in_flight"] > capacity
+            try:
+                time.sleep(latency)
+                status = 429 if overloaded else 200
+                body = b"slow down" if overloaded else STUB_HTML
+                if overloaded:
+                    counters["429"] += 1
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_server(host: str, latency: float, capacity: int, counters: dict) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, 0), make_handler(latency, capacity, counters))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(urls, per_domain: int, adaptive: bool, counters: dict):
+    counters["429"] = 0
+    fetcher = Fetcher(
+        max_retries=5,
+        base_delay=0.05,
+        max_delay=0.5,
+        concurrency=32,
+        per_domain_concurrency=per_domain,
+        domain_rate=0,
+        breaker_min_requests=10 ** 9,
+        adaptive_concurrency=adaptive,
+        max_per_domain_concurrency=16,
+    )
+    started = time.perf_counter()
+    pages = fetcher.fetch_urls(urls)
+    elapsed = time.perf_counter() - started
+    stats = fetcher.get_stats()
+    fetcher.shutdown()
+    ok = sum(1 for p in pages if p["status"] == 200)
+    return elapsed, ok, counters["429"], stats.get("concurrency", {})
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--urls", type=int, default=400)
+    arg_parser.add_argument("--latency", type=float, default=0.05)
+    arg_parser.add_argument("--store-capacity", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    counters = {"429": 0}
+    store = start_server("127.0.0.1", args.latency, args.store_capacity, counters)
+    cdn = start_server("127.0.0.2", args.latency, 0, counters)
+    hosts = [f"{s.server_address[0]}:{s.server_address[1]}" for s in (store, cdn)]
+    urls = [f"http://{hosts[i % 2]}/products/item-{i}" for i in range(args.urls)]
+
+    print(f"{'mode':<16}{'seconds':>9}{'ok':>6}{'429s':>7}")
+    for name, per_domain, adaptive in (("fixed 2", 2, False), ("fixed 8", 8, False), ("aimd (start 2)", 2, True)):
+        elapsed, ok, throttled, limits = run(urls, per_domain, adaptive, counters)
+        print(f"{name:<16}{elapsed:>9.2f}{ok:>6}{throttled:>7}")
+        for domain, d in sorted(limits.items()):
+            print(f"  {domain:<22} limit={d['limit']} max={d['max_limit']} cuts={d['cuts']}")
+
+    store.shutdown()
+    cdn.shutdown()
+
+
+if __name__ == "__main__":
+    main()
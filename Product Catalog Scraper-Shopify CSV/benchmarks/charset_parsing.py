@@ -0,0 +1,120 @@
+"""
+CPU time per page: decoded-text path vs bytes-native path.
+
+Builds a large synthetic product page (UTF-8, non-ASCII text, JSON-LD,
+<meta charset> in the head) and runs it through both paths for three
+Content-Type variants:
+- before: requests' response.text (statistical detection when no
+  charset is known) → ParserRouter.parse(str)
+- after: sniff_charset on headers / BOM / first 4 KB → ParserRouter.parse(bytes)
+Prints CPU ms per page for each stage and whether the parsed title
+came out intact. --no-meta drops the <meta charset> tag.
+
+Usage (from the project root):
+    python benchmarks/charset_parsing.py --pages 5 --size-kb 1500
+    python benchmarks/charset_parsing.py --pages 5 --size-kb 1500 --no-meta
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch.charset import sniff_charset  # noqa: E402
+from src.parse.parser_router import ParserRouter  # noqa: E402
+
+
+TITLE = "Motorola g06 Power — पैंटोन टेंड्रिल 64 GB"
+
+CONTENT_TYPES = (
+    ("no Content-Type", None),
+    ("text/html, no charset", "text/html"),
+    ("text/html; charset=utf-8", "text/html; charset=utf-8"),
+)
+
+
+def build_page(size_kb: int, meta: bool = True) -> bytes:
+    product = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": TITLE,
+        "offers": {"@type": "Offer", "price": "7499", "priceCurrency": "INR"},
+    }
+    head = (
+        "<!DOCTYPE html><html><head>"
+        + ("<meta charset=\"utf-8\">" if meta else "")
+        + f"<title>{TITLE}</title>"
+        f"<script type=\"application/ld+json\">{json.dumps(product, ensure_ascii=False)}</script>"
+        "</head><body>"
+    )
+    row = (
+        "<div class=\"review\"><span class=\"author\">ग्राहक</span>"
+        "<p>बैटरी लाइफ शानदार है, कीमत ₹7,499 में बढ़िया फ़ोन। Great value.</p></div>\n"
+    )
+    body = [head]
+    size = len(head.encode("utf-8"))
+    while size < size_kb * 1024:
+        body.append(row)
+        size += len(row.encode("utf-8"))
+    body.append("</body></html>")
+    return "".join(body).encode("utf-8")
+
+
+def make_response(raw: bytes, content_type) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    if content_type:
+        response.headers["Content-Type"] = content_type
+    response.raw = io.BytesIO(raw)
+    response._content = raw
+    response._content_consumed = True
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def cpu_ms(fn, pages: int):
+    started = time.process_time()
+    for _ in range(pages):
+        result = fn()
+    return (time.process_time() - started) * 1000 / pages, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=5)
+    arg_parser.add_argument("--size-kb", type=int, default=1500)
+    arg_parser.add_argument("--no-meta", action="store_true", help="omit <meta charset> from the page")
+    args = arg_parser.parse_args()
+
+    raw = build_page(args.size_kb, meta=not args.no_meta)
+    router = ParserRouter()
+    url = "https://shop.example.com/products/moto-g06"
+    print(f"page: {len(raw) / 1024:.0f} KB, meta charset: {not args.no_meta}, {args.pages} pages per row\n")
+    print(f"{'Content-Type':<28}{'path':<8}{'decode ms':>11}{'parse ms':>10}{'total':>9}  title ok")
+
+    for label, content_type in CONTENT_TYPES:
+        # before: str from requests, then BeautifulSoup over the str
+        decode_ms, text = cpu_ms(lambda: make_response(raw, content_type).text, args.pages)
+        parse_ms, product = cpu_ms(lambda: router.parse(text, url), args.pages)
+        print(
+            f"{label:<28}{'before':<8}{decode_ms:>11.1f}{parse_ms:>10.1f}"
+            f"{decode_ms + parse_ms:>9.1f}  {product['title'] == TITLE}"
+        )
+
+        # after: sniffed charset, bytes straight to the parser
+        decode_ms, encoding = cpu_ms(lambda: sniff_charset(content_type or "", raw), args.pages)
+        parse_ms, product = cpu_ms(lambda: router.parse(raw, url, encoding), args.pages)
+        print(
+            f"{'':<28}{'after':<8}{decode_ms:>11.1f}{parse_ms:>10.1f}"
+            f"{decode_ms + parse_ms:>9.1f}  {product['title'] == TITLE}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Fetch throughput benchmark against a local stub server.
+
+Spins up a threaded HTTP server that answers every request with a small
+product page after a fixed latency, then runs Fetcher over the same URL
+list at increasing concurrency and prints URLs/sec for each level.
+
+Usage (from the project root):
+    python benchmarks/fetch_concurrency.py --urls 200 --latency 0.05
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch.fetcher import Fetcher  # noqa: E402
+
+
+STUB_HTML = (
+    "<html><head><title>Stub Product</title>"
+    "<script type=\"application/ld+json\">"
+    "{\"@type\": \"Product\", \"name\": \"Stub Product\"}"
+    "</script></head><body>ok</body></html>"
+).encode("utf-8")
+
+
+def make_handler(latency: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(STUB_HTML)))
+            self.end_headers()
+            self.wfile.write(STUB_HTML)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(host: str, latency: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, 0), make_handler(latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_urls(servers, count: int):
+    hosts = [f"{s.server_address[0]}:{s.server_address[1]}" for s in servers]
+    return [f"http://{hosts[i % len(hosts)]}/products/item-{i}" for i in range(count)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--urls", type=int, default=200)
+    arg_parser.add_argument("--latency", type=float, default=0.05)
+    arg_parser.add_argument("--domains", type=int, default=4)
+    arg_parser.add_argument("--levels", default="1,2,4,8,16,32")
+    args = arg_parser.parse_args()
+
+    # every 127.x address is loopback on Linux, so each server acts as its own domain
+    servers = [
+        start_stub_server(f"127.0.0.{i + 1}", args.latency)
+        for i in range(args.domains)
+    ]
+    urls = build_urls(servers, args.urls)
+
+    print(f"{args.urls} URLs, {args.domains} domains, {args.latency * 1000:.0f} ms stub latency")
+    print(f"{'concurrency':>12} {'seconds':>10} {'urls/sec':>10} {'ok':>6}")
+
+    for level in [int(x) for x in args.levels.split(",")]:
+        fetcher = Fetcher(
+            max_retries=0,
+            concurrency=level,
+            per_domain_concurrency=level,
+            domain_rate=0,
+        )
+        started = time.perf_counter()
+        raw_pages = fetcher.fetch_urls(urls)
+        elapsed = time.perf_counter() - started
+        fetcher.shutdown()
+
+        ok = len([p for p in raw_pages if p["status"] == 200])
+        print(f"{level:>12} {elapsed:>10.2f} {len(urls) / elapsed:>10.1f} {ok:>6}")
+
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
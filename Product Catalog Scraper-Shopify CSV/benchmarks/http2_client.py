@@ -0,0 +1,175 @@
+"""
+HTTP/1.1 (requests) vs HTTP/2 (httpx) fetch benchmark against local servers.
+
+Starts an HTTP/1.1 stub (ThreadingHTTPServer) and a cleartext HTTP/2 stub
+(h2, prior knowledge) that both answer every request with a small product
+page after a fixed latency, and counts the TCP connections each accepts.
+Fetcher then runs the same URL list through both backends at the same
+concurrency and prints requests/sec and connections used.
+
+Needs the optional backend: pip install "httpx[http2]"
+
+Usage (from the project root):
+    python benchmarks/http2_client.py --urls 500 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch.fetcher import Fetcher  # noqa: E402
+
+
+STUB_HTML = (
+    "<html><head><title>Stub Product</title>"
+    "<script type=\"application/ld+json\">"
+    "{\"@type\": \"Product\", \"name\": \"Stub Product\"}"
+    "</script></head><body>ok</body></html>"
+).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# HTTP/1.1 stub
+# ---------------------------------------------------------------------------
+
+def start_http1_server(latency: float, counters: dict) -> ThreadingHTTPServer:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(STUB_HTML)))
+            self.end_headers()
+            self.wfile.write(STUB_HTML)
+
+        def log_message(self, format, *args):
+            pass
+
+    class CountingServer(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+        def get_request(self):
+            counters["http1_connections"] += 1
+            return super().get_request()
+
+    server = CountingServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# HTTP/2 stub (h2c, prior knowledge)
+# ---------------------------------------------------------------------------
+
+class H2StubProtocol(asyncio.Protocol):
+    def __init__(self, latency: float, counters: dict):
+        self.latency = latency
+        self.counters = counters
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+
+    def connection_made(self, transport):
+        self.counters["http2_connections"] += 1
+        self.transport = transport
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        try:
+            events = self.conn.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self.transport.close()
+            return
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                asyncio.get_running_loop().call_later(self.latency, self.respond, event.stream_id)
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.conn.data_to_send())
+
+    def respond(self, stream_id: int):
+        if self.transport.is_closing():
+            return
+        self.conn.send_headers(stream_id, [
+            (":status", "200"),
+            ("content-type", "text/html; charset=utf-8"),
+            ("content-length", str(len(STUB_HTML))),
+        ])
+        self.conn.send_data(stream_id, STUB_HTML, end_stream=True)
+        self.transport.write(self.conn.data_to_send())
+
+
+def start_http2_server(latency: float, counters: dict) -> int:
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    port = {}
+
+    async def serve():
+        server = await loop.create_server(lambda: H2StubProtocol(latency, counters), "127.0.0.1", 0)
+        port["value"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=loop.run_until_complete, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return port["value"]
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def run(urls, concurrency: int, http2: bool):
+    fetcher = Fetcher(
+        max_retries=0,
+        concurrency=concurrency,
+        per_domain_concurrency=concurrency,
+        domain_rate=0,
+        http2_domains=["*"] if http2 else None,
+        http2_prior_knowledge=True,
+    )
+    started = time.perf_counter()
+    pages = fetcher.fetch_urls(urls)
+    elapsed = time.perf_counter() - started
+    fetcher.shutdown()
+    ok = sum(1 for p in pages if p["status"] == 200)
+    return elapsed, ok
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--urls", type=int, default=500)
+    arg_parser.add_argument("--concurrency", type=int, default=32)
+    arg_parser.add_argument("--latency", type=float, default=0.02)
+    args = arg_parser.parse_args()
+
+    counters = {"http1_connections": 0, "http2_connections": 0}
+    http1 = start_http1_server(args.latency, counters)
+    http2_port = start_http2_server(args.latency, counters)
+
+    print(f"{'backend':<10}{'seconds':>9}{'req/s':>9}{'ok':>6}{'connections':>13}")
+    for name, port, key, use_http2 in (
+        ("http/1.1", http1.server_port, "http1_connections", False),
+        ("http/2", http2_port, "http2_connections", True),
+    ):
+        urls = [f"http://127.0.0.1:{port}/products/item-{i}" for i in range(args.urls)]
+        elapsed, ok = run(urls, args.concurrency, use_http2)
+        print(f"{name:<10}{elapsed:>9.2f}{args.urls / elapsed:>9.1f}{ok:>6}{counters[key]:>13}")
+
+    http1.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Category pages fetched vs products found: blind ?page=N vs detected pagination.
+
+Three local stub sites, one category each:
+- shopify: /collections/shirts, 24 products per HTML page plus
+  collections/shirts/products.json (250 per page)
+- cursor: /c/shoes?sort=new, rel="next" links with an opaque cursor;
+  ?page=N is ignored (page 1 comes back)
+- filtered: /category?color=red, ?page=N, the color filter must survive
+  (without it every color is listed)
+
+Runs:
+- before: query dropped, ?page=N appended up to the page limit
+- after: PaginationDetector (products.json / rel=next / merged ?page=N)
+- after, rerun: same, with the known-URL filter from the previous run
+  and --new-products added at the top of each category
+
+Usage (from the project root):
+    python benchmarks/pagination_discovery.py --products 600 --new-products 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inputs import product_discovery  # noqa: E402
+from inputs.crawl_frontier import CrawlFrontier  # noqa: E402
+from inputs.pagination import PaginationDetector  # noqa: E402
+
+HTML_PAGE_SIZE = 24
+COLORS = ("red", "blue", "green")
+
+
+class Catalog:
+    def __init__(self, products: int):
+        self.handles = [f"item-{i:05d}-{COLORS[i % len(COLORS)]}" for i in range(products)]
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def add_new(self, count: int):
+        self.handles = [f"new-item-{i:03d}-red" for i in range(count)] + self.handles
+
+
+def make_handler(catalog: Catalog, kind: str):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body: str, content_type: str = "text/html; charset=utf-8"):
+            data = body.encode("utf-8")
+            head = (
+                f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n"
+            ).encode("ascii")
+            # one write: split header/body writes stall on Nagle + delayed ACK
+            self.wfile.write(head + data)
+
+        def _listing(self, handles, next_href=None, shopify=False) -> str:
+            links = "".join(f'<a href="/products/{h}">{h}</a>' for h in handles)
+            nav = '<a href="/cart">Cart</a><a href="/account/login">Login</a>'
+            rel = f'<link rel="next" href="{next_href}">' if next_href else ""
+            marker = '<script src="https://cdn.shopify.com/s/theme.js"></script>' if shopify else ""
+            return f"<html><head>{rel}{marker}</head><body>{nav}{links}</body></html>"
+
+        def do_GET(self):
+            with catalog.lock:
+                catalog.requests += 1
+            parsed = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            handles = catalog.handles
+
+            if kind == "shopify" and parsed.path.endswith("/products.json"):
+                limit, page = int(query.get("limit", 30)), int(query.get("page", 1))
+                chunk = handles[(page - 1) * limit:page * limit]
+                body = ",".join(f'{{"handle": "{h}"}}' for h in chunk)
+                return self._send(f'{{"products": [{body}]}}', "application/json")
+
+            if kind == "cursor":
+                start = int(query.get("cursor", "0x0"), 16)
+                chunk = handles[start:start + HTML_PAGE_SIZE]
+                following = start + HTML_PAGE_SIZE
+                next_href = f"?sort=new&amp;cursor={following:#x}" if following < len(handles) else None
+                return self._send(self._listing(chunk, next_href))
+
+            if kind == "filtered" and "color" in query:
+                handles = [h for h in handles if h.endswith(query["color"])]
+            page = int(query.get("page", 1))
+            chunk = handles[(page - 1) * HTML_PAGE_SIZE:page * HTML_PAGE_SIZE]
+            self._send(self._listing(chunk, shopify=kind == "shopify"))
+
+    return Handler
+
+
+def blind_next_page(category_url: str, page_url: str, page_num: int, body: str):
+    # pre-detection behaviour: query dropped, ?page=N appended
+    if page_num > product_discovery.MAX_PAGINATION_PAGES:
+        return None
+    return f"{category_url.split('?')[0]}?page={page_num}"
+
+
+def crawl(categories, next_page):
+    frontier = CrawlFrontier(
+        fetch=product_discovery.fetch_html,
+        extract=product_discovery.extract_product_links,
+        next_page=next_page,
+        concurrency=8,
+        per_domain_concurrency=2,
+        domain_delay=0.0,
+    )
+    found = list(frontier.crawl(categories))
+    return found, frontier.stats()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--products", type=int, default=600)
+    arg_parser.add_argument("--new-products", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    sites = {}
+    for kind, path in (("shopify", "/collections/shirts"), ("cursor", "/c/shoes?sort=new"), ("filtered", "/category?color=red")):
+        catalog = Catalog(args.products)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(catalog, kind))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        sites[kind] = (catalog, f"http://127.0.0.1:{server.server_address[1]}{path}")
+
+    categories = [url for _, url in sites.values()]
+    expected = {
+        "shopify": args.products,
+        "cursor": args.products,
+        "filtered": sum(1 for i in range(args.products) if i % len(COLORS) == 0),
+    }
+
+    def report(label, found, crawl_stats):
+        print(f"\n{label}")
+        for kind, (catalog, url) in sites.items():
+            port = urlparse(url).netloc
+            products = sum(1 for u in found if urlparse(u).netloc == port and "/products/" in u)
+            print(f"  {kind:<10}requests {catalog.requests:>4}   products {products:>5} (want {expected[kind]})")
+            catalog.requests = 0
+        print(f"  pages fetched {crawl_stats['pages_fetched']}, stopped on known {crawl_stats['stopped_on_known']}")
+
+    found, crawl_stats = crawl([url.split("?")[0] for url in categories], blind_next_page)
+    report("before: blind ?page=N", found, crawl_stats)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        known_path = os.path.join(tmp, "known.bloom")
+
+        detector = PaginationDetector(state_path=os.path.join(tmp, "pagination.json"))
+        found = list(product_discovery.discover_from_categories(
+            categories, stats=(stats := {}), pagination=detector, known_path=known_path,
+        ))
+        report("after: detected pagination", found, stats["crawl"])
+        print(f"  strategies: {detector.strategies}")
+
+        for catalog, _ in sites.values():
+            catalog.add_new(args.new_products)
+        expected = {kind: args.new_products for kind in expected}
+        detector = PaginationDetector(state_path=os.path.join(tmp, "pagination.json"))
+        found = list(product_discovery.discover_from_categories(
+            categories, stats=(stats := {}), pagination=detector, known_path=known_path,
+        ))
+        new = [u for u in found if "/new-item-" in u]
+        report(f"after, rerun with {args.new_products} new products per category ({len(new)} new found)", new, stats["crawl"])
+
+
+if __name__ == "__main__":
+    product_discovery.REQUEST_DELAY_SEC = 0.0
+    main()
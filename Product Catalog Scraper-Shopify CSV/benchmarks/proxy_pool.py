@@ -0,0 +1,135 @@
+"""
+Proxy pool benchmark against local stand-in proxies.
+
+Starts a few stub "proxies" with different latency and ban rates (each
+answers absolute-URI requests itself instead of forwarding), then runs
+Fetcher over the same URL list twice: once picking proxies uniformly at
+random, once through the health-scored ProxyPool. Prints attempts per
+page (wasted retries), failed pages and p50/p95 page latency.
+
+Usage (from the project root):
+    python benchmarks/proxy_pool.py --urls 400
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch.fetcher import Fetcher  # noqa: E402
+from src.fetch.proxy_pool import ProxyPool  # noqa: E402
+
+
+STUB_HTML = b"<html><head><title>Stub Product</title></head><body>ok</body></html>"
+
+# (latency seconds, probability the target "bans" the request with 429)
+PROXY_PROFILES = [
+    (0.01, 0.02),
+    (0.02, 0.05),
+    (0.15, 0.05),
+    (0.03, 0.60),
+    (0.40, 0.10),
+]
+
+
+def make_handler(latency: float, ban_rate: float):
+    class StubProxy(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            status = 429 if random.random() < ban_rate else 200
+            body = STUB_HTML if status == 200 else b"rate limited"
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubProxy
+
+
+def start_proxy(latency: float, ban_rate: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency, ban_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class UniformProxyPool(ProxyPool):
+    """Baseline: uniform random choice, no health tracking."""
+
+    def choose(self, domain):
+        return random.choice(list(self.proxies))
+
+    def report(self, *args, **kwargs):
+        pass
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def run(pool_cls, proxy_urls, urls):
+    fetcher = Fetcher(
+        max_retries=3,
+        base_delay=0.0,
+        max_delay=0.0,
+        concurrency=8,
+        per_domain_concurrency=8,
+        domain_rate=0,
+        breaker_min_requests=10 ** 9,
+        proxies=proxy_urls,
+    )
+    fetcher.proxy_pool = pool_cls(proxy_urls, base_cooldown=5.0)
+    fetcher.http_client.proxy_pool = fetcher.proxy_pool
+
+    started = time.perf_counter()
+    pages = fetcher.fetch_urls(urls)
+    elapsed = time.perf_counter() - started
+
+    ok = [p for p in pages if p["status"] == 200]
+    attempts = sum(p.get("retries", 3) + 1 for p in pages)
+    latencies = [p["timings"]["total"] * 1000 for p in ok if p.get("timings")]
+    fetcher.shutdown()
+    return {
+        "seconds": elapsed,
+        "attempts_per_page": attempts / len(pages),
+        "failed": len(pages) - len(ok),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--urls", type=int, default=400)
+    args = arg_parser.parse_args()
+
+    proxies = [start_proxy(latency, ban) for latency, ban in PROXY_PROFILES]
+    proxy_urls = [f"http://127.0.0.1:{p.server_port}" for p in proxies]
+    urls = [f"http://shop.example/products/item-{i}" for i in range(args.urls)]
+
+    print(f"{'pool':<10}{'seconds':>9}{'attempts/page':>15}{'failed':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, pool_cls in (("uniform", UniformProxyPool), ("scored", ProxyPool)):
+        r = run(pool_cls, proxy_urls, urls)
+        print(
+            f"{name:<10}{r['seconds']:>9.2f}{r['attempts_per_page']:>15.2f}{r['failed']:>8}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+        )
+
+    for p in proxies:
+        p.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Input ingestion: time to first fetch and peak memory, list vs streamed.
+
+Writes a product_urls.txt of --lines URLs over --domains local stub
+servers (a quarter are repeats, half carry tracking parameters), then:
+- before: whole file into a list, identity keys through the same
+  canonicalizer (unmemoized normalizer), dedupe on a set of key
+  strings, then fetch
+- after: InputLoader.iter_url_batches → ProductCanonicalizer.collapse
+  (memoized normalizer, UrlDeduper hashed keys) fed lazily to the fetcher
+- after, spill: same, UrlDeduper spilling to SQLite past --memory-keys
+Prints ingest time, peak traced memory (tracemalloc, separate pass) and
+time to the first dispatched request (fetching the first --fetch URLs).
+
+Usage (from the project root):
+    python benchmarks/url_ingestion.py --lines 1000000 --fetch 200
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inputs import product_canonicalizer  # noqa: E402
+from inputs.input_loader import InputLoader  # noqa: E402
+from inputs.product_canonicalizer import ProductCanonicalizer  # noqa: E402
+from inputs.url_dedupe import UrlDeduper  # noqa: E402
+from inputs.url_validator import normalize_url  # noqa: E402
+from src.fetch.fetcher import Fetcher  # noqa: E402
+
+STUB_HTML = b"<html><head><title>Stub Product</title></head><body>ok</body></html>"
+BATCH_SIZE = 1000
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        # one write: split header/body writes stall on Nagle + delayed ACK
+        self.wfile.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+            + f"Content-Length: {len(STUB_HTML)}\r\n\r\n".encode("ascii")
+            + STUB_HTML
+        )
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_input(path: str, hosts, lines: int, seed: int = 0):
+    rng = random.Random(seed)
+    unique = int(lines * 0.75)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# generated product URLs\n")
+        for i in range(lines):
+            n = i if i < unique else rng.randrange(unique)
+            url = f"http://{hosts[n % len(hosts)]}/products/item-{n:08d}"
+            if rng.random() < 0.5:
+                url += f"?utm_source=feed{rng.randrange(9)}&ref=sr_{rng.randrange(99)}"
+            f.write(url + "\n")
+
+
+# -----------------------------
+# Pipelines
+# -----------------------------
+def before_urls(loader: InputLoader):
+    # pre-streaming: list in memory, full-string seen set, no memoization
+    product_canonicalizer.normalize_url = normalize_url.__wrapped__
+    canonicalizer = ProductCanonicalizer()
+    seen = set()
+    unique = []
+    for url in loader.load_product_urls():
+        key, fetch_url = canonicalizer.canonicalize(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(fetch_url)
+    product_canonicalizer.normalize_url = normalize_url
+    return iter(unique)
+
+
+def after_urls(loader: InputLoader, spill_path=None, memory_keys=2_000_000):
+    canonicalizer = ProductCanonicalizer(seen=UrlDeduper(memory_keys, spill_path))
+    for batch in loader.iter_url_batches(batch_size=BATCH_SIZE):
+        yield from canonicalizer.collapse(batch)
+    canonicalizer.close()
+
+
+def drain(urls) -> int:
+    return sum(1 for _ in urls)
+
+
+def time_and_memory(make_urls):
+    normalize_url.cache_clear()
+    started = time.perf_counter()
+    count = drain(make_urls())
+    seconds = time.perf_counter() - started
+
+    normalize_url.cache_clear()
+    tracemalloc.start()
+    drain(make_urls())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+def first_fetch_ms(make_urls, fetch: int) -> float:
+    normalize_url.cache_clear()
+    fetcher = Fetcher(concurrency=8, per_domain_concurrency=4, domain_rate=0, max_retries=0)
+    started = time.monotonic()
+    fetcher.fetch_urls(itertools.islice(make_urls(), fetch))
+    fetcher.shutdown()
+    return (fetcher.first_dispatch_at - started) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--lines", type=int, default=1_000_000)
+    arg_parser.add_argument("--domains", type=int, default=4)
+    arg_parser.add_argument("--fetch", type=int, default=200)
+    arg_parser.add_argument("--memory-keys", type=int, default=100_000)
+    args = arg_parser.parse_args()
+
+    servers = []
+    for i in range(args.domains):
+        server = ThreadingHTTPServer((f"127.0.0.{i + 1}", 0), StubHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    hosts = [f"{s.server_address[0]}:{s.server_address[1]}" for s in servers]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_input(os.path.join(tmp, "product_urls.txt"), hosts, args.lines)
+        loader = InputLoader(tmp)
+        spill_path = os.path.join(tmp, "dedupe.sqlite")
+
+        runs = (
+            ("before: list + string set", lambda: before_urls(loader)),
+            ("after: streamed + hashed", lambda: after_urls(loader)),
+            ("after: + spill to SQLite", lambda: after_urls(loader, spill_path, args.memory_keys)),
+        )
+        print(f"{args.lines} input lines, {args.domains} domains, first {args.fetch} URLs fetched\n")
+        print(f"{'pipeline':<28}{'unique':>9}{'ingest s':>10}{'peak MB':>9}{'first fetch ms':>16}")
+        for label, make_urls in runs:
+            count, seconds, peak = time_and_memory(make_urls)
+            first = first_fetch_ms(make_urls, args.fetch)
+            print(f"{label:<28}{count:>9}{seconds:>10.2f}{peak / 1e6:>9.1f}{first:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+import heapq
+import hashlib
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Seen-URL filter
+# ---------------------------------------------------------------------------
+
+
+BLOOM_MAGIC = b"BLM1"
+BLOOM_HEADER = struct.Struct("<4sQdQ")
+
+
+def url_hash64(url: str) -> int:
+    """Stable 64-bit hash of a URL (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over 64-bit URL hashes.
+    - bits and hash count derived from capacity + false-positive rate
+    - ~1.8 MB per million URLs at a 0.1% false-positive rate
+    - k bit positions by double hashing the two 32-bit halves
+    False positives mean a genuinely new URL is occasionally treated
+    as seen; there are never false negatives.
+    """
+
+    def __init__(self, capacity: int = 2_000_000, fp_rate: float = 0.001):
+        capacity = max(1, capacity)
+        fp_rate = min(max(fp_rate, 1e-9), 0.5)
+
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url: str) -> Iterator[int]:
+        h = url_hash64(url)
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, url: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def add(self, url: str) -> bool:
+        """Adds url; returns True if it was (probably) not seen before."""
+        new = False
+        for p in self._positions(url):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def update(self, other: "BloomFilter"):
+        """Adds every URL of other (same capacity / fp_rate) to this filter."""
+        if other.num_bits != self.num_bits or other.num_hashes != self.num_hashes:
+            raise ValueError("Bloom filters differ in size")
+        self.bits = bytearray(a | b for a, b in zip(self.bits, other.bits))
+        # upper bound: URLs in both filters are counted twice
+        self.count = min(self.count + other.count, self.capacity)
+
+    def current_fp_rate(self) -> float:
+        """Expected false-positive rate at the current fill level."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path: str):
+        """Writes the filter (header + bit array) atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, self.capacity, self.fp_rate, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            magic, capacity, fp_rate, count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f"Not a Bloom filter file: {path}")
+            bloom = cls(capacity, fp_rate)
+            bits = f.read()
+        if len(bits) != len(bloom.bits):
+            raise ValueError(f"Truncated Bloom filter file: {path}")
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom
+
+    def stats(self) -> Dict:
+        return {
+            "entries": self.count,
+            "capacity": self.capacity,
+            "memory_bytes": len(self.bits),
+            "target_fp_rate": self.fp_rate,
+            "current_fp_rate": round(self.current_fp_rate(), 6),
+        }
+
+# ---------------------------------------------------------------------------
+# Crawl frontier
+# ---------------------------------------------------------------------------
+
+
+class CrawlFrontier:
+    """
+    Concurrent category crawl:
+    - per-domain priority queues of category / pagination pages
+      (lower priority value first; page N of a category has priority N)
+    - global worker pool + per-domain in-flight cap + per-domain delay
+    - Bloom-filter seen-set for pages and discovered product URLs
+      (global dedupe only)
+    - pages come from start(category) then next_page(category, page URL,
+      page number, body), so pagination can follow the page itself
+    - pagination stops when a page lists no URLs new to its own category
+      (64-bit hashes per category, dropped when the category ends), or
+      (with a known filter from previous runs) only URLs found in an
+      earlier run; overlapping categories do not cut each other short
+    - stats: pages/sec, frontier size (current / peak)
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Optional[str]],
+        extract: Callable[[str, str], Iterable[str]],
+        next_page: Callable[[str, str, int, str], Optional[str]],
+        concurrency: int = 8,
+        per_domain_concurrency: int = 2,
+        domain_delay: float = 0.5,
+        seen: Optional[BloomFilter] = None,
+        start: Optional[Callable[[str], str]] = None,
+        known: Optional[BloomFilter] = None,
+    ):
+        self.fetch = fetch
+        self.extract = extract
+        self.next_page = next_page
+        self.start = start
+        self.known = known
+        self.concurrency = max(1, concurrency)
+        self.per_domain_concurrency = max(1, per_domain_concurrency)
+        self.domain_delay = domain_delay
+        self.seen = seen or BloomFilter()
+        # this run's product URLs, merged into known once the crawl ends
+        self.found = BloomFilter(known.capacity, known.fp_rate) if known is not None else None
+        self.category_links: Dict[str, set] = {}
+
+        self.queues: Dict[str, List[Tuple[int, int, str, str, int]]] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.next_allowed: Dict[str, float] = {}
+        self.seq = 0
+
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.discovered = 0
+        self.previously_known = 0
+        self.stopped_on_known = 0
+        self.frontier_size = 0
+        self.peak_frontier = 0
+        self.started = None
+        self.elapsed = 0.0
+
+    # -----------------------------
+    # Queue
+    # -----------------------------
+    def _domain(self, url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def push(self, url: str, category_url: str, page_num: int = 1) -> bool:
+        if not self.seen.add(url):
+            return False
+        domain = self._domain(url)
+        heapq.heappush(self.queues.setdefault(domain, []), (page_num, self.seq, url, category_url, page_num))
+        self.seq += 1
+        self.frontier_size += 1
+        self.peak_frontier = max(self.peak_frontier, self.frontier_size)
+        return True
+
+    def _pop_ready(self, now: float) -> Tuple[Optional[Tuple], Optional[float]]:
+        """Best-priority task from any domain allowed to start now, else the wait."""
+        best = None
+        wait_for = None
+        for domain, queue in self.queues.items():
+            if not queue or self.in_flight.get(domain, 0) >= self.per_domain_concurrency:
+                continue
+            delay = self.next_allowed.get(domain, 0.0) - now
+            if delay > 0:
+                wait_for = delay if wait_for is None else min(wait_for, delay)
+                continue
+            if best is None or queue[0] < self.queues[best][0]:
+                best = domain
+
+        if best is None:
+            return None, wait_for
+
+        task = heapq.heappop(self.queues[best])
+        self.frontier_size -= 1
+        self.in_flight[best] = self.in_flight.get(best, 0) + 1
+        self.next_allowed[best] = now + self.domain_delay
+        return task, None
+
+    # -----------------------------
+    # Crawl
+    # -----------------------------
+    def crawl(self, category_urls: Iterable[str]) -> Iterator[str]:
+        """
+        Yields each newly discovered product URL once, as pages complete.
+        """
+        for url in category_urls:
+            self.push(self.start(url) if self.start else url, url, 1)
+
+        self.started = time.monotonic()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while running or self.frontier_size:
+                wait_for = None
+                while len(running) < self.concurrency:
+                    task, wait_for = self._pop_ready(time.monotonic())
+                    if task is None:
+                        break
+                    _, _, url, category_url, page_num = task
+                    logger.info(f"Fetching category page: {url}")
+                    running[pool.submit(self.fetch, url)] = (url, category_url, page_num)
+
+                if not running:
+                    time.sleep(wait_for or 0.01)
+                    continue
+
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, category_url, page_num = running.pop(future)
+                    domain = self._domain(url)
+                    self.in_flight[domain] -= 1
+                    yield from self._handle(future, url, category_url, page_num)
+
+        self.elapsed = time.monotonic() - self.started
+        if self.known is not None:
+            self.known.update(self.found)
+
+    def _handle(self, future, url: str, category_url: str, page_num: int) -> Iterator[str]:
+        try:
+            html = future.result()
+        except Exception as e:
+            logger.warning(f"Category page failed: {url} | {e}")
+            html = None
+
+        if not html:
+            self.pages_failed += 1
+            self.category_links.pop(category_url, None)
+            return
+        self.pages_fetched += 1
+
+        listed = self.category_links.setdefault(category_url, set())
+        new_links = 0  # new for this category
+        unknown_links = 0  # of those, not found by an earlier run
+        for link in self.extract(html, url):
+            h = url_hash64(link)
+            if h in listed:
+                continue
+            listed.add(h)
+            new_links += 1
+            earlier = self.known is not None and link in self.known
+            if not earlier:
+                unknown_links += 1
+            if self.seen.add(link):
+                self.discovered += 1
+                self.previously_known += earlier
+                if self.found is not None:
+                    self.found.add(link)
+                yield link
+
+        # Stop pagination if no new URLs are found
+        following = None
+        if new_links and not unknown_links:
+            # the rest of the category was crawled by an earlier run
+            self.stopped_on_known += 1
+        elif new_links:
+            following = self.next_page(category_url, url, page_num + 1, html)
+        if not following or not self.push(following, category_url, page_num + 1):
+            self.category_links.pop(category_url, None)
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        elapsed = self.elapsed or (time.monotonic() - self.started if self.started else 0.0)
+        return {
+            "pages_fetched": self.pages_fetched,
+            "pages_failed": self.pages_failed,
+            "pages_per_sec": round(self.pages_fetched / elapsed, 2) if elapsed else 0.0,
+            "discovered": self.discovered,
+            "previously_known": self.previously_known,
+            "stopped_on_known": self.stopped_on_known,
+            "frontier_size": self.frontier_size,
+            "peak_frontier_size": self.peak_frontier,
+            "seen_filter": self.seen.stats(),
+        }
@@ -4,14 +4,16 @@ from urllib.parse import urlparse
 
 
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterator, List, Dict
 import yaml
 
 
 class InputLoader:
     """
-    Loads category URLs, product URLs, and vendor mappings
-    from structured text / yaml configuration files.
+    Loads category URLs, product URLs, vendor mappings, product
+    identity rules and product URL patterns from structured text / yaml
+    configuration files. URL files can also be streamed in batches
+    (iter_url_batches) for inputs too large to hold as one list.
     """
 
     def __init__(self, base_path: str | Path = "inputs"):
@@ -26,6 +28,20 @@ class InputLoader:
     def load_product_urls(self, filename: str = "product_urls.txt") -> List[str]:
         return self._load_url_file(filename)
 
+    def load_site_urls(self, filename: str = "site_urls.txt") -> List[str]:
+        return self._load_url_file(filename)
+
+    def iter_url_batches(self, filename: str = "product_urls.txt", batch_size: int = 1000) -> Iterator[List[str]]:
+        """URLs of a file in lists of batch_size, read lazily."""
+        batch: List[str] = []
+        for url in self._iter_url_file(filename):
+            batch.append(url)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     def load_vendor_map(self, filename: str = "vendor_map.yaml") -> Dict[str, str]:
         path = self.base_path / filename
         if not path.exists():
@@ -37,16 +53,39 @@ class InputLoader:
         # Normalize keys (domains) to lowercase
         return {str(k).lower(): str(v) for k, v in data.items()}
 
+    def load_canonical_rules(self, filename: str = "canonical_rules.yaml") -> Dict[str, List[Dict]]:
+        path = self.base_path / filename
+        if not path.exists():
+            return {}
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+
+        # Normalize keys (domains) to lowercase
+        return {str(k).lower(): list(v or []) for k, v in data.items()}
+
+    def load_url_patterns(self, filename: str = "url_patterns.yaml") -> Dict[str, Dict[str, List[str]]]:
+        path = self.base_path / filename
+        if not path.exists():
+            return {}
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+
+        # Normalize keys (domains) to lowercase
+        return {str(k).lower(): dict(v or {}) for k, v in data.items()}
+
     # ----------------------------
     # Internal helpers
     # ----------------------------
     def _load_url_file(self, filename: str) -> List[str]:
+        return list(self._iter_url_file(filename))
+
+    def _iter_url_file(self, filename: str) -> Iterator[str]:
         path = self.base_path / filename
         if not path.exists():
             raise FileNotFoundError(f"URL file not found: {path}")
 
-        urls: List[str] = []
-
         with open(path, "r", encoding="utf-8") as f:
             for line in f:
                 line = line.strip()
@@ -63,9 +102,7 @@ class InputLoader:
                 if "#" in line:
                     line = line.split("#", 1)[0].strip()
 
-                urls.append(line)
-
-        return urls
+                yield line
 
 
 # ----------------------------
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import html as html_lib
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from src.parse.parser_router import is_shopify_html
+
+logger = logging.getLogger(__name__)
+
+SHOPIFY_JSON = "shopify_json"
+REL_NEXT = "rel_next"
+PAGE_PARAM = "page_param"
+
+COLLECTION_PATH = re.compile(r"^/collections/([^/?#.]+)/?$")
+COLLECTION_JSON_PATH = re.compile(r"^/collections/([^/?#.]+)/products\.json$")
+
+# <link rel="next" href=...> / <a rel="next" href=...>, attributes in any order
+PAGINATION_TAG = re.compile(r"<(?:link|a)\b[^>]*\brel\s*=\s*[\"']?(?:[^\"'>]*\s)?(next|prev)\b[^>]*>", re.IGNORECASE)
+HREF = re.compile(r"\bhref\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.IGNORECASE)
+
+
+def page_param_url(category_url: str, page_num: int, param: str = "page") -> str:
+    """category_url with ?page=N set, keeping the rest of its query."""
+    parsed = urlparse(category_url)
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != param]
+    if page_num > 1:
+        query.append((param, str(page_num)))
+    return urlunparse(parsed._replace(query=urlencode(query), fragment=""))
+
+
+def is_collection_json(url: str) -> bool:
+    return bool(COLLECTION_JSON_PATH.match(urlparse(url).path))
+
+
+def collection_json_products(body: str, page_url: str) -> Iterator[str]:
+    """Product page URLs listed by a Shopify collections/<handle>/products.json page."""
+    try:
+        products = json.loads(body).get("products") or []
+    except (ValueError, AttributeError):
+        return
+    parsed = urlparse(page_url)
+    for product in products:
+        handle = product.get("handle") if isinstance(product, dict) else None
+        if handle:
+            yield f"{parsed.scheme}://{parsed.netloc}/products/{handle}"
+
+
+class PaginationDetector:
+    """
+    Per-site pagination strategy, read from the pages themselves.
+    Handles:
+    - shopify_json: Shopify collection pages (/collections/<handle>) are
+      paged through collections/<handle>/products.json?limit=250&page=N,
+      ending on the first short page
+    - rel_next: follow <link rel="next"> / <a rel="next"> as given
+      (page numbers, offsets or opaque cursors)
+    - page_param: ?page=N merged into the category URL's own query,
+      only for sites without either of the above
+    - strategies remembered per site (optionally across runs), so later
+      categories of a known Shopify site start on the JSON endpoint
+    - per-site strategy / page counts
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 50,
+        json_page_size: int = 250,
+        state_path: Optional[str] = None,
+    ):
+        self.max_pages = max_pages
+        self.json_page_size = json_page_size
+        self.state_path = state_path
+        self.strategies: Dict[str, str] = {}
+        self.site_stats: Dict[str, Dict[str, int]] = {}
+
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    self.strategies = dict(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Pagination strategies not loaded: {state_path} | {e}")
+
+    def _site(self, url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _json_url(self, url: str, handle: str, page: int) -> str:
+        parsed = urlparse(url)
+        return (
+            f"{parsed.scheme}://{parsed.netloc}/collections/{handle}/products.json"
+            f"?limit={self.json_page_size}&page={page}"
+        )
+
+    def _detected(self, site: str, strategy: str):
+        if self.strategies.get(site) != strategy:
+            logger.info(f"Pagination for {site}: {strategy}")
+        self.strategies[site] = strategy
+        stats = self.site_stats.setdefault(site, {"pages": 0, "strategy": strategy})
+        stats["strategy"] = strategy
+
+    # -----------------------------
+    # Strategy
+    # -----------------------------
+    def start_url(self, category_url: str) -> str:
+        """First page to fetch for a category."""
+        match = COLLECTION_PATH.match(urlparse(category_url).path)
+        if match and self.strategies.get(self._site(category_url)) == SHOPIFY_JSON:
+            return self._json_url(category_url, match.group(1), 1)
+        return category_url
+
+    def next_page(self, category_url: str, page_url: str, page_num: int, body: str) -> Optional[str]:
+        """
+        URL of page page_num of a category, given the previous page
+        (page_url, body), or None when the category is exhausted.
+        """
+        site = self._site(page_url)
+        self.site_stats.setdefault(site, {"pages": 0, "strategy": self.strategies.get(site, PAGE_PARAM)})
+        self.site_stats[site]["pages"] += 1
+        if page_num > self.max_pages:
+            return None
+
+        parsed = urlparse(page_url)
+        json_match = COLLECTION_JSON_PATH.match(parsed.path)
+        if json_match:
+            if sum(1 for _ in collection_json_products(body, page_url)) < self.json_page_size:
+                return None
+            page = int(dict(parse_qsl(parsed.query)).get("page", 1))
+            return self._json_url(page_url, json_match.group(1), page + 1)
+
+        match = COLLECTION_PATH.match(parsed.path)
+        if match and is_shopify_html(body):
+            self._detected(site, SHOPIFY_JSON)
+            return self._json_url(page_url, match.group(1), 1)
+
+        links = {}
+        for tag in PAGINATION_TAG.finditer(body):
+            href = HREF.search(tag.group(0))
+            if href:
+                links.setdefault(tag.group(1).lower(), next(h for h in href.groups() if h is not None))
+
+        if "next" in links:
+            self._detected(site, REL_NEXT)
+            following = urljoin(page_url, html_lib.unescape(links["next"]).strip())
+            return following if following != page_url else None
+        if "prev" in links or self.strategies.get(site) == REL_NEXT:
+            # the site paginates with links and this page has no next one
+            return None
+
+        return page_param_url(category_url, page_num)
+
+    def save(self):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.strategies, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict]:
+        return {site: dict(s) for site, s in self.site_stats.items()}
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from inputs.url_dedupe import UrlDeduper
+from inputs.url_validator import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# host prefixes that serve the same catalog
+HOST_PREFIXES = ("www.", "m.")
+
+
+class CanonicalRule:
+    """
+    One identity rule: a path regex (first group) or a query parameter
+    yields the key; an optional template gives the clean URL to fetch.
+    """
+
+    def __init__(self, path: Optional[str] = None, param: Optional[str] = None, url: Optional[str] = None):
+        if not path and not param:
+            raise ValueError("Canonical rule needs a 'path' regex or a 'param' name")
+        self.path = re.compile(path) if path else None
+        self.param = param
+        self.url = url
+
+    def match(self, parsed) -> Optional[str]:
+        if self.path:
+            m = self.path.search(parsed.path)
+            return m.group(1) if m else None
+        values = parse_qs(parsed.query).get(self.param)
+        return values[0] if values and values[0] else None
+
+
+class ProductCanonicalizer:
+    """
+    Maps product URLs to product identity keys before fetching.
+    Handles:
+    - per-domain rules (inputs/canonical_rules.yaml): ASIN from /dp/<ASIN>,
+      Flipkart pid, ... keyed as "<domain>:<key>"
+    - fallback key: the normalized URL (tracking params removed)
+    - one URL per key survives (the first seen, rewritten to the rule's
+      clean URL when it has one); later copies are collapsed, also
+      across collapse() calls (keys kept hashed in a UrlDeduper, so
+      batches of a streamed input collapse against each other)
+    - per-domain input / unique / collapsed counts
+    """
+
+    def __init__(self, rules: Optional[Dict[str, List[Dict]]] = None, seen: Optional[UrlDeduper] = None):
+        self.rules: Dict[str, List[CanonicalRule]] = {
+            domain.lower(): [CanonicalRule(**rule) for rule in domain_rules or []]
+            for domain, domain_rules in (rules or {}).items()
+        }
+        self.domain_stats: Dict[str, Dict[str, int]] = {}
+        self.seen = seen if seen is not None else UrlDeduper()
+
+    def _domain(self, host: str) -> str:
+        host = host.lower().split(":")[0]
+        for prefix in HOST_PREFIXES:
+            if host.startswith(prefix):
+                return host[len(prefix):]
+        return host
+
+    def canonicalize(self, url: str) -> Tuple[str, str]:
+        """(identity key, URL to fetch) for one product URL."""
+        return self._canonicalize(url)[1:]
+
+    def _canonicalize(self, url: str) -> Tuple[str, str, str]:
+        parsed = urlparse(url.strip())
+        domain = self._domain(parsed.netloc)
+
+        for rule in self.rules.get(domain, ()):
+            key = rule.match(parsed)
+            if key:
+                fetch_url = rule.url.format(
+                    scheme=parsed.scheme or "https",
+                    host=parsed.netloc,
+                    path=parsed.path,
+                    key=key,
+                ) if rule.url else url
+                return domain, f"{domain}:{key}", fetch_url
+
+        normalized = normalize_url(url) or url
+        return domain, normalized, url
+
+    def collapse(self, urls: Iterable[str]) -> List[str]:
+        """
+        One URL per product identity, in first-seen order.
+        """
+        canonical = [self._canonicalize(url) for url in urls]
+        unique: List[str] = []
+
+        for (domain, _, fetch_url), new in zip(canonical, self.seen.add_many(key for _, key, _ in canonical)):
+            stats = self.domain_stats.setdefault(domain, {"input": 0, "unique": 0, "collapsed": 0})
+            stats["input"] += 1
+
+            if not new:
+                stats["collapsed"] += 1
+                continue
+            stats["unique"] += 1
+            unique.append(fetch_url)
+
+        logger.debug(f"Canonical keys: {len(unique)} of {len(canonical)} URLs kept")
+        return unique
+
+    @property
+    def collapsed(self) -> int:
+        return sum(s["collapsed"] for s in self.domain_stats.values())
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {domain: dict(s) for domain, s in self.domain_stats.items()}
+
+    def close(self):
+        self.seen.close()
@@ -2,13 +2,22 @@ from __future__ import annotations
 
 import re
 import time
+import zlib
 import logging
-from typing import Iterable, Set, List
-from urllib.parse import urljoin, urlparse, urlunparse
+from functools import partial
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, Set, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import XMLPullParser, ParseError
 
 import requests
 from bs4 import BeautifulSoup
 
+from inputs.crawl_frontier import BloomFilter, CrawlFrontier
+from inputs.pagination import PaginationDetector, collection_json_products, is_collection_json, page_param_url
+from inputs.url_classifier import ProductUrlClassifier
+from inputs.url_validator import normalize_url
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -25,6 +34,16 @@ REQUEST_HEADERS = {
 REQUEST_DELAY_SEC = 0.5  # polite crawling
 MAX_PAGINATION_PAGES = 50
 
+CRAWL_CONCURRENCY = 8
+CRAWL_PER_DOMAIN_CONCURRENCY = 2
+SEEN_FILTER_CAPACITY = 2_000_000  # URLs before the false-positive rate degrades
+SEEN_FILTER_FP_RATE = 0.001
+
+SITEMAP_MAX_DEPTH = 3  # sitemap index -> index -> urlset
+SITEMAP_CHUNK_SIZE = 64 * 1024
+SITEMAP_FALLBACK_PATHS = ["/sitemap.xml", "/sitemap_index.xml"]
+GZIP_MAGIC = b"\x1f\x8b"
+
 PRODUCT_URL_HINTS = [
     "/product",
     "/products",
@@ -53,13 +72,19 @@ logger = logging.getLogger(__name__)
 
 
 def fetch_html(url: str) -> str | None:
-    """Fetch HTML content with basic error handling."""
+    """
+    Fetch HTML content with basic error handling.
+    Shopify collection JSON endpoints (products.json) are fetched as JSON.
+    """
     try:
         resp = requests.get(url, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
         if resp.status_code != 200:
             logger.warning(f"Non-200 response ({resp.status_code}): {url}")
             return None
-        if "text/html" not in resp.headers.get("Content-Type", ""):
+        content_type = resp.headers.get("Content-Type", "")
+        if is_collection_json(url) and "json" in content_type:
+            return resp.text
+        if "text/html" not in content_type:
             logger.warning(f"Non-HTML content skipped: {url}")
             return None
         return resp.text
@@ -68,28 +93,16 @@ def fetch_html(url: str) -> str | None:
         return None
 
 
-def canonicalize_url(url: str) -> str:
+def canonicalize_url(url: str, keep_query: bool = False) -> str:
     """
-    Canonicalize URL:
+    Canonicalize URL (shared, memoized url_validator.normalize_url):
     - Strip fragments
     - Normalize trailing slash
-    - Force lowercase hostname
-    - Remove query parameters (Pipeline 0 already removed tracking params)
+    - Force lowercase hostname (the scheme is kept, not forced to https)
+    - Remove query parameters (Pipeline 0 already removed tracking params);
+      keep_query keeps them (category filters / sort order)
     """
-    parsed = urlparse(url)
-
-    parsed = parsed._replace(
-        scheme=parsed.scheme.lower(),
-        netloc=parsed.netloc.lower(),
-        fragment="",
-        query="",
-    )
-
-    # Normalize trailing slash
-    path = parsed.path.rstrip("/")
-    parsed = parsed._replace(path=path)
-
-    return urlunparse(parsed)
+    return normalize_url(url, keep_query=keep_query, force_https=False) or url
 
 
 def looks_like_product_url(url: str) -> bool:
@@ -106,40 +119,77 @@ def looks_like_product_url(url: str) -> bool:
 # ---------------------------------------------------------------------------
 
 
-def discover_from_category(category_url: str) -> Set[str]:
+def extract_product_links(
+    html: str,
+    page_url: str,
+    classifier: Optional[ProductUrlClassifier] = None,
+) -> Set[str]:
+    """
+    Canonical product-looking links on one category page.
+    With a classifier, links are scored before canonicalization (so
+    filter / sort queries still count) and only same-site links it
+    accepts are kept. Shopify products.json pages list products directly.
+    """
+    if is_collection_json(page_url):
+        return {canonicalize_url(link) for link in collection_json_products(html, page_url)}
+
+    soup = BeautifulSoup(html, "lxml")
+
+    page_links = set()
+    for a in soup.select("a[href]"):
+        href = a.get("href")
+        if not href:
+            continue
+        abs_url = urljoin(page_url, href)
+        page_links.add(abs_url)
+
+    if classifier is not None:
+        site = urlparse(page_url).netloc.lower()
+        return {
+            canonicalize_url(link)
+            for link in page_links
+            if urlparse(link).netloc.lower() == site and classifier.accept(link)
+        }
+
+    return {
+        canonicalize_url(link)
+        for link in page_links
+        if looks_like_product_url(link)
+    }
+
+
+def pagination_url(category_url: str, page_num: int) -> Optional[str]:
+    """
+    URL of page N of a category by ?page=N (keeping the category's own
+    query), or None past the pagination limit. Fallback only: crawls
+    go through PaginationDetector.
+    """
+    if page_num > MAX_PAGINATION_PAGES:
+        return None
+    return page_param_url(category_url, page_num)
+
+
+def discover_from_category(
+    category_url: str,
+    pagination: Optional[PaginationDetector] = None,
+) -> Set[str]:
     """
     Crawl a category/collection page and extract product URLs.
-    Handles simple pagination patterns.
+    Follows the site's own pagination (Shopify products.json,
+    rel="next", else ?page=N).
     """
+    pagination = pagination or PaginationDetector(max_pages=MAX_PAGINATION_PAGES)
     discovered: Set[str] = set()
+    url = pagination.start_url(category_url)
+    page_num = 1
 
-    for page_num in range(1, MAX_PAGINATION_PAGES + 1):
-        if page_num == 1:
-            url = category_url
-        else:
-            # Generic page-based pagination strategy
-            url = f"{category_url}?page={page_num}"
-
+    while url:
         logger.info(f"Fetching category page: {url}")
         html = fetch_html(url)
         if not html:
             break
 
-        soup = BeautifulSoup(html, "lxml")
-
-        page_links = set()
-        for a in soup.select("a[href]"):
-            href = a.get("href")
-            if not href:
-                continue
-            abs_url = urljoin(url, href)
-            page_links.add(abs_url)
-
-        product_links_on_page = {
-            canonicalize_url(link)
-            for link in page_links
-            if looks_like_product_url(link)
-        }
+        product_links_on_page = extract_product_links(html, url)
 
         # Stop pagination if no new URLs are found
         new_links = product_links_on_page - discovered
@@ -147,40 +197,350 @@ def discover_from_category(category_url: str) -> Set[str]:
             break
 
         discovered.update(new_links)
+        page_num += 1
+        url = pagination.next_page(category_url, url, page_num, html)
         time.sleep(REQUEST_DELAY_SEC)
 
     return discovered
 
+
+def discover_from_categories(
+    category_urls: Iterable[str],
+    seen: Optional[BloomFilter] = None,
+    stats: Optional[Dict] = None,
+    classifier: Optional[ProductUrlClassifier] = None,
+    pagination: Optional[PaginationDetector] = None,
+    known_path: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Concurrent crawl of many categories through one frontier.
+    Yields each new product URL once; stats["crawl"] gets the
+    frontier's pages/sec, frontier size and seen-filter figures.
+    classifier: score links so nav / cart / filter pages are not queued.
+    pagination: per-site strategy detection (shared across calls).
+    known_path: Bloom filter of product URLs from earlier runs; a
+    category stops paginating once a page yields only those, and the
+    filter is saved back with this run's URLs added.
+    """
+    pagination = pagination or PaginationDetector(max_pages=MAX_PAGINATION_PAGES)
+    known = None
+    if known_path:
+        try:
+            known = BloomFilter.load(known_path)
+        except FileNotFoundError:
+            known = BloomFilter(SEEN_FILTER_CAPACITY, SEEN_FILTER_FP_RATE)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Known-URL filter not loaded: {known_path} | {e}")
+            known = BloomFilter(SEEN_FILTER_CAPACITY, SEEN_FILTER_FP_RATE)
+
+    frontier = CrawlFrontier(
+        fetch=fetch_html,
+        extract=partial(extract_product_links, classifier=classifier),
+        next_page=pagination.next_page,
+        concurrency=CRAWL_CONCURRENCY,
+        per_domain_concurrency=CRAWL_PER_DOMAIN_CONCURRENCY,
+        domain_delay=REQUEST_DELAY_SEC,
+        seen=seen,
+        start=pagination.start_url,
+        known=known,
+    )
+    yield from frontier.crawl(category_urls)
+
+    if known is not None:
+        known.save(known_path)
+    pagination.save()
+
+    crawl_stats = frontier.stats()
+    crawl_stats["pagination"] = pagination.stats()
+    logger.info(
+        f"Category crawl: {crawl_stats['pages_fetched']} pages "
+        f"({crawl_stats['pages_per_sec']} pages/sec), "
+        f"peak frontier {crawl_stats['peak_frontier_size']}"
+    )
+    if stats is not None:
+        stats["crawl"] = crawl_stats
+
+# ---------------------------------------------------------------------------
+# Sitemap Discovery
+# ---------------------------------------------------------------------------
+
+
+def sitemaps_from_robots(site_url: str) -> List[str]:
+    """
+    Sitemap URLs declared in robots.txt ("Sitemap:" lines).
+    Falls back to the conventional locations when none are declared.
+    """
+    parsed = urlparse(site_url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    sitemaps: List[str] = []
+
+    try:
+        resp = requests.get(f"{origin}/robots.txt", headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT)
+        if resp.status_code == 200:
+            for line in resp.text.splitlines():
+                key, _, value = line.partition(":")
+                if key.strip().lower() == "sitemap" and value.strip():
+                    sitemaps.append(urljoin(origin, value.strip()))
+    except requests.RequestException as e:
+        logger.warning(f"robots.txt request failed: {origin} | {e}")
+
+    if not sitemaps:
+        sitemaps = [origin + path for path in SITEMAP_FALLBACK_PATHS]
+    return sitemaps
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace ({http://www.sitemaps.org/...}loc -> loc)."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _inflate(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Pass plain chunks through; inflate gzip in bounded pieces
+    (sitemaps compress ~50x, so one network chunk can be megabytes of XML).
+    """
+    inflater = None
+    for chunk in chunks:
+        if inflater is None:
+            # .xml.gz files are usually served without Content-Encoding
+            if chunk[:2] != GZIP_MAGIC:
+                yield chunk
+                yield from chunks
+                return
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        data = inflater.decompress(chunk, SITEMAP_CHUNK_SIZE)
+        while data:
+            yield data
+            data = inflater.decompress(inflater.unconsumed_tail, SITEMAP_CHUNK_SIZE)
+
+
+def _iter_sitemap_entries(url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Stream one sitemap document.
+    Yields (kind, loc, lastmod) with kind "url" or "sitemap".
+    Gzip is inflated chunk by chunk and elements are cleared as soon
+    as they are consumed, so memory stays flat for 50k-entry files.
+    """
+    try:
+        resp = requests.get(url, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT, stream=True)
+    except requests.RequestException as e:
+        logger.warning(f"Sitemap request failed: {url} | {e}")
+        return
+
+    with resp:
+        if resp.status_code != 200:
+            logger.warning(f"Non-200 sitemap response ({resp.status_code}): {url}")
+            return
+
+        parser = XMLPullParser(events=("start", "end"))
+        root = None
+        depth = 0
+        loc = lastmod = None
+
+        chunks = resp.raw.stream(SITEMAP_CHUNK_SIZE, decode_content=True)
+        for chunk in _inflate(chunks):
+            try:
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    name = _local_name(elem.tag)
+                    if event == "start":
+                        if root is None:
+                            root = elem
+                        depth += 1
+                        continue
+                    depth -= 1
+                    # <urlset>/<url>/<loc> only: extension children such as
+                    # <image:image><image:loc> sit deeper and are ignored
+                    if depth == 2 and name == "loc":
+                        loc = (elem.text or "").strip()
+                    elif depth == 2 and name == "lastmod":
+                        lastmod = (elem.text or "").strip() or None
+                    elif depth == 1 and name in ("url", "sitemap"):
+                        if loc:
+                            yield name, loc, lastmod
+                        loc = lastmod = None
+                        root.clear()
+            except ParseError as e:
+                logger.warning(f"Malformed sitemap: {url} | {e}")
+                return
+
+
+def _parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _is_product_sitemap(url: str) -> bool:
+    return "product" in urlparse(url).path.lower()
+
+
+def _looks_like_product_path(url: str) -> bool:
+    path = urlparse(url).path.lower()
+    return any(hint in path for hint in PRODUCT_URL_HINTS)
+
+
+def iter_sitemap_products(
+    sitemap_url: str,
+    since: Optional[datetime] = None,
+    depth: int = 0,
+    classifier: Optional[ProductUrlClassifier] = None,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Yield (product_url, lastmod) from a sitemap or sitemap index.
+    - recurses into index files (product sitemaps only, when the index names any)
+    - entries in product sitemaps (Shopify sitemap_products_1.xml) are trusted;
+      entries elsewhere must look like a product path (or pass the classifier)
+    - since: skip entries whose lastmod is older
+    """
+    children: List[str] = []
+    trusted = _is_product_sitemap(sitemap_url)
+
+    for kind, loc, lastmod in _iter_sitemap_entries(sitemap_url):
+        if kind == "sitemap":
+            # index files are small (<= 50k child URLs)
+            children.append(loc)
+            continue
+
+        if not trusted:
+            if classifier is not None:
+                if not classifier.accept(loc):
+                    continue
+            elif not _looks_like_product_path(loc):
+                continue
+        if not looks_like_product_url(loc):
+            continue
+        if since is not None:
+            modified = _parse_lastmod(lastmod)
+            if modified is not None and modified < since:
+                continue
+        yield canonicalize_url(loc), lastmod
+
+    if not children or depth >= SITEMAP_MAX_DEPTH:
+        return
+
+    product_children = [c for c in children if _is_product_sitemap(c)]
+    for child in product_children or children:
+        if EXCLUDE_URL_PATTERNS.search(urlparse(child).path):
+            continue
+        logger.info(f"Fetching sitemap: {child}")
+        time.sleep(REQUEST_DELAY_SEC)
+        yield from iter_sitemap_products(child, since=since, depth=depth + 1, classifier=classifier)
+
+
+def discover_from_sitemaps(
+    site_url: str,
+    since: Optional[datetime] = None,
+    seen: Optional[BloomFilter] = None,
+    classifier: Optional[ProductUrlClassifier] = None,
+) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Sitemap-based product discovery for one site.
+    Reads robots.txt sitemap entries and streams (product_url, lastmod).
+    """
+    if seen is None:
+        seen = BloomFilter(SEEN_FILTER_CAPACITY, SEEN_FILTER_FP_RATE)
+    for sitemap_url in sitemaps_from_robots(site_url):
+        logger.info(f"Fetching sitemap: {sitemap_url}")
+        for url, lastmod in iter_sitemap_products(sitemap_url, since=since, classifier=classifier):
+            if seen.add(url):
+                yield url, lastmod
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
 
-def resolve_product_urls(
+def iter_product_urls(
     validated_product_urls: Iterable[str],
     validated_category_urls: Iterable[str],
-) -> List[str]:
+    validated_site_urls: Iterable[str] = (),
+    since: Optional[datetime] = None,
+    stats: Optional[Dict] = None,
+    classifier: Optional[ProductUrlClassifier] = None,
+    pagination: Optional[PaginationDetector] = None,
+    known_path: Optional[str] = None,
+    lastmods: Optional[Dict[str, str]] = None,
+) -> Iterator[str]:
     """
-    Main entry point for Pipeline 1.
-    Returns a deduplicated, canonical list of product URLs.
+    Streaming form of resolve_product_urls: yields each canonical product
+    URL once. Dedupe goes through one Bloom filter, so memory stays flat
+    however many URLs are discovered. Direct product URLs are never
+    scored by the classifier, only discovered ones. lastmods, when given,
+    is filled with product URL → sitemap lastmod for entries that have one.
     """
-
-    resolved: Set[str] = set()
+    seen = BloomFilter(SEEN_FILTER_CAPACITY, SEEN_FILTER_FP_RATE)
 
     # 1. Direct product URLs
     for url in validated_product_urls:
         canon = canonicalize_url(url)
-        if looks_like_product_url(canon):
-            resolved.add(canon)
+        if looks_like_product_url(canon) and seen.add(canon):
+            yield canon
 
     # 2. Category discovery
-    for category_url in validated_category_urls:
-        canon_category = canonicalize_url(category_url)
-        discovered = discover_from_category(canon_category)
-        resolved.update(discovered)
+    categories = [canonicalize_url(url, keep_query=True) for url in validated_category_urls]
+    yield from discover_from_categories(
+        categories,
+        seen=seen,
+        stats=stats,
+        classifier=classifier,
+        pagination=pagination,
+        known_path=known_path,
+    )
+
+    # 3. Sitemap discovery
+    for site_url in validated_site_urls:
+        for url, lastmod in discover_from_sitemaps(site_url, since=since, seen=seen, classifier=classifier):
+            if lastmods is not None and lastmod:
+                lastmods[url] = lastmod
+            yield url
+
+    if classifier is not None and stats is not None:
+        stats["url_classifier"] = classifier.stats()
+
+
+def resolve_product_urls(
+    validated_product_urls: Iterable[str],
+    validated_category_urls: Iterable[str],
+    validated_site_urls: Iterable[str] = (),
+    since: Optional[datetime] = None,
+    stats: Optional[Dict] = None,
+    classifier: Optional[ProductUrlClassifier] = None,
+    pagination: Optional[PaginationDetector] = None,
+    known_path: Optional[str] = None,
+    lastmods: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """
+    Main entry point for Pipeline 1.
+    Returns a deduplicated, canonical list of product URLs.
+    Site URLs are discovered through their sitemaps; since skips
+    sitemap entries not modified after that time. classifier scores
+    discovered links (see inputs/url_classifier.py); pagination and
+    known_path: see discover_from_categories. lastmods collects sitemap
+    lastmod per product URL, so later stages can skip unchanged products.
+    """
+
+    resolved = sorted(iter_product_urls(
+        validated_product_urls,
+        validated_category_urls,
+        validated_site_urls,
+        since=since,
+        stats=stats,
+        classifier=classifier,
+        pagination=pagination,
+        known_path=known_path,
+        lastmods=lastmods,
+    ))
 
     logger.info(f"Resolved {len(resolved)} unique product URLs")
-    return sorted(resolved)
+    return resolved
 
 
 # ---------------------------------------------------------------------------
@@ -188,13 +548,24 @@ def resolve_product_urls(
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    from inputs.input_loader import InputLoader
+
     # Example placeholders
     validated_product_urls = []
     validated_category_urls = []
+    validated_site_urls = []
 
+    classifier = ProductUrlClassifier(
+        InputLoader().load_url_patterns(),
+        templates_path="output/url_templates.json",
+    )
     product_urls = resolve_product_urls(
         validated_product_urls,
         validated_category_urls,
+        validated_site_urls,
+        classifier=classifier,
+        pagination=PaginationDetector(state_path="output/pagination.json"),
+        known_path="output/known_product_urls.bloom",
     )
 
     for url in product_urls:
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+logger = logging.getLogger(__name__)
+
+# host prefixes that serve the same catalog
+HOST_PREFIXES = ("www.", "m.")
+
+# generic product path hints (Shopify /products/, Amazon /dp/, Flipkart /p/, ...)
+PRODUCT_HINTS = re.compile(r"/(?:products?|item|items|dp|p)/", re.IGNORECASE)
+
+# path segments that never lead to a product page
+NAV_SEGMENTS = {
+    "cart", "checkout", "account", "accounts", "login", "signin", "sign-in",
+    "logout", "register", "signup", "wishlist", "compare", "search", "pages",
+    "policies", "blog", "blogs", "article", "articles", "news", "support",
+    "help", "faq", "contact", "about", "about-us", "careers", "stores",
+}
+
+# query parameters of filtered / sorted / paginated listings
+LISTING_PARAMS = {"q", "query", "sort", "sort_by", "order", "filter", "page", "view", "price", "color", "size"}
+
+NON_HTML_EXTENSIONS = re.compile(
+    r"\.(?:jpe?g|png|gif|webp|svg|ico|css|js|json|xml|pdf|zip|mp4|woff2?)$",
+    re.IGNORECASE,
+)
+
+NUMBER = re.compile(r"^\d+$")
+IDENTIFIER = re.compile(r"^(?=[a-z]*\d)(?=\d*[a-z])[a-z0-9_]{6,}$")
+SLUG = re.compile(r"^[a-z0-9]+(?:[-_][a-z0-9]+){2,}(?:\.html?)?$")
+
+STAT_KEYS = ("scored", "accepted", "rejected", "checked", "confirmed", "false_positives")
+
+
+def url_template(path: str) -> str:
+    """
+    Path shape with variable segments replaced:
+    /products/blue-cotton-shirt → products/{slug},
+    /moto-g06-power/p/itm3d9a1c → {slug}/p/{id}
+    """
+    parts = []
+    for segment in path.lower().split("/"):
+        if not segment:
+            continue
+        if NUMBER.match(segment):
+            parts.append("{n}")
+        elif SLUG.match(segment):
+            parts.append("{slug}")
+        elif IDENTIFIER.match(segment):
+            parts.append("{id}")
+        else:
+            parts.append(segment)
+    return "/".join(parts)
+
+
+class ProductUrlClassifier:
+    """
+    Scores discovered links (0..1) before they are queued for fetching.
+    Handles:
+    - per-domain product / reject regexes (inputs/url_patterns.yaml)
+    - path templates learned from URLs that parsed into products (and
+      those that did not), persisted across runs; a template decides
+      once it has min_samples outcomes
+    - generic fallback: nav / account / cart segments, filtered listing
+      queries and asset links are rejected, product path hints accepted
+    - per-domain accepted / rejected (fetches avoided) counts and
+      precision of accepted URLs against parse outcomes
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        templates_path: Optional[str] = None,
+        threshold: float = 0.5,
+        min_samples: int = 5,
+    ):
+        self.patterns: Dict[str, Tuple[List[re.Pattern], List[re.Pattern]]] = {
+            domain.lower(): (
+                [re.compile(p) for p in (rules or {}).get("product") or []],
+                [re.compile(p) for p in (rules or {}).get("reject") or []],
+            )
+            for domain, rules in (patterns or {}).items()
+        }
+        self.templates_path = templates_path
+        self.threshold = threshold
+        self.min_samples = min_samples
+
+        # domain → template → [products, outcomes]
+        self.templates: Dict[str, Dict[str, List[int]]] = {}
+        self.domain_stats: Dict[str, Dict[str, int]] = {}
+
+        if templates_path and os.path.exists(templates_path):
+            self._load_templates()
+
+    def _domain(self, host: str) -> str:
+        host = host.lower().split(":")[0]
+        for prefix in HOST_PREFIXES:
+            if host.startswith(prefix):
+                return host[len(prefix):]
+        return host
+
+    def _stats(self, domain: str) -> Dict[str, int]:
+        if domain not in self.domain_stats:
+            self.domain_stats[domain] = dict.fromkeys(STAT_KEYS, 0)
+        return self.domain_stats[domain]
+
+    # -----------------------------
+    # Scoring
+    # -----------------------------
+    def _score(self, parsed) -> Tuple[str, float]:
+        domain = self._domain(parsed.netloc)
+        target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+        if parsed.scheme not in ("http", "https") or NON_HTML_EXTENSIONS.search(parsed.path):
+            return domain, 0.0
+
+        product, reject = self.patterns.get(domain, ((), ()))
+        if any(p.search(target) for p in reject):
+            return domain, 0.0
+        if any(p.search(target) for p in product):
+            return domain, 1.0
+
+        counts = self.templates.get(domain, {}).get(url_template(parsed.path))
+        if counts and counts[1] >= self.min_samples:
+            # Laplace-smoothed share of this shape that parsed into products
+            return domain, (counts[0] + 1) / (counts[1] + 2)
+
+        segments = [s for s in parsed.path.lower().split("/") if s]
+        if not segments or NAV_SEGMENTS.intersection(segments):
+            return domain, 0.0
+        if PRODUCT_HINTS.search(parsed.path + "/"):
+            return domain, 0.9
+
+        score = 0.3
+        if any(key.lower() in LISTING_PARAMS for key, _ in parse_qsl(parsed.query)):
+            score -= 0.2
+        if SLUG.match(segments[-1]) or IDENTIFIER.match(segments[-1]):
+            score += 0.2
+        if len(segments) == 1:
+            score -= 0.2
+        return domain, max(0.0, score)
+
+    def score(self, url: str) -> float:
+        """Likelihood (0..1) that url is a product page."""
+        return self._score(urlparse(url))[1]
+
+    def accept(self, url: str) -> bool:
+        """Score one discovered link; True if it should be fetched."""
+        domain, score = self._score(urlparse(url))
+        accepted = score >= self.threshold
+
+        stats = self._stats(domain)
+        stats["scored"] += 1
+        stats["accepted" if accepted else "rejected"] += 1
+        return accepted
+
+    # -----------------------------
+    # Learning
+    # -----------------------------
+    def record(self, url: str, is_product: bool):
+        """
+        Parse outcome of a fetched URL: counts toward precision when the
+        URL would have been accepted, and toward its path template.
+        """
+        parsed = urlparse(url)
+        domain, score = self._score(parsed)
+
+        if score >= self.threshold:
+            stats = self._stats(domain)
+            stats["checked"] += 1
+            stats["confirmed" if is_product else "false_positives"] += 1
+
+        counts = self.templates.setdefault(domain, {}).setdefault(url_template(parsed.path), [0, 0])
+        counts[0] += int(is_product)
+        counts[1] += 1
+
+    def _load_templates(self):
+        try:
+            with open(self.templates_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"URL templates not loaded: {self.templates_path} | {e}")
+            return
+        self.templates = {
+            domain: {template: list(counts) for template, counts in templates.items()}
+            for domain, templates in data.items()
+        }
+
+    def save(self):
+        if not self.templates_path:
+            return
+        os.makedirs(os.path.dirname(self.templates_path) or ".", exist_ok=True)
+        tmp_path = self.templates_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.templates, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.templates_path)
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict]:
+        result = {}
+        for domain in sorted(set(self.domain_stats) | set(self.templates)):
+            s = self.domain_stats.get(domain) or dict.fromkeys(STAT_KEYS, 0)
+            learned = self.templates.get(domain, {})
+            result[domain] = {
+                **s,
+                "fetches_avoided": s["rejected"],
+                "precision": round(s["confirmed"] / s["checked"], 3) if s["checked"] else None,
+                "templates": sum(1 for counts in learned.values() if counts[1] >= self.min_samples),
+            }
+        return result
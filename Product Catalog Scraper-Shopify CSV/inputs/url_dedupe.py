@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from inputs.crawl_frontier import url_hash64
+
+logger = logging.getLogger(__name__)
+
+SPILL_QUERY_CHUNK = 500  # SQLite host-parameter limit is 999 on older builds
+
+
+def _signed(h: int) -> int:
+    """SQLite INTEGER is signed 64-bit."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+class UrlDeduper:
+    """
+    Exact-ish URL dedupe on 64-bit hashed keys instead of full strings.
+    Handles:
+    - in-memory set of blake2b-64 hashes (~3x smaller than the URLs;
+      a collision needs ~5 billion distinct URLs to reach even odds)
+    - bounded memory: past max_memory_keys the set is spilled to a
+      SQLite table (spill_path) and lookups check both; without a spill
+      path the set simply keeps growing
+    - batch lookups (add_many) with one SQLite query per 500 keys
+    Unlike the crawl Bloom filter there are no false positives beyond
+    hash collisions, so a new URL is never dropped by chance.
+    """
+
+    def __init__(self, max_memory_keys: int = 2_000_000, spill_path: Optional[str] = None):
+        self.max_memory_keys = max(1, max_memory_keys)
+        self.spill_path = spill_path
+        self.keys: set = set()
+        self.conn: Optional[sqlite3.Connection] = None
+        self.counters = {
+            "checked": 0,
+            "duplicates": 0,
+            "spilled_keys": 0,
+            "spills": 0,
+        }
+
+    # -----------------------------
+    # Spill
+    # -----------------------------
+    def _open_spill(self):
+        Path(self.spill_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        # a spill file only lives for one run
+        self.conn.execute("DROP TABLE IF EXISTS seen")
+        self.conn.execute("CREATE TABLE seen (h INTEGER PRIMARY KEY) WITHOUT ROWID")
+
+    def _spill(self):
+        if self.conn is None:
+            self._open_spill()
+        self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((_signed(h),) for h in self.keys))
+        self.conn.commit()
+        self.counters["spilled_keys"] += len(self.keys)
+        self.counters["spills"] += 1
+        logger.info(f"URL dedupe: spilled {len(self.keys)} keys to {self.spill_path}")
+        self.keys.clear()
+
+    def _spilled(self, hashes: List[int]) -> set:
+        """Which of hashes are already in the spill table."""
+        if self.conn is None or not hashes:
+            return set()
+        found = set()
+        for start in range(0, len(hashes), SPILL_QUERY_CHUNK):
+            chunk = [_signed(h) for h in hashes[start:start + SPILL_QUERY_CHUNK]]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT h FROM seen WHERE h IN ({placeholders})", chunk)
+            found.update(h + (1 << 64) if h < 0 else h for (h,) in rows)
+        return found
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    def add(self, url: str) -> bool:
+        """Adds url; returns True if it was not seen before."""
+        return self.add_many((url,))[0]
+
+    def add_many(self, urls: Iterable[str]) -> List[bool]:
+        """add() for a batch, in order (repeats within the batch count too)."""
+        hashes = [url_hash64(url) for url in urls]
+        spilled = self._spilled([h for h in hashes if h not in self.keys])
+
+        result = []
+        for h in hashes:
+            new = h not in self.keys and h not in spilled
+            if new:
+                self.keys.add(h)
+            result.append(new)
+
+        self.counters["checked"] += len(hashes)
+        self.counters["duplicates"] += len(hashes) - sum(result)
+        if self.spill_path and len(self.keys) >= self.max_memory_keys:
+            self._spill()
+        return result
+
+    def __len__(self) -> int:
+        return len(self.keys) + self.counters["spilled_keys"]
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        return {
+            "unique": len(self),
+            "memory_keys": len(self.keys),
+            **self.counters,
+        }
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            Path(self.spill_path).unlink(missing_ok=True)
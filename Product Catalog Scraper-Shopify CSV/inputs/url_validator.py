@@ -1,6 +1,10 @@
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 import re
 
+from inputs.url_dedupe import UrlDeduper
+
 TRACKING_PARAM_PREFIXES = (
     "utm_",
 )
@@ -12,6 +16,12 @@ TRACKING_PARAM_EXACT = {
     "yclid",
 }
 
+# distinct URLs remembered by normalize_url (repeats skip the parse);
+# covers the ingest → fetch distance (batch + feed window), ~20 MB
+NORMALIZE_CACHE_SIZE = 65_536
+
+SCHEME = re.compile(r"^https?://", re.IGNORECASE)
+
 
 # -----------------------------
 # Core helpers
@@ -26,20 +36,24 @@ def is_valid_url(url: str) -> bool:
         return False
 
 
-def normalize_url(url: str) -> str | None:
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_url(url: str, keep_query: bool = True, force_https: bool = True) -> str | None:
     """
     Normalize a URL by:
-    - forcing https
+    - forcing https (force_https=False only lowercases the scheme)
+    - lowercasing the host
     - stripping fragments
-    - removing tracking query params
+    - removing tracking query params (keep_query=False drops the query)
     - normalizing trailing slash
+    Shared by input validation, product identity keys, the HTTP cache
+    and discovery; memoized, since the same URLs recur across stages.
     """
     url = url.strip()
     if not url:
         return None
 
     # If scheme missing, assume https
-    if not re.match(r"^https?://", url):
+    if not SCHEME.match(url):
         url = "https://" + url
 
     if not is_valid_url(url):
@@ -47,12 +61,11 @@ def normalize_url(url: str) -> str | None:
 
     parsed = urlparse(url)
 
-    # Force https
-    scheme = "https"
+    scheme = "https" if force_https else parsed.scheme.lower()
 
     # Clean query params
     clean_params = []
-    for key, value in parse_qsl(parsed.query, keep_blank_values=True):
+    for key, value in parse_qsl(parsed.query if keep_query else "", keep_blank_values=True):
         if key.lower().startswith(TRACKING_PARAM_PREFIXES):
             continue
         if key.lower() in TRACKING_PARAM_EXACT:
@@ -80,6 +93,27 @@ def normalize_url(url: str) -> str | None:
     return normalized
 
 
+def iter_lines(path: str) -> Iterator[str]:
+    """Non-empty stripped lines of a text file, streamed."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+    except FileNotFoundError:
+        return
+
+
+def iter_validated(urls: Iterable[str], seen: Optional[UrlDeduper] = None) -> Iterator[str]:
+    """Normalized, valid URLs, each once (dedupe on hashed keys)."""
+    seen = seen if seen is not None else UrlDeduper()
+    for url in urls:
+        normalized = normalize_url(url)
+        if normalized and seen.add(normalized):
+            yield normalized
+
+
 # -----------------------------
 # Public API
 # -----------------------------
@@ -92,39 +126,10 @@ def load_and_validate(product_file: str, category_file: str):
         validated_product_urls (list[str])
         validated_category_urls (list[str])
     """
+    seen = UrlDeduper()
 
-    def read_lines(path: str) -> list[str]:
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return [line.strip() for line in f if line.strip()]
-        except FileNotFoundError:
-            return []
-
-    raw_product_urls = read_lines(product_file)
-    raw_category_urls = read_lines(category_file)
-
-    normalized_product_urls = []
-    normalized_category_urls = []
-
-    seen = set()
-
-    for url in raw_product_urls:
-        normalized = normalize_url(url)
-        if not normalized:
-            continue
-        if normalized in seen:
-            continue
-        seen.add(normalized)
-        normalized_product_urls.append(normalized)
-
-    for url in raw_category_urls:
-        normalized = normalize_url(url)
-        if not normalized:
-            continue
-        if normalized in seen:
-            continue
-        seen.add(normalized)
-        normalized_category_urls.append(normalized)
+    normalized_product_urls = list(iter_validated(iter_lines(product_file), seen))
+    normalized_category_urls = list(iter_validated(iter_lines(category_file), seen))
 
     return normalized_product_urls, normalized_category_urls
 
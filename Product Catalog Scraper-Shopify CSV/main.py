@@ -1,5 +1,21 @@
+import argparse
+import json
+import sys
+import time
+import yaml
+from pathlib import Path
+
 from inputs.input_loader import InputLoader
+from inputs.product_canonicalizer import ProductCanonicalizer
+from inputs.url_classifier import ProductUrlClassifier
+from inputs.url_dedupe import UrlDeduper
+from inputs.url_validator import normalize_url
 from src.fetch.fetcher import Fetcher
+from src.fetch.page_archive import PageArchiveReader
+from src.fetch.shopify_bulk import ShopifyBulkFetcher
+from src.fetch.cassette import Cassette
+from src.fetch.work_queue import WorkQueue, WorkQueueServer, open_queue
+from src.fetch.queue_worker import QueueWorker, run_coordinator
 from datetime import datetime
 from src.parse.parser_router import ParserRouter
 from src.normalize.normalizer import Normalizer
@@ -8,11 +24,15 @@ from src.map.mapper import ShopifyMapper
 from src.validate.validator import Validator
 from src.export.exporter import Exporter
 
+process_started = time.monotonic()
 stats = {
     "start_time": datetime.utcnow().isoformat(),
     "total_urls": 0,
+    "collapsed_urls": 0,
     "fetched_pages": 0,
     "failed_fetch": 0,
+    "blocked_pages": 0,
+    "skipped_pages": 0,
     "parsed_products": 0,
     "normalized_products": 0,
     "duplicates_removed": 0,
@@ -25,16 +45,250 @@ stats = {
 }
 
 # 
-inputs = InputLoader()
-products = inputs.load_product_urls()
+arg_parser = argparse.ArgumentParser(description="Scrape product pages into a Shopify import CSV")
+arg_parser.add_argument(
+    "--from-archive",
+    metavar="PATH",
+    help="rebuild the catalog from a page archive instead of fetching",
+)
+arg_parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="skip URLs the fetch journal already completed in a previous run",
+)
+cassette_modes = arg_parser.add_mutually_exclusive_group()
+cassette_modes.add_argument("--record", metavar="PATH", help="record every fetched response into a cassette")
+cassette_modes.add_argument("--replay", metavar="PATH", help="serve fetches from a cassette (no network)")
+arg_parser.add_argument(
+    "--queue",
+    metavar="TARGET",
+    help="work queue: shared SQLite path or http://host:port of a queue server",
+)
+queue_commands = arg_parser.add_mutually_exclusive_group()
+queue_commands.add_argument("--enqueue", action="store_true", help="load product URLs into the work queue and exit")
+queue_commands.add_argument("--worker", action="store_true", help="claim, fetch and parse queue batches until drained")
+queue_commands.add_argument("--coordinator", action="store_true", help="show queue depth and per-worker throughput")
+queue_commands.add_argument("--serve-queue", metavar="HOST:PORT", help="serve the SQLite queue over HTTP (stand-in server)")
+arg_parser.add_argument(
+    "--from-parsed",
+    metavar="DIR",
+    help="build the catalog from worker output (*.jsonl parsed products)",
+)
+args = arg_parser.parse_args()
+
+with open("config.yaml", "r", encoding="utf-8") as f:
+    config = yaml.safe_load(f) or {}
+scraping = config.get("scraping", {})
+http_cache = scraping.get("http_cache", {})
+archive = scraping.get("archive", {})
+breaker = scraping.get("circuit_breaker", {})
+streaming = scraping.get("streaming", {})
+pool = scraping.get("pool", {})
+shopify_json = scraping.get("shopify_json", {})
+journal = scraping.get("journal", {})
+use_journal = journal.get("enabled") or args.resume
+work_queue = scraping.get("queue", {})
+http2 = scraping.get("http2", {})
+session_state = scraping.get("session_state", {})
+block_detection = scraping.get("block_detection", {})
+canonical_keys = scraping.get("canonical_keys", {})
+url_classifier = scraping.get("url_classifier", {})
+ingest = scraping.get("ingest", {})
+proxy_config = scraping.get("proxies", {})
+cassette_config = scraping.get("cassette", {})
+
+
+def build_cassette():
+    if args.record:
+        return Cassette(args.record, mode="record")
+    if args.replay:
+        return Cassette(
+            args.replay,
+            mode="replay",
+            latency=cassette_config.get("latency", "recorded"),
+            latency_scale=cassette_config.get("latency_scale", 1.0),
+            error_rate=cassette_config.get("error_rate", 0.0),
+            status_error_rate=cassette_config.get("status_error_rate", 0.0),
+            seed=cassette_config.get("seed", 0),
+        )
+    return None
+
+
+def build_canonicalizer(inputs: InputLoader):
+    if not canonical_keys.get("enabled", True):
+        return None
+    return ProductCanonicalizer(
+        inputs.load_canonical_rules(canonical_keys.get("rules", "canonical_rules.yaml")),
+        seen=UrlDeduper(
+            max_memory_keys=ingest.get("dedupe_memory_keys", 2_000_000),
+            spill_path=ingest.get("dedupe_spill_path"),
+        ),
+    )
+
+
+def iter_product_batches(inputs: InputLoader, canonicalizer):
+    """Product URL batches streamed from the input file, one URL per product identity when canonical keys are on."""
+    for batch in inputs.iter_url_batches(batch_size=ingest.get("batch_size", 1000)):
+        yield canonicalizer.collapse(batch) if canonicalizer else batch
+
+
+def build_url_classifier(inputs: InputLoader) -> ProductUrlClassifier:
+    return ProductUrlClassifier(
+        inputs.load_url_patterns(url_classifier.get("patterns", "url_patterns.yaml")),
+        templates_path=url_classifier.get("templates", "output/url_templates.json"),
+        threshold=url_classifier.get("threshold", 0.5),
+        min_samples=url_classifier.get("min_samples", 5),
+    )
+
+
+def build_fetcher() -> Fetcher:
+    return Fetcher(
+        timeout=scraping.get("timeout", 15),
+        max_retries=scraping.get("retries", 3),
+        retry_budget=scraping.get("retry_budget"),
+        concurrency=scraping.get("concurrency", 1),
+        per_domain_concurrency=scraping.get("per_domain_concurrency", 2),
+        adaptive_concurrency=scraping.get("adaptive_concurrency", False),
+        max_per_domain_concurrency=scraping.get("max_per_domain_concurrency", 16),
+        http2_domains=http2.get("domains"),
+        session_state_path=session_state.get("path", "output/session_state.sqlite") if session_state.get("enabled") else None,
+        session_cookie_ttl=session_state.get("session_cookie_ttl_hours", 12) * 3600,
+        redirect_ttl=session_state.get("redirect_ttl_hours", 24) * 3600,
+        block_detection=block_detection.get("enabled", False),
+        block_cooloff=block_detection.get("cooloff_sec", 60),
+        block_max_cooloff=block_detection.get("max_cooloff_sec", 900),
+        block_markers=block_detection.get("markers"),
+        feed_window=ingest.get("feed_window", 5000),
+        domain_rate=scraping.get("domain_rate", 2.0),
+        domain_rates=scraping.get("domain_rates"),
+        cache_path=http_cache.get("path") if http_cache.get("enabled") else None,
+        cache_max_bytes=int(http_cache.get("max_mb", 512)) * 1024 * 1024,
+        archive_path=archive.get("path") if archive.get("enabled") else None,
+        breaker_error_rate=breaker.get("error_rate", 0.5),
+        breaker_min_requests=breaker.get("min_requests", 10),
+        breaker_cooldown=breaker.get("cooldown_sec", 60.0),
+        max_body_bytes=int(streaming.get("max_body_mb", 5) * 1024 * 1024),
+        html_only=streaming.get("html_only", True),
+        structured_data_only=streaming.get("structured_data_only", False),
+        structured_data_domains=streaming.get("structured_data_domains"),
+        pool_connections=pool.get("connections", 10),
+        pool_maxsize=pool.get("maxsize", 10),
+        max_sessions=pool.get("max_sessions", 256),
+        session_idle_timeout=pool.get("idle_timeout_sec", 300),
+        journal_path=journal.get("path", "output/fetch_journal.sqlite") if use_journal else None,
+        journal_batch_size=journal.get("batch_size", 500),
+        resume=args.resume,
+        proxies=proxy_config.get("pool"),
+        proxy_base_cooldown=proxy_config.get("base_cooldown_sec", 30),
+        proxy_max_cooldown=proxy_config.get("max_cooldown_sec", 1800),
+        cassette=build_cassette(),
+    )
+
+
+# 
+if args.enqueue or args.worker or args.coordinator or args.serve_queue:
+    queue_target = args.queue or work_queue.get("path", "output/work_queue.sqlite")
+    lease_seconds = work_queue.get("lease_sec", 120)
+
+    if args.serve_queue:
+        host, _, port = args.serve_queue.rpartition(":")
+        server = WorkQueueServer(WorkQueue(queue_target, lease_seconds=lease_seconds), host or "127.0.0.1", int(port))
+        print(f"Serving {queue_target} at {server.url}")
+        server.serve_forever()
+
+    queue = open_queue(queue_target, lease_seconds=lease_seconds)
+    if args.enqueue:
+        inputs = InputLoader()
+        canonicalizer = build_canonicalizer(inputs)
+        added = sum(queue.enqueue(batch) for batch in iter_product_batches(inputs, canonicalizer))
+        collapsed = canonicalizer.collapsed if canonicalizer else 0
+        if canonicalizer:
+            canonicalizer.close()
+        print(f"Enqueued {added} new URLs ({collapsed} duplicate product URLs collapsed)")
+    elif args.coordinator:
+        run_coordinator(queue, refresh=work_queue.get("refresh_sec", 5))
+    else:
+        fetcher = build_fetcher()
+        worker = QueueWorker(
+            queue,
+            fetcher,
+            output_dir=work_queue.get("output_dir", "output/parsed"),
+            batch_size=work_queue.get("batch_size", 50),
+            heartbeat_interval=lease_seconds / 4,
+        )
+        print(f"Worker {worker.worker_id}: {worker.run()}")
+        fetcher.shutdown()
+    queue.close()
+    sys.exit(0)
+
+fetcher = None
+bulk = None
+canonicalizer = None
+classifier = None
+shopify_products = []
+loaded_products = []
+if args.from_parsed:
+    for path in sorted(Path(args.from_parsed).glob("*.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            loaded_products.extend(json.loads(line) for line in f if line.strip())
+    raw_pages = []
+    url_count = len(loaded_products)
+elif args.from_archive:
+    reader = PageArchiveReader(args.from_archive)
+    raw_pages = list(reader)
+    reader.close()
+    url_count = len(raw_pages)
+else:
+    inputs = InputLoader()
+    canonicalizer = build_canonicalizer(inputs)
+    if url_classifier.get("enabled", True):
+        classifier = build_url_classifier(inputs)
+
+    fetcher = build_fetcher()
+    if use_journal and not fetcher.archive:
+        print("Fetch journal: archive disabled, completed pages will be refetched on --resume")
+    if shopify_json.get("enabled", True):
+        bulk = ShopifyBulkFetcher(
+            fetcher,
+            catalog_threshold=shopify_json.get("catalog_threshold", 50),
+        )
+
+    raw_pages = []
+    ingested = {"urls": 0}
+
+    def pending_urls():
+        """Input batches through resume / Shopify JSON, pulled by the fetcher as it needs work (off the event loop in async mode)."""
+        for batch in iter_product_batches(inputs, canonicalizer):
+            ingested["urls"] += len(batch)
+            if classifier and url_classifier.get("filter_input", False):
+                batch = [url for url in batch if classifier.accept(url)]
+            if args.resume:
+                restored, batch = fetcher.resume(batch)
+                raw_pages.extend(restored)
+            if bulk:
+                # probes and JSON endpoints go through the fetcher's scheduler
+                batch = bulk.route(batch)
+            yield from batch
 
-fetcher = Fetcher()
-raw_pages = fetcher.fetch_urls(products)
+    raw_pages += fetcher.fetch_urls(pending_urls())
+    if bulk:
+        raw_pages += bulk.pages
+        shopify_products = bulk.products
+    url_count = ingested["urls"]
 # 
 from src.parse.parser_router import ParserRouter
 
 parser = ParserRouter()
-parsed_data = parser.parse_pages(raw_pages)
+parsed_data = parser.parse_pages(raw_pages) + shopify_products + loaded_products
+if classifier:
+    # parse outcomes train the discovery URL classifier (templates persist)
+    product_sources = {p["source_url"] for p in parsed_data if p.get("title")}
+    for page in raw_pages:
+        if page.get("content"):
+            classifier.record(page["url"], page["url"] in product_sources)
+    for product in shopify_products:
+        classifier.record(product["source_url"], True)
+    classifier.save()
 # 
 from src.normalize.normalizer import Normalizer
 
@@ -56,9 +310,23 @@ validator = Validator()
 validated_rows, report = validator.validate(shopify_rows)
 validator.save_report(report)
 # 
-stats["total_urls"] = len(products)
-stats["fetched_pages"] = len([p for p in raw_pages if p["status"] == 200])
-stats["failed_fetch"] = len([p for p in raw_pages if p["status"] != 200])
+stats["collapsed_urls"] = canonicalizer.collapsed if canonicalizer else 0
+stats["total_urls"] = url_count + stats["collapsed_urls"]
+if canonicalizer:
+    stats["canonical_keys"] = canonicalizer.stats()
+    stats["ingest"] = {"dedupe": canonicalizer.seen.stats()}
+    canonicalizer.close()
+if fetcher:
+    stats.setdefault("ingest", {})["normalize_cache"] = normalize_url.cache_info()._asdict()
+    if fetcher.first_dispatch_at is not None:
+        stats["first_fetch_ms"] = round((fetcher.first_dispatch_at - process_started) * 1000, 1)
+if classifier:
+    stats["url_classifier"] = classifier.stats()
+    stats["url_classifier_scope"] = "input" if url_classifier.get("filter_input", False) else "discovery"
+stats["fetched_pages"] = len([p for p in raw_pages if p["status"] == 200]) + len(shopify_products) + len(loaded_products)
+stats["failed_fetch"] = len([p for p in raw_pages if p["status"] not in (200, "blocked", "skipped")])
+stats["blocked_pages"] = len([p for p in raw_pages if p["status"] == "blocked"])
+stats["skipped_pages"] = len([p for p in raw_pages if p["status"] == "skipped"])
 stats["parsed_products"] = len(parsed_data)
 stats["normalized_products"] = len(normalized_data)
 stats["duplicates_removed"] = len(normalized_data) - len(unique_products)
@@ -66,6 +334,11 @@ stats["mapped_products"] = len(unique_products)
 stats["validated_rows"] = len(validated_rows)
 stats["validation_errors"] = report["summary"]["errors"]
 stats["validation_warnings"] = report["summary"]["warnings"]
+if fetcher:
+    stats["fetch"] = fetcher.get_stats()
+    if bulk:
+        stats["fetch"]["shopify_json"] = bulk.stats
+    fetcher.shutdown()
 # 
 from src.export.exporter import Exporter
 exporter = Exporter("output")
@@ -76,8 +349,12 @@ stats["exported_json"] = export_results["json"]
 stats["end_time"] = datetime.utcnow().isoformat()
 # 
 print("Total URLs: "+str(stats["total_urls"]))
+print("Collapsed Duplicate URLs: "+str(stats["collapsed_urls"]))
+print("Time To First Fetch (ms): "+str(stats.get("first_fetch_ms")))
 print("Fetched Pages: "+str(stats["fetched_pages"]))
 print("Failed Fetch: "+str(stats["failed_fetch"]))
+print("Blocked Pages: "+str(stats["blocked_pages"]))
+print("Skipped Pages: "+str(stats["skipped_pages"]))
 print("Parsed Products: "+str(stats["parsed_products"]))
 print("Normalized Products: "+str(stats["normalized_products"]))
 print("Duplicates Removed: "+str(stats["duplicates_removed"]))
@@ -18,7 +18,8 @@ class Exporter:
             "csv": False,
             "json": False,
             "report": False,
-            "error_log": False
+            "error_log": False,
+            "telemetry": False
         }
 
         # CSV
@@ -36,4 +37,8 @@ class Exporter:
         ReportGenerator.generate_error_log(validation_report, f"{self.output_dir}/error_log.json")
         results["error_log"] = True
 
+        if stats.get("fetch", {}).get("telemetry"):
+            ReportGenerator.generate_fetch_telemetry(stats, f"{self.output_dir}/fetch_telemetry.json")
+            results["telemetry"] = True
+
         return results
@@ -14,8 +14,11 @@ class ReportGenerator:
         stats example:
         {
             "total_urls": 120,
+            "collapsed_urls": 14,
             "fetched_pages": 110,
-            "failed_fetch": 10,
+            "failed_fetch": 8,
+            "blocked_pages": 2,
+            "skipped_pages": 1,
             "parsed_products": 95,
             "normalized_products": 95,
             "duplicates_removed": 7,
@@ -39,8 +42,11 @@ class ReportGenerator:
         lines.append("PIPELINE SUMMARY")
         lines.append("-" * 40)
         lines.append(f"Total input URLs       : {stats.get('total_urls', 0)}")
+        lines.append(f"Duplicate URLs skipped : {stats.get('collapsed_urls', 0)}")
         lines.append(f"Pages fetched          : {stats.get('fetched_pages', 0)}")
         lines.append(f"Failed fetches         : {stats.get('failed_fetch', 0)}")
+        lines.append(f"Blocked pages          : {stats.get('blocked_pages', 0)}")
+        lines.append(f"Skipped (not HTML)     : {stats.get('skipped_pages', 0)}")
         lines.append(f"Products parsed        : {stats.get('parsed_products', 0)}")
         lines.append(f"Products normalized    : {stats.get('normalized_products', 0)}")
         lines.append(f"Duplicates removed     : {stats.get('duplicates_removed', 0)}")
@@ -48,6 +54,252 @@ class ReportGenerator:
         lines.append(f"Final Shopify rows     : {stats.get('validated_rows', 0)}")
         lines.append("")
 
+        canonical = stats.get("canonical_keys", {})
+        if any(d["collapsed"] for d in canonical.values()):
+            lines.append("CANONICAL PRODUCT KEYS")
+            lines.append("-" * 40)
+            lines.append(f"{'Domain':<28}{'Input':>8}{'Unique':>8}{'Collapsed':>11}")
+            for domain, d in sorted(canonical.items()):
+                lines.append(f"{domain[:27]:<28}{d['input']:>8}{d['unique']:>8}{d['collapsed']:>11}")
+            lines.append("")
+
+        ingest = stats.get("ingest", {})
+        if ingest:
+            feed = stats.get("fetch", {}).get("feed", {})
+            lines.append("URL INGESTION")
+            lines.append("-" * 40)
+            first_fetch = stats.get("first_fetch_ms")
+            lines.append(f"Time to first fetch    : {f'{first_fetch} ms' if first_fetch is not None else '-'}")
+            if feed:
+                lines.append(f"URLs fed to fetcher    : {feed['fed']} (window {feed['window']})")
+            dedupe = ingest.get("dedupe")
+            if dedupe:
+                lines.append(
+                    f"Dedupe keys            : {dedupe['unique']} unique, {dedupe['duplicates']} duplicates, "
+                    f"{dedupe['spilled_keys']} spilled to disk"
+                )
+            cache = ingest.get("normalize_cache")
+            if cache:
+                lines.append(f"Normalizer cache       : {cache['hits']} hits, {cache['misses']} misses")
+            lines.append("")
+
+        classifier = stats.get("url_classifier", {})
+        if classifier:
+            lines.append("PRODUCT URL CLASSIFIER")
+            lines.append("-" * 40)
+            if stats.get("url_classifier_scope") == "discovery":
+                lines.append("Scope: discovered links only (input URLs not filtered;")
+                lines.append("precision and templates come from fetched input pages)")
+            lines.append(
+                f"{'Domain':<28}{'Scored':>8}{'Queued':>8}{'Avoided':>9}"
+                f"{'Checked':>9}{'Precision':>11}{'Templates':>11}"
+            )
+            for domain, d in sorted(classifier.items()):
+                precision = f"{d['precision']:.1%}" if d["precision"] is not None else "-"
+                lines.append(
+                    f"{domain[:27]:<28}{d['scored']:>8}{d['accepted']:>8}{d['fetches_avoided']:>9}"
+                    f"{d['checked']:>9}{precision:>11}{d['templates']:>11}"
+                )
+            lines.append("")
+
+        fetch_stats = stats.get("fetch", {})
+
+        scheduler = fetch_stats.get("scheduler", {})
+        if scheduler:
+            lines.append("DOMAIN SCHEDULING")
+            lines.append("-" * 40)
+            lines.append(
+                f"{'Domain':<28}{'Rate/s':>8}{'Sent':>8}{'Queue':>8}{'MaxQ':>8}"
+                f"{'AvgWait':>10}{'MaxWait':>10}{'Retries':>9}"
+            )
+            for domain, d in sorted(scheduler.items()):
+                lines.append(
+                    f"{domain[:27]:<28}{d['rate_per_sec']:>8}{d['dispatched']:>8}"
+                    f"{d['queue_depth']:>8}{d['max_queue_depth']:>8}"
+                    f"{d['avg_wait_sec']:>9.2f}s{d['max_wait_sec']:>9.2f}s"
+                    f"{d.get('deferred_retries', 0):>9}"
+                )
+            retries = fetch_stats.get("retries", {})
+            if retries:
+                budget = retries["budget"] if retries["budget"] is not None else "unlimited"
+                lines.append(
+                    f"Deferred retries: {retries['deferred']} (budget {budget}, "
+                    f"refused when exhausted: {retries['budget_exhausted']})"
+                )
+            lines.append("")
+
+        concurrency = fetch_stats.get("concurrency", {})
+        if concurrency:
+            lines.append("ADAPTIVE CONCURRENCY (in-flight limit per domain)")
+            lines.append("-" * 40)
+            lines.append(f"{'Domain':<28}{'Limit':>7}{'Min':>6}{'Max':>6}{'Cuts':>6}{'Baseline':>11}")
+            for domain, d in sorted(concurrency.items()):
+                baseline = f"{d['baseline_ms']}ms" if d["baseline_ms"] is not None else "-"
+                lines.append(
+                    f"{domain[:27]:<28}{d['limit']:>7}{d['min_limit']:>6}{d['max_limit']:>6}"
+                    f"{d['cuts']:>6}{baseline:>11}"
+                )
+                series = " ".join(f"{t:g}s:{limit}" for t, limit in d["history"][-12:])
+                lines.append(f"  limit over time: {series}")
+            lines.append("")
+
+        byte_stats = fetch_stats.get("bytes", {})
+        if byte_stats:
+            lines.append("BYTES PER DOMAIN")
+            lines.append("-" * 40)
+            lines.append(f"{'Domain':<28}{'Downloaded':>12}{'Skipped':>12}{'NonHTML':>9}{'Capped':>8}{'Early':>7}")
+            for domain, d in sorted(byte_stats.items()):
+                lines.append(
+                    f"{domain[:27]:<28}{d['downloaded']:>12}{d['skipped']:>12}"
+                    f"{d['aborted_non_html']:>9}{d['truncated']:>8}{d['stopped_early']:>7}"
+                )
+            lines.append("")
+
+        telemetry = fetch_stats.get("telemetry", {})
+        if telemetry:
+            lines.append("FETCH LATENCY (ms)")
+            lines.append("-" * 40)
+            lines.append(f"{'Domain':<28}{'Reqs':>6}{'KB':>9}{'Retry':>6}{'p50':>8}{'p95':>8}{'p99':>8}")
+            for domain, d in sorted(telemetry.items()):
+                total = d["phases"].get("total", {})
+                lines.append(
+                    f"{domain[:27]:<28}{d['requests']:>6}{d['bytes'] // 1024:>9}{d['retries']:>6}"
+                    f"{total.get('p50_ms', 0):>8}{total.get('p95_ms', 0):>8}{total.get('p99_ms', 0):>8}"
+                )
+            lines.append("")
+            lines.append("p95 by phase (dns / connect / tls only on new connections)")
+            lines.append(f"{'Domain':<28}{'dns':>8}{'connect':>8}{'tls':>8}{'ttfb':>8}{'download':>10}")
+            for domain, d in sorted(telemetry.items()):
+                p95 = {phase: h.get("p95_ms", 0) for phase, h in d["phases"].items()}
+                lines.append(
+                    f"{domain[:27]:<28}{p95.get('dns', '-'):>8}{p95.get('connect', '-'):>8}"
+                    f"{p95.get('tls', '-'):>8}{p95.get('ttfb', '-'):>8}{p95.get('download', '-'):>10}"
+                )
+            lines.append("")
+
+        pool = fetch_stats.get("pool")
+        if pool:
+            lines.append("CONNECTION POOL")
+            lines.append("-" * 40)
+            lines.append(f"Requests sent          : {pool.get('requests', 0)}")
+            lines.append(f"New connections        : {pool.get('new_connections', 0)}")
+            lines.append(f"Connection reuse rate  : {pool.get('reuse_rate', 0.0):.1%}")
+            lines.append(f"Sessions created       : {pool.get('sessions_created', 0)}")
+            lines.append(f"Sessions evicted (LRU) : {pool.get('lru_evictions', 0)}")
+            lines.append(f"Sessions evicted (idle): {pool.get('idle_evictions', 0)}")
+            lines.append("")
+
+        proxies = fetch_stats.get("proxies")
+        if proxies:
+            lines.append("PROXY POOL")
+            lines.append("-" * 40)
+            for proxy, p in proxies.get("proxies", {}).items():
+                state = "quarantined" if p["quarantined"] else f"banned on {len(p['banned_domains'])} domain(s)" \
+                    if p["banned_domains"] else "ok"
+                lines.append(
+                    f"{proxy[:35]:<36}req={p['requests']:<6}ok={p['success_rate']:.0%}  "
+                    f"ewma={p['latency_ewma_ms']}ms  bans={p['bans']}  {state}"
+                )
+            lines.append(f"Pool exhausted         : {proxies.get('exhausted', 0)}")
+            lines.append("")
+
+        http2 = fetch_stats.get("http2")
+        if http2:
+            lines.append("HTTP/2 BACKEND")
+            lines.append("-" * 40)
+            for origin, h in sorted(http2.items()):
+                versions = ", ".join(f"{v}={n}" for v, n in sorted(h["http_versions"].items()))
+                lines.append(
+                    f"{origin[:35]:<36}req={h['requests']:<6}conn={h['connections']:<4}"
+                    f"req/conn={h['requests_per_connection']}  {versions}"
+                )
+            lines.append("")
+
+        blocks = fetch_stats.get("blocks", {})
+        if any(d["blocked"] for d in blocks.values()):
+            lines.append("BLOCKED PAGES")
+            lines.append("-" * 40)
+            lines.append(f"{'Domain':<28}{'Checked':>9}{'Blocked':>9}{'Rate':>8}{'Cool-offs':>11}  Reasons")
+            for domain, d in sorted(blocks.items()):
+                reasons = ", ".join(f"{r}={n}" for r, n in sorted(d["reasons"].items()))
+                lines.append(
+                    f"{domain[:27]:<28}{d['checked']:>9}{d['blocked']:>9}{d['blocked_rate']:>8.1%}"
+                    f"{d['cooloffs']:>6} ({d['cooloff_sec']:.0f}s)  {reasons}"
+                )
+            lines.append("")
+
+        session_state = fetch_stats.get("session_state")
+        if session_state:
+            lines.append("SESSION STATE")
+            lines.append("-" * 40)
+            lines.append(
+                f"Stored: {session_state['stored_cookies']} cookies, "
+                f"{session_state['stored_redirects']} redirects ({session_state['path']})"
+            )
+            lines.append(f"{'Domain':<28}{'Cookies':>9}{'Hops':>7}{'Resolved':>10}{'Avoided':>9}")
+            for domain, d in sorted(session_state["domains"].items()):
+                lines.append(
+                    f"{domain[:27]:<28}{d['cookies_loaded']:>9}{d['redirect_hops']:>7}"
+                    f"{d['redirects_resolved']:>10}{d['hops_avoided']:>9}"
+                )
+            lines.append("")
+
+        http_cache = fetch_stats.get("http_cache")
+        if http_cache:
+            lines.append("HTTP CACHE")
+            lines.append("-" * 40)
+            lines.append(f"Cache hits (304)       : {http_cache.get('hits', 0)}")
+            lines.append(f"Cache misses           : {http_cache.get('misses', 0)}")
+            lines.append(f"Hit rate               : {http_cache.get('hit_rate', 0.0):.1%}")
+            lines.append(f"Bytes saved            : {http_cache.get('bytes_saved', 0)}")
+            lines.append(f"Redirect hops skipped  : {http_cache.get('redirects_skipped', 0)}")
+            lines.append(f"Entries / size (bytes) : {http_cache.get('entries', 0)} / {http_cache.get('size_bytes', 0)}")
+            lines.append(f"LRU evictions          : {http_cache.get('evictions', 0)}")
+            lines.append("")
+
+        breaker = fetch_stats.get("circuit_breaker", {})
+        tripped = {
+            domain: d for domain, d in breaker.get("domains", {}).items()
+            if d["short_circuited"] or d["state"] != "closed"
+        }
+        if tripped or breaker.get("transitions"):
+            lines.append("CIRCUIT BREAKER")
+            lines.append("-" * 40)
+            for domain, d in sorted(tripped.items()):
+                lines.append(
+                    f"{domain[:27]:<28}state={d['state']:<10}"
+                    f"failures={d['failures']}/{d['requests']}  short-circuited={d['short_circuited']}"
+                )
+            for t in breaker.get("transitions", []):
+                lines.append(f"  {t['at']}  {t['domain']}: {t['from']} → {t['to']}")
+            lines.append("")
+
+        shopify_json = fetch_stats.get("shopify_json")
+        if shopify_json and shopify_json.get("stores_detected"):
+            lines.append("SHOPIFY JSON ENDPOINTS")
+            lines.append("-" * 40)
+            lines.append(f"Stores detected        : {shopify_json.get('stores_detected', 0)}")
+            lines.append(f"JSON requests          : {shopify_json.get('json_requests', 0)}")
+            lines.append(f"Products via JSON      : {shopify_json.get('products', 0)}")
+            lines.append(f"HTML fetches avoided   : {shopify_json.get('html_fetches_avoided', 0)}")
+            lines.append("")
+
+        archive = fetch_stats.get("archive")
+        if archive:
+            lines.append(f"Pages archived         : {archive.get('records', 0)} → {archive.get('path')}")
+        cassette = fetch_stats.get("cassette")
+        if cassette:
+            lines.append(
+                f"Cassette ({cassette['mode']})      : recorded={cassette['recorded']} replayed={cassette['replayed']} "
+                f"misses={cassette['misses']} injected={cassette['injected_errors']}+{cassette['injected_503']}x503"
+            )
+        journal = fetch_stats.get("journal")
+        if journal:
+            lines.append(f"Pages journaled        : {journal.get('recorded', 0)} → {journal.get('path')}")
+            lines.append(f"Pages resumed          : {journal.get('resumed', 0)}")
+        if archive or journal or cassette:
+            lines.append("")
+
         lines.append("VALIDATION")
         lines.append("-" * 40)
         lines.append(f"Validation errors      : {stats.get('validation_errors', 0)}")
@@ -66,6 +318,8 @@ class ReportGenerator:
         lines.append("output/catalog.json")
         lines.append("output/error_log.json")
         lines.append("output/scrape_report.txt")
+        if telemetry:
+            lines.append("output/fetch_telemetry.json")
         lines.append("")
 
         lines.append("SYSTEM STATUS")
@@ -78,6 +332,14 @@ class ReportGenerator:
         with open(path, "w", encoding="utf-8") as f:
             f.write("\n".join(lines))
 
+    @staticmethod
+    def generate_fetch_telemetry(stats: Dict, path: str = "output/fetch_telemetry.json"):
+        """
+        Machine-readable per-domain fetch telemetry (histogram summaries)
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stats.get("fetch", {}).get("telemetry", {}), f, indent=2)
+
     @staticmethod
     def generate_error_log(report: Dict, path: str = "output/error_log.json"):
         """
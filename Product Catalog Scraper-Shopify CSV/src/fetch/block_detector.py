@@ -0,0 +1,183 @@
+import re
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import requests
+
+
+BLOCK_STATUSES = (403, 429, 503)
+
+# checked against the first sniff_bytes of the body, any status
+BODY_SIGNATURES: List[Tuple[str, bytes]] = [
+    ("robot-check", rb"<title[^>]*>\s*Robot Check\s*</title>|/errors/validateCaptcha"
+                    rb"|Enter the characters you see below"),
+    ("challenge", rb"<title>\s*Just a moment\.\.\.\s*</title>"),
+    ("access-denied", rb"<title>\s*Access Denied\s*</title>"),
+]
+
+# also appear on real pages (widgets, injected scripts): only trusted on
+# block statuses or small pages, which is what interstitials are
+WEAK_BODY_SIGNATURES: List[Tuple[str, bytes]] = [
+    ("captcha", rb"g-recaptcha|class=\"h-captcha|captcha-delivery\.com|px-captcha|geo\.captcha"),
+    ("challenge", rb"/cdn-cgi/challenge-platform|cf-chl-"),
+    ("human-check", rb"Are you a human\?|verify (?:that )?you are (?:a )?human"),
+]
+
+# (header, value substring or None for presence) → reason
+HEADER_SIGNATURES: List[Tuple[str, Optional[str], str]] = [
+    ("cf-mitigated", "challenge", "challenge"),
+    ("x-amzn-waf-action", "captcha", "captcha"),
+]
+
+
+class BlockedPageError(requests.HTTPError):
+    """A bot-block / CAPTCHA page was served instead of the product page."""
+
+    def __init__(self, reason: str, response: requests.Response):
+        super().__init__(f"Blocked page ({reason}): {response.url}", response=response)
+        self.reason = reason
+
+
+class BlockDetector:
+    """
+    Cheap bot-block / CAPTCHA classification before parsing.
+    Handles:
+    - header signatures (challenge headers) and body markers in the
+      first sniff_bytes only (built-in plus per-domain extras); weak
+      markers count only on 403 / 429 / 503 or pages under small_page_bytes
+    - per-domain cool-off: base × 2^(streak - 1), capped; blocks that
+      arrive while the domain is already cooling off do not escalate
+      (they were in flight when the first one landed)
+    - per-domain checked / blocked counts, reasons and cool-offs
+    """
+
+    def __init__(
+        self,
+        sniff_bytes: int = 16 * 1024,
+        cooloff: float = 60.0,
+        max_cooloff: float = 900.0,
+        small_page_bytes: int = 64 * 1024,
+        markers: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.sniff_bytes = sniff_bytes
+        self.cooloff = cooloff
+        self.max_cooloff = max_cooloff
+        self.small_page_bytes = small_page_bytes
+
+        self.body_signatures = [
+            (reason, re.compile(pattern, re.IGNORECASE)) for reason, pattern in BODY_SIGNATURES
+        ]
+        self.weak_signatures = [
+            (reason, re.compile(pattern, re.IGNORECASE)) for reason, pattern in WEAK_BODY_SIGNATURES
+        ]
+        self.domain_markers = {
+            domain.lower(): [re.compile(re.escape(m.encode("utf-8")), re.IGNORECASE) for m in found]
+            for domain, found in (markers or {}).items()
+        }
+
+        self.lock = threading.Lock()
+        self.cooloff_until: Dict[str, float] = {}
+        self.streaks: Dict[str, int] = {}
+        self.domain_stats: Dict[str, Dict] = {}
+
+    def _stats(self, domain: str) -> Dict:
+        if domain not in self.domain_stats:
+            self.domain_stats[domain] = {
+                "checked": 0,
+                "blocked": 0,
+                "reasons": {},
+                "cooloffs": 0,
+                "cooloff_sec": 0.0,
+            }
+        return self.domain_stats[domain]
+
+    # -----------------------------
+    # Classification
+    # -----------------------------
+    def _reason(
+        self,
+        domain: str,
+        status: int,
+        headers: Mapping[str, str],
+        head: bytes,
+        small: bool,
+    ) -> Optional[str]:
+        for header, value, reason in HEADER_SIGNATURES:
+            found = headers.get(header)
+            if found is not None and (value is None or value in found.lower()):
+                return reason
+
+        for reason, pattern in self.body_signatures:
+            if pattern.search(head):
+                return reason
+
+        for pattern in self.domain_markers.get(domain, ()):
+            if pattern.search(head):
+                return "domain-marker"
+
+        if small or status in BLOCK_STATUSES:
+            for reason, pattern in self.weak_signatures:
+                if pattern.search(head):
+                    return reason
+
+        return None
+
+    def classify(
+        self,
+        domain: str,
+        status: int,
+        headers: Mapping[str, str],
+        head: bytes,
+        body_size: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Block reason for a response whose body starts with `head`, or
+        None. body_size: full size when known (read to the end, or
+        Content-Length). A block starts the domain's cool-off.
+        """
+        small = body_size is not None and body_size <= self.small_page_bytes
+        reason = self._reason(domain, status, headers, head[:self.sniff_bytes], small)
+        now = time.monotonic()
+
+        with self.lock:
+            stats = self._stats(domain)
+            stats["checked"] += 1
+
+            if reason is None:
+                self.streaks[domain] = 0
+                return None
+
+            stats["blocked"] += 1
+            stats["reasons"][reason] = stats["reasons"].get(reason, 0) + 1
+
+            if now >= self.cooloff_until.get(domain, 0.0):
+                streak = self.streaks.get(domain, 0) + 1
+                self.streaks[domain] = streak
+                seconds = min(self.max_cooloff, self.cooloff * (2 ** (streak - 1)))
+                self.cooloff_until[domain] = now + seconds
+                stats["cooloffs"] += 1
+                stats["cooloff_sec"] += seconds
+
+        return reason
+
+    def cooloff_remaining(self, domain: str) -> float:
+        with self.lock:
+            return max(0.0, self.cooloff_until.get(domain, 0.0) - time.monotonic())
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {
+                domain: {
+                    "checked": s["checked"],
+                    "blocked": s["blocked"],
+                    "blocked_rate": round(s["blocked"] / s["checked"], 3) if s["checked"] else 0.0,
+                    "reasons": dict(s["reasons"]),
+                    "cooloffs": s["cooloffs"],
+                    "cooloff_sec": round(s["cooloff_sec"], 1),
+                }
+                for domain, s in self.domain_stats.items()
+            }
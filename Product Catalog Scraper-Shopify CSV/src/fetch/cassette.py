@@ -0,0 +1,159 @@
+import hashlib
+import io
+import random
+import threading
+import time
+from typing import Dict, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.fetch.page_archive import PageArchiveReader, PageArchiveWriter
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+# recorded time-to-headers, stored with each response so replay can reproduce it
+LATENCY_HEADER = "X-Cassette-Latency"
+
+
+class CassetteMissError(requests.ConnectionError):
+    """Replay asked for a URL the cassette does not contain."""
+
+
+class Cassette:
+    """
+    Record / replay of the fetch layer.
+    Handles:
+    - record: every response HTTPClient returns (status, headers, body,
+      observed latency) is appended to a cassette (.warc.gz + .idx, the
+      PageArchive format)
+    - replay: HTTPClient.get is served from the cassette with no network
+    - simulated latency: the recorded latency or a fixed value, scaled
+    - error injection: connection errors and 503s at configurable rates
+    Injected faults are a pure function of (seed, url, attempt), so a
+    replay run is reproducible at any concurrency.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = REPLAY,
+        latency: Union[str, float] = "recorded",
+        latency_scale: float = 1.0,
+        error_rate: float = 0.0,
+        status_error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.status_error_rate = status_error_rate
+        self.seed = seed
+
+        self.writer = PageArchiveWriter(path) if mode == RECORD else None
+        self.reader = PageArchiveReader(path) if mode == REPLAY else None
+
+        self.lock = threading.Lock()
+        self.attempts: Dict[str, int] = {}
+        self.counters = {
+            "recorded": 0,
+            "replayed": 0,
+            "misses": 0,
+            "injected_errors": 0,
+            "injected_503": 0,
+        }
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    # -----------------------------
+    # Record
+    # -----------------------------
+    def record(self, url: str, response: requests.Response, latency: float):
+        headers = dict(response.headers)
+        headers[LATENCY_HEADER] = f"{latency:.6f}"
+        self.writer.write(url, response.status_code, headers, response.content)
+        with self.lock:
+            self.counters["recorded"] += 1
+
+    # -----------------------------
+    # Replay
+    # -----------------------------
+    def _rng(self, url: str) -> random.Random:
+        with self.lock:
+            attempt = self.attempts.get(url, 0)
+            self.attempts[url] = attempt + 1
+        digest = hashlib.blake2b(f"{self.seed}\t{url}\t{attempt}".encode("utf-8"), digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, "little"))
+
+    def _latency(self, headers: Dict[str, str]) -> float:
+        if self.latency == "recorded":
+            try:
+                seconds = float(headers.get(LATENCY_HEADER, 0.0))
+            except ValueError:
+                seconds = 0.0
+        else:
+            seconds = float(self.latency)
+        return seconds * self.latency_scale
+
+    def replay(self, url: str) -> requests.Response:
+        """
+        Response for `url` as if it came off the wire (body unread, so
+        HTTPClient's streaming rules still apply). May raise injected
+        connection errors or CassetteMissError.
+        """
+        rng = self._rng(url)
+        stored = self.reader.response(url)
+        if stored is None:
+            with self.lock:
+                self.counters["misses"] += 1
+            raise CassetteMissError(f"Not in cassette: {url}")
+
+        status, headers, body = stored
+        time.sleep(self._latency(headers))
+
+        if rng.random() < self.error_rate:
+            with self.lock:
+                self.counters["injected_errors"] += 1
+            raise requests.ConnectionError(f"Injected connection error: {url}")
+
+        if rng.random() < self.status_error_rate:
+            with self.lock:
+                self.counters["injected_503"] += 1
+            status, body = 503, b""
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "Service Unavailable" if status == 503 else ""
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers.pop(LATENCY_HEADER, None)
+        response.headers["Content-Length"] = str(len(body))
+        response.raw = io.BytesIO(body)
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cassette = True
+
+        with self.lock:
+            self.counters["replayed"] += 1
+        return response
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"path": str(self.path), "mode": self.mode, **self.counters}
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        if self.reader:
+            self.reader.close()
@@ -0,0 +1,79 @@
+import codecs
+import re
+from typing import Optional
+
+
+SNIFF_BYTES = 4096
+
+# a BOM overrides everything else (WHATWG encoding sniffing)
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+META_CHARSET = re.compile(
+    rb"""<meta[^>]+?charset\s*=\s*["']?\s*([a-zA-Z0-9_:.\-]+)""",
+    re.IGNORECASE,
+)
+
+# browsers decode these labels as windows-1252
+WINDOWS_1252_ALIASES = {"ascii", "latin-1", "iso8859-1"}
+
+
+def _lookup(label: str) -> Optional[str]:
+    try:
+        name = codecs.lookup(label.strip("\"' ")).name
+    except LookupError:
+        return None
+    return "cp1252" if name in WINDOWS_1252_ALIASES else name
+
+
+def header_charset(content_type: str) -> Optional[str]:
+    """charset parameter of a Content-Type header, if valid."""
+    for part in content_type.split(";"):
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return _lookup(value)
+    return None
+
+
+def sniff_charset(content_type: str, body: bytes, sniff_bytes: int = SNIFF_BYTES) -> str:
+    """
+    Encoding of an HTML body without statistical detection:
+    BOM, Content-Type charset, <meta charset> / http-equiv in the first
+    sniff_bytes, then UTF-8 if the body is valid UTF-8, else windows-1252.
+    A multi-byte sequence cut off at the end (capped / early-stopped
+    body) is ignored when the rest already decoded as non-ASCII UTF-8.
+    """
+    for bom, encoding in BOM_ENCODINGS:
+        if body.startswith(bom):
+            return encoding
+
+    encoding = header_charset(content_type)
+    if encoding:
+        return encoding
+
+    match = META_CHARSET.search(body, 0, sniff_bytes)
+    if match:
+        encoding = _lookup(match.group(1).decode("ascii", errors="ignore"))
+        # a meta tag can only be read if the body is ASCII-compatible
+        if encoding and not encoding.startswith("utf-16"):
+            return encoding
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        text = decoder.decode(body, final=False)
+    except UnicodeDecodeError:
+        return "cp1252"
+    if decoder.getstate()[0] and text.isascii():
+        # only a trailing high byte to go on: as likely windows-1252
+        return "cp1252"
+    return "utf-8"
+
+
+def decode_html(body: bytes, encoding: Optional[str]) -> str:
+    """str for callers that need text; the parsers take bytes directly."""
+    if encoding == "utf-8" and body.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    return body.decode(encoding or "utf-8", errors="replace")
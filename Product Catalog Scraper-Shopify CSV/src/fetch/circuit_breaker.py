@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is short-circuited by an open breaker."""
+
+    def __init__(self, domain: str):
+        super().__init__(f"Circuit open for domain: {domain}")
+        self.domain = domain
+
+
+class CircuitBreaker:
+    """
+    Per-domain circuit breaker.
+    Handles:
+    - closed → open once the error rate over a sliding window crosses a threshold
+    - open → half-open after a cool-down
+    - half-open → closed on a successful probe, back to open on failure
+    - transition log + short-circuit counters
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.5,
+        min_requests: int = 10,
+        window: int = 20,
+        cooldown: float = 60.0,
+    ):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+
+        self.lock = threading.Lock()
+        self.domains: Dict[str, Dict] = {}
+        self.transitions: List[Dict] = []
+
+    def _domain(self, domain: str) -> Dict:
+        if domain not in self.domains:
+            self.domains[domain] = {
+                "state": CLOSED,
+                "outcomes": deque(maxlen=self.window),
+                "opened_at": 0.0,
+                "probe_in_flight": False,
+                "requests": 0,
+                "failures": 0,
+                "short_circuited": 0,
+            }
+        return self.domains[domain]
+
+    def _transition(self, domain: str, d: Dict, new_state: str):
+        self.transitions.append({
+            "domain": domain,
+            "from": d["state"],
+            "to": new_state,
+            "at": datetime.utcnow().isoformat(),
+        })
+        d["state"] = new_state
+        if new_state == OPEN:
+            d["opened_at"] = time.monotonic()
+        if new_state == CLOSED:
+            d["outcomes"].clear()
+        d["probe_in_flight"] = False
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def allow(self, domain: str) -> bool:
+        """
+        True if a request to `domain` may go out now.
+        """
+        with self.lock:
+            d = self._domain(domain)
+
+            if d["state"] == OPEN:
+                if time.monotonic() - d["opened_at"] >= self.cooldown:
+                    self._transition(domain, d, HALF_OPEN)
+                else:
+                    d["short_circuited"] += 1
+                    return False
+
+            if d["state"] == HALF_OPEN:
+                # a single probe request at a time
+                if d["probe_in_flight"]:
+                    d["short_circuited"] += 1
+                    return False
+                d["probe_in_flight"] = True
+
+            return True
+
+    def record(self, domain: str, success: bool):
+        with self.lock:
+            d = self._domain(domain)
+            d["requests"] += 1
+            if not success:
+                d["failures"] += 1
+
+            if d["state"] == HALF_OPEN:
+                self._transition(domain, d, CLOSED if success else OPEN)
+                return
+
+            d["outcomes"].append(success)
+            if d["state"] == CLOSED and len(d["outcomes"]) >= self.min_requests:
+                failures = d["outcomes"].count(False)
+                if failures / len(d["outcomes"]) >= self.error_rate:
+                    self._transition(domain, d, OPEN)
+
+    def state(self, domain: str) -> str:
+        with self.lock:
+            return self._domain(domain)["state"]
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "domains": {
+                    domain: {
+                        "state": d["state"],
+                        "requests": d["requests"],
+                        "failures": d["failures"],
+                        "short_circuited": d["short_circuited"],
+                    }
+                    for domain, d in self.domains.items()
+                },
+                "transitions": list(self.transitions),
+            }
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class DomainLimit:
+    """AIMD state for one domain."""
+
+    def __init__(self, initial: float):
+        self.limit = initial
+        self.baseline: Optional[float] = None  # slow EWMA of healthy latency
+        self.samples = 0
+        self.last_cut = 0.0
+        self.cuts = 0
+        self.increases = 0
+        self.min_seen = int(initial)
+        self.max_seen = int(initial)
+        self.history: List[List[float]] = [[0.0, int(initial)]]
+
+
+class AIMDController:
+    """
+    Per-domain adaptive in-flight limit (additive increase, multiplicative decrease).
+    Handles:
+    - +increase per window of `limit` healthy responses (≈ +1 per round trip)
+    - limit × decrease on 429 / 503, transport errors or latency spikes
+      (latency > spike_factor × the domain's healthy baseline)
+    - at most one cut per round trip (2 × baseline latency, capped at
+      cut_cooldown), so one burst of failures from requests already in
+      flight is not punished repeatedly
+    - limit time series per domain (recorded on every whole-number change)
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        spike_factor: float = 3.0,
+        min_samples: int = 5,
+        cut_cooldown: float = 1.0,
+        baseline_alpha: float = 0.05,
+        max_history: int = 512,
+        congestion_statuses: tuple = (429, 503),
+    ):
+        self.initial = max(min_limit, min(initial, max_limit))
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.spike_factor = spike_factor
+        self.min_samples = min_samples
+        self.cut_cooldown = cut_cooldown
+        self.baseline_alpha = baseline_alpha
+        self.max_history = max_history
+        self.congestion_statuses = congestion_statuses
+
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.domains: Dict[str, DomainLimit] = {}
+
+    def _domain(self, domain: str) -> DomainLimit:
+        if domain not in self.domains:
+            self.domains[domain] = DomainLimit(self.initial)
+        return self.domains[domain]
+
+    def limit(self, domain: str) -> int:
+        with self.lock:
+            return int(self._domain(domain).limit)
+
+    # -----------------------------
+    # Feedback
+    # -----------------------------
+    def record(self, domain: str, status: Optional[int], latency: Optional[float]):
+        """
+        One finished attempt. status None = transport error.
+        """
+        now = time.monotonic()
+        with self.lock:
+            d = self._domain(domain)
+            before = int(d.limit)
+
+            congested = status is None or status in self.congestion_statuses
+            spiked = (
+                not congested
+                and latency is not None
+                and d.baseline is not None
+                and d.samples >= self.min_samples
+                and latency > self.spike_factor * d.baseline
+            )
+
+            if congested or spiked:
+                cooldown = self.cut_cooldown if d.baseline is None else \
+                    min(self.cut_cooldown, 2 * d.baseline)
+                if now - d.last_cut >= cooldown:
+                    d.limit = max(self.min_limit, d.limit * self.decrease)
+                    d.last_cut = now
+                    d.cuts += 1
+            else:
+                if latency is not None:
+                    d.samples += 1
+                    d.baseline = latency if d.baseline is None else \
+                        d.baseline + self.baseline_alpha * (latency - d.baseline)
+                if d.limit < self.max_limit:
+                    d.limit = min(self.max_limit, d.limit + self.increase / max(d.limit, 1.0))
+                    if int(d.limit) > before:
+                        d.increases += 1
+
+            after = int(d.limit)
+            if after != before:
+                d.min_seen = min(d.min_seen, after)
+                d.max_seen = max(d.max_seen, after)
+                self._append_history(d, now, after)
+
+    def _append_history(self, d: DomainLimit, now: float, limit: int):
+        d.history.append([round(now - self.started, 3), limit])
+        if len(d.history) > self.max_history:
+            # keep the first point, thin the rest
+            d.history = d.history[:1] + d.history[1::2]
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {
+                domain: {
+                    "limit": int(d.limit),
+                    "min_limit": d.min_seen,
+                    "max_limit": d.max_seen,
+                    "cuts": d.cuts,
+                    "increases": d.increases,
+                    "baseline_ms": round(d.baseline * 1000, 1) if d.baseline is not None else None,
+                    "history": [list(point) for point in d.history],
+                }
+                for domain, d in self.domains.items()
+            }
@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class FetchJournal:
+    """
+    Crash-safe fetch progress journal (SQLite, WAL).
+    Handles:
+    - one row per URL: final status, completion time, error
+    - pointer to the stored body (page archive offset / length)
+    - batched writes (flush every `batch_size` entries or `flush_interval` s)
+    - completed-URL lookup for --resume runs
+    A crash loses at most the unflushed batch; those URLs are simply
+    fetched again on resume.
+    """
+
+    def __init__(
+        self,
+        path: str = "output/fetch_journal.sqlite",
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        reset: bool = False,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL survives process crashes; only an OS crash can drop the tail
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS journal ("
+            " url TEXT PRIMARY KEY,"
+            " status TEXT,"
+            " completed_at TEXT,"
+            " archive_offset INTEGER,"
+            " archive_length INTEGER,"
+            " error TEXT)"
+        )
+        if reset:
+            self.conn.execute("DELETE FROM journal")
+        self.conn.commit()
+
+        self.pending: List[Tuple] = []
+        self.last_flush = time.monotonic()
+        self.counters = {
+            "recorded": 0,
+            "flushes": 0,
+            "resumed": 0,
+        }
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def record(self, page: Dict, pointer: Optional[Tuple[int, int]] = None):
+        """
+        Journal one finished URL. pointer is the (offset, length) of the
+        body in the page archive, when one was written.
+        """
+        offset, length = pointer if pointer else (None, None)
+        with self.lock:
+            self.pending.append((
+                page["url"],
+                str(page["status"]),
+                page.get("timestamp"),
+                offset,
+                length,
+                page.get("error"),
+            ))
+            self.counters["recorded"] += 1
+            if (
+                len(self.pending) >= self.batch_size
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def _flush(self):
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO journal VALUES (?, ?, ?, ?, ?, ?)",
+                    self.pending,
+                )
+            self.pending = []
+            self.counters["flushes"] += 1
+        self.last_flush = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    # -----------------------------
+    # Resume
+    # -----------------------------
+    def completed(self) -> Dict[str, Dict]:
+        """
+        URLs that need no refetch: any final HTTP status or a deliberate
+        skip. Transport errors / open circuits are retried on resume.
+        """
+        with self.lock:
+            self._flush()
+            rows = self.conn.execute(
+                "SELECT url, status, completed_at, archive_offset, archive_length, error"
+                " FROM journal WHERE status != 'error'"
+            ).fetchall()
+
+        return {
+            url: {
+                "status": int(status) if status.isdigit() else status,
+                "timestamp": completed_at,
+                "pointer": (offset, length) if offset is not None else None,
+                "error": error,
+            }
+            for url, status, completed_at, offset, length, error in rows
+        }
+
+    def mark_resumed(self, count: int):
+        self.counters["resumed"] += count
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"path": str(self.path), **self.counters}
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.conn.close()
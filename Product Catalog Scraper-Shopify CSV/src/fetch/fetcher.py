@@ -1,20 +1,77 @@
 import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
-from typing import List, Dict
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 
 from src.fetch.http_client import HTTPClient
+from src.fetch.http_cache import HTTPCache
+from src.fetch.page_archive import PageArchiveReader, PageArchiveWriter
+from src.fetch.fetch_journal import FetchJournal
+from src.fetch.proxy_pool import ProxyPool
+from src.fetch.cassette import Cassette
+from src.fetch.telemetry import FetchTelemetry
 from src.fetch.session_manager import SessionManager
+from src.fetch.session_store import SessionStore
+from src.fetch.block_detector import BlockDetector, BlockedPageError
+from src.fetch.charset import sniff_charset
 from src.fetch.retry import RetryHandler
+from src.fetch.circuit_breaker import CircuitBreaker
+from src.fetch.scheduler import DomainScheduler
+from src.fetch.concurrency_controller import AIMDController
+from src.fetch.http2_client import HTTP2Transport
+
+# end of input, from the producer thread (asyncio mode)
+FEED_END = object()
+
+
+class FetchRequest:
+    """
+    A request fed alongside plain URLs whose page goes to on_done
+    instead of an output slot.
+    - scheduled, rate-limited and retried like any other URL
+    - on_done(page) runs on the fetch loop and returns follow-ups
+      (URLs or FetchRequests) to schedule in turn
+    - allowed_types / max_bytes override the HTML defaults
+    - record journals and archives the page like an output page
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_done: Callable[[Dict], Optional[Iterable]],
+        allowed_types: Optional[Tuple[str, ...]] = None,
+        max_bytes: Optional[int] = None,
+        record: bool = False,
+    ):
+        self.url = url
+        self.on_done = on_done
+        self.allowed_types = allowed_types
+        self.max_bytes = max_bytes
+        self.record = record
 
 
 class Fetcher:
     """
     Orchestrates:
-    - input URLs
+    - input URLs (lists, or iterators fed to the scheduler incrementally)
     - session management
     - HTTP client
-    - retry handling
+    - retry handling (deferred, non-blocking, with a per-run retry budget)
+    - per-domain politeness scheduling
+    - bounded concurrency (asyncio mode), optionally AIMD-adaptive per domain
+    - optional raw response archive
+    - optional crash-safe fetch journal (resume)
+    - per-domain latency telemetry
+    - optional persistent session state (cookies, resolved redirects)
+    - optional block-page detection (retried after a domain cool-off)
+    - optional health-scored proxy pool
+    - optional record / replay cassette
+    - optional HTTP/2 backend for selected domains
     - raw page output formatting
     """
 
@@ -24,55 +81,590 @@ class Fetcher:
         max_retries: int = 3,
         base_delay: float = 1.0,
         max_delay: float = 15.0,
+        retry_budget: Optional[int] = None,
+        concurrency: int = 1,
+        per_domain_concurrency: int = 2,
+        domain_rate: float = 2.0,
+        domain_rates: Optional[Dict[str, float]] = None,
+        cache_path: Optional[str] = None,
+        cache_max_bytes: int = 512 * 1024 * 1024,
+        archive_path: Optional[str] = None,
+        breaker_error_rate: float = 0.5,
+        breaker_min_requests: int = 10,
+        breaker_cooldown: float = 60.0,
+        max_body_bytes: int = 5 * 1024 * 1024,
+        html_only: bool = True,
+        structured_data_only: bool = False,
+        structured_data_domains: Optional[List[str]] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        max_sessions: int = 256,
+        session_idle_timeout: float = 300.0,
+        journal_path: Optional[str] = None,
+        journal_batch_size: int = 500,
+        resume: bool = False,
+        proxies: Optional[List[str]] = None,
+        proxy_base_cooldown: float = 30.0,
+        proxy_max_cooldown: float = 1800.0,
+        cassette: Optional[Cassette] = None,
+        adaptive_concurrency: bool = False,
+        max_per_domain_concurrency: int = 16,
+        http2_domains: Optional[List[str]] = None,
+        http2_prior_knowledge: bool = False,
+        session_state_path: Optional[str] = None,
+        session_cookie_ttl: float = 12 * 3600,
+        redirect_ttl: float = 24 * 3600,
+        block_detection: bool = False,
+        block_cooloff: float = 60.0,
+        block_max_cooloff: float = 900.0,
+        block_markers: Optional[Dict[str, List[str]]] = None,
+        feed_window: int = 5000,
     ):
-        self.http_client = HTTPClient(timeout=timeout)
-        self.session_manager = SessionManager()
+        self.archive = PageArchiveWriter(archive_path) if archive_path else None
+        self.journal = FetchJournal(
+            journal_path,
+            batch_size=journal_batch_size,
+            reset=not resume,
+        ) if journal_path else None
+        self.cache = HTTPCache(cache_path, max_bytes=cache_max_bytes) if cache_path else None
+        self.telemetry = FetchTelemetry()
+        self.session_store = SessionStore(
+            session_state_path,
+            session_cookie_ttl=session_cookie_ttl,
+            redirect_ttl=redirect_ttl,
+        ) if session_state_path else None
+        self.cassette = cassette
+        self.block_detector = BlockDetector(
+            cooloff=block_cooloff,
+            max_cooloff=block_max_cooloff,
+            markers=block_markers,
+        ) if block_detection else None
+        # adaptive limits only matter when requests can overlap
+        self.controller = AIMDController(
+            initial=per_domain_concurrency,
+            max_limit=max_per_domain_concurrency,
+        ) if adaptive_concurrency and concurrency > 1 else None
+        self.proxy_pool = ProxyPool(
+            proxies,
+            base_cooldown=proxy_base_cooldown,
+            max_cooldown=proxy_max_cooldown,
+        ) if proxies else None
+        self.http2 = HTTP2Transport(
+            timeout=timeout,
+            prior_knowledge=http2_prior_knowledge,
+        ) if http2_domains else None
+        self.http_client = HTTPClient(
+            timeout=timeout,
+            telemetry=self.telemetry,
+            cache=self.cache,
+            max_body_bytes=max_body_bytes,
+            html_only=html_only,
+            structured_data_only=structured_data_only,
+            structured_data_domains=tuple(structured_data_domains or ()),
+            proxy_pool=self.proxy_pool,
+            cassette=self.cassette,
+            controller=self.controller,
+            http2=self.http2,
+            http2_domains=tuple(http2_domains or ()),
+            session_store=self.session_store,
+            block_detector=self.block_detector,
+        )
+        self.session_manager = SessionManager(
+            pool_connections=pool_connections,
+            # never fewer pooled sockets than requests we allow in flight
+            pool_maxsize=max(
+                pool_maxsize,
+                max_per_domain_concurrency if self.controller else per_domain_concurrency,
+            ),
+            max_sessions=max_sessions,
+            idle_timeout=session_idle_timeout,
+            store=self.session_store,
+        )
+        self.circuit_breaker = CircuitBreaker(
+            error_rate=breaker_error_rate,
+            min_requests=breaker_min_requests,
+            cooldown=breaker_cooldown,
+        )
         self.retry_handler = RetryHandler(
             max_retries=max_retries,
             base_delay=base_delay,
             max_delay=max_delay,
+            circuit_breaker=self.circuit_breaker,
         )
+        # total deferred retries allowed over this fetcher's run (None = unlimited)
+        self.retry_budget = retry_budget
+        self.retry_lock = threading.Lock()
+        self.retry_counters = {"deferred": 0, "budget_exhausted": 0}
+        self.concurrency = max(1, concurrency)
+        self.per_domain_concurrency = max(1, per_domain_concurrency)
+        self.domain_rate = domain_rate
+        self.domain_rates = domain_rates or {}
+        self.scheduler = self._new_scheduler()
+        # URLs queued on the scheduler ahead of dispatch when fed from an iterator
+        self.feed_window = max(1, feed_window)
+        self.feed_stats = {"fed": 0, "first_dispatch_ms": None}
+        self.first_dispatch_at: Optional[float] = None
+        self.resume_completed: Optional[Dict[str, Dict]] = None
+        self.resume_reader: Optional[PageArchiveReader] = None
 
     def _get_domain(self, url: str) -> str:
-        return urlparse(url).netloc.replace("www.", "")
+        return urlparse(url).netloc.lower().replace("www.", "")
 
-    def fetch_urls(self, urls: List[str]) -> List[Dict]:
-        raw_pages = []
+    def _new_scheduler(self) -> DomainScheduler:
+        return DomainScheduler(
+            default_rate=self.domain_rate,
+            domain_rates=self.domain_rates,
+            max_in_flight=self.per_domain_concurrency if self.concurrency > 1 else 1,
+            controller=self.controller,
+            block_detector=self.block_detector,
+        )
 
-        for url in urls:
-            domain = self._get_domain(url)
-            session = self.session_manager.get_session(domain)
+    def _schedule(self, item: Union[str, FetchRequest], raw_pages: List[Optional[Dict]]):
+        """
+        Queues a URL on the next output slot, or a FetchRequest (no slot).
+        Scheduler items are (output index, url, attempt, request).
+        """
+        if isinstance(item, FetchRequest):
+            self.scheduler.add(self._get_domain(item.url), (None, item.url, 0, item))
+        else:
+            self.scheduler.add(self._get_domain(item), (len(raw_pages), item, 0, None))
+            raw_pages.append(None)
+        self.feed_stats["fed"] += 1
+
+    def _finish(self, index: Optional[int], request: Optional[FetchRequest], page: Dict, raw_pages: List[Optional[Dict]]):
+        """Stores an output page, or hands a request's page to its callback."""
+        if request is None:
+            raw_pages[index] = page
+            return
+        for item in request.on_done(page) or ():
+            self._schedule(item, raw_pages)
 
+    def _feed(self, source: Iterator, raw_pages: List[Optional[Dict]]) -> bool:
+        """
+        Tops the scheduler up to feed_window queued URLs from source;
+        each URL gets the next output slot. False once source is drained.
+        """
+        for _ in range(self.feed_window - self.scheduler.pending()):
+            item = next(source, None)
+            if item is None:
+                return False
+            self._schedule(item, raw_pages)
+        return True
+
+    def _feed_buffered(self, buffered: queue.Queue, raw_pages: List[Optional[Dict]]) -> bool:
+        """
+        _feed for the asyncio engine: takes URLs the producer thread has
+        already pulled, never blocking on the source. False once the
+        producer has sent FEED_END.
+        """
+        for _ in range(self.feed_window - self.scheduler.pending()):
             try:
-                response = self.retry_handler.run(
-                    self.http_client.get,
-                    url,
-                    session=session
-                )
+                item = buffered.get_nowait()
+            except queue.Empty:
+                return True
+            if item is FEED_END:
+                return False
+            if isinstance(item, BaseException):
+                raise item
+            self._schedule(item, raw_pages)
+        return True
 
-                raw_pages.append({
-                    "url": url,
-                    "html": response.text,
-                    "status": response.status_code,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
+    def _produce(self, source: Iterator[str], buffered: queue.Queue, stop: threading.Event, wake):
+        """
+        Producer thread: pulls source (which may block on file or
+        journal reads) into buffered, then FEED_END;
+        an exception from source is handed over instead. wake() runs
+        whenever the buffer goes from empty to non-empty, so a starved
+        event loop picks new URLs up at once.
+        """
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    buffered.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                if item is FEED_END or buffered.qsize() <= 1:
+                    wake()
+                return True
+            return False
+
+        try:
+            for url in source:
+                if not put(url):
+                    return
+            put(FEED_END)
+        except Exception as e:
+            put(e)
+            wake()
+
+    def _dispatched(self, started: float):
+        if self.first_dispatch_at is None:
+            self.first_dispatch_at = time.monotonic()
+            self.feed_stats["first_dispatch_ms"] = round((self.first_dispatch_at - started) * 1000, 1)
+
+    def _fetch_one(self, url: str) -> Dict:
+        """
+        Fetch a single URL (blocking) and format it as a raw page dict.
+        """
+        page, pointer = self._fetch_page(url)
+        if self.journal:
+            self.journal.record(page, pointer)
+        return page
+
+    def _fetch_page(self, url: str) -> Tuple[Dict, Optional[Tuple[int, int]]]:
+        """Raw page dict plus its archive (offset, length), if archived."""
+        domain = self._get_domain(url)
+        session = self.session_manager.get_session(domain)
+
+        try:
+            response = self.retry_handler.run(
+                self.http_client.get,
+                url,
+                session=session,
+                domain=domain,
+            )
+            return self._response_page(url, domain, response)
+
+        except Exception as e:
+            return self._error_page(url, domain, e), None
 
-            except Exception as e:
-                raw_pages.append({
+    def _fetch_attempt(
+        self,
+        url: str,
+        attempt: int,
+        request: Optional[FetchRequest] = None,
+    ) -> Tuple[Optional[Dict], float]:
+        """
+        One attempt at `url`, never sleeping.
+        Returns (page, 0) once the URL is finished (journaled), or
+        (None, delay) when it should be retried after `delay` seconds;
+        the caller defers it on the scheduler.
+        A request's page is only journaled / archived if request.record.
+        """
+        domain = self._get_domain(url)
+        session = self.session_manager.get_session(domain)
+        record = request is None or request.record
+
+        try:
+            response = self.retry_handler.attempt(
+                self.http_client.get,
+                url,
+                session=session,
+                domain=domain,
+                attempt=attempt,
+                allowed_types=request.allowed_types if request else None,
+                max_bytes=request.max_bytes if request else None,
+            )
+            page, pointer = self._response_page(url, domain, response, archive=record)
+
+        except Exception as e:
+            if (
+                getattr(e, "retryable", False)
+                and attempt < self.retry_handler.max_retries
+                and self._take_retry()
+            ):
+                return None, self.retry_handler.delay_for(attempt, e)
+            page, pointer = self._error_page(url, domain, e), None
+
+        if self.journal and record:
+            self.journal.record(page, pointer)
+        return page, 0.0
+
+    def _take_retry(self) -> bool:
+        with self.retry_lock:
+            if self.retry_budget is not None and self.retry_counters["deferred"] >= self.retry_budget:
+                self.retry_counters["budget_exhausted"] += 1
+                return False
+            self.retry_counters["deferred"] += 1
+            return True
+
+    def _response_page(
+        self,
+        url: str,
+        domain: str,
+        response,
+        archive: bool = True,
+    ) -> Tuple[Dict, Optional[Tuple[int, int]]]:
+        timestamp = datetime.utcnow().isoformat()
+        retries = getattr(response, "attempts", 1) - 1
+        self.telemetry.record_retries(domain, retries)
+
+        if response.skipped:
+            return {
+                "url": url,
+                "content": None,
+                "status": "skipped",
+                "error": response.skipped,
+                "timestamp": timestamp
+            }, None
+
+        pointer = None
+        if self.archive and archive:
+            pointer = self.archive.write(
+                url,
+                response.status_code,
+                response.headers,
+                response.content,
+                timestamp,
+            )
+
+        return {
+            "url": url,
+            # raw bytes + sniffed charset; parsers take them as-is
+            "content": response.content,
+            "encoding": sniff_charset(response.headers.get("Content-Type", ""), response.content),
+            "status": response.status_code,
+            "timestamp": timestamp,
+            "timings": getattr(response, "timings", {}),
+            "bytes": len(response.content),
+            "retries": retries,
+            "proxy": response.proxy,
+        }, pointer
+
+    def _error_page(self, url: str, domain: str, error: Exception) -> Dict:
+        self.telemetry.record_retries(domain, getattr(error, "attempts", 1) - 1)
+        return {
+            "url": url,
+            "content": None,
+            "status": "blocked" if isinstance(error, BlockedPageError) else "error",
+            "error": str(error),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def resume(self, urls: List[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        Split urls into pages restored from the journal + archive and
+        URLs that still need fetching. Completed URLs whose body was
+        not archived are fetched again. Can be called once per batch of
+        a streamed input; the journal is read and the archive opened on
+        the first call only.
+        """
+        if not self.journal:
+            return [], list(urls)
+
+        if self.resume_completed is None:
+            self.resume_completed = self.journal.completed()
+        completed = self.resume_completed
+        if self.resume_reader is None and self.archive and Path(self.archive.path).stat().st_size:
+            # earlier runs' records only: this run appends past the mapped size
+            self.resume_reader = PageArchiveReader(str(self.archive.path))
+        reader = self.resume_reader
+
+        restored: List[Dict] = []
+        remaining: List[str] = []
+        for url in urls:
+            entry = completed.get(url)
+            page = None
+            if entry and entry["status"] == "skipped":
+                page = {
                     "url": url,
-                    "html": None,
-                    "status": "error",
-                    "error": str(e),
-                    "timestamp": datetime.utcnow().isoformat()
-                })
+                    "content": None,
+                    "status": "skipped",
+                    "error": entry["error"],
+                    "timestamp": entry["timestamp"],
+                }
+            elif entry and entry["pointer"] and reader:
+                page = reader.read_at(*entry["pointer"])
 
-            # polite crawling delay
-            time.sleep(0.5)
+            if page:
+                page["url"] = url
+                restored.append(page)
+            else:
+                remaining.append(url)
+
+        self.journal.mark_resumed(len(restored))
+        return restored, remaining
+
+    def fetch_urls(self, urls: Iterable[str]) -> List[Dict]:
+        """
+        Fetch all URLs.
+        urls may be any iterable, consumed lazily: at most feed_window
+        URLs wait on the scheduler, so fetching starts on the first URLs
+        while the rest of a large input is still being read.
+        Requests are interleaved round-robin across domains, each domain
+        keeping its own minimum interval, so one domain's politeness
+        delay never idles the others.
+        concurrency > 1 switches to the asyncio engine; output order
+        always matches input order.
+        Failed attempts are deferred on the scheduler until their backoff
+        is due instead of sleeping, so other URLs keep flowing.
+        urls may also carry FetchRequests (no output slot; their
+        follow-ups join the same run).
+        """
+        if self.concurrency > 1:
+            return asyncio.run(self.fetch_urls_async(urls))
+
+        started = time.monotonic()
+        source = iter(urls)
+        raw_pages: List[Dict] = []
+        feeding = True
+
+        while True:
+            if feeding:
+                feeding = self._feed(source, raw_pages)
+            if not self.scheduler.pending():
+                break
+            entry, wait = self.scheduler.next()
+            if entry is None:
+                time.sleep(wait or 0)
+                continue
+
+            self._dispatched(started)
+            domain, (index, url, attempt, request) = entry
+            page, retry_in = self._fetch_attempt(url, attempt, request)
+            self.scheduler.done(domain)
+            if page is None:
+                self.scheduler.defer(domain, (index, url, attempt + 1, request), retry_in)
+            else:
+                self._finish(index, request, page, raw_pages)
 
         return raw_pages
 
+    async def fetch_urls_async(self, urls: Iterable[str]) -> List[Dict]:
+        """
+        Keeps up to `concurrency` requests in flight overall and
+        `per_domain_concurrency` per domain, pulling work from the
+        domain scheduler.
+
+        Blocking HTTPClient calls run on a thread pool, one attempt at a
+        time; retries go back through the scheduler when due. The input
+        iterable is pulled on a producer thread into a bounded queue, so
+        slow input never stalls the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Condition()
+        started = time.monotonic()
+        raw_pages: List[Dict] = []
+        feeding = True
+        # requests in flight; their callbacks may still schedule follow-ups
+        running = 0
+
+        async def notify():
+            async with changed:
+                changed.notify_all()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(lambda: loop.create_task(notify()))
+            except RuntimeError:
+                pass  # loop already closed
+
+        buffered: queue.Queue = queue.Queue(maxsize=self.feed_window)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(iter(urls), buffered, stop, wake), daemon=True
+        )
+        producer.start()
+
+        async def next_entry():
+            nonlocal feeding, running
+            async with changed:
+                while True:
+                    if feeding:
+                        feeding = self._feed_buffered(buffered, raw_pages)
+                    if not self.scheduler.pending():
+                        if not feeding and not running:
+                            return None
+                        # woken when the producer hands over more URLs
+                        # or a finished request schedules follow-ups
+                        await changed.wait()
+                        continue
+                    entry, wait = self.scheduler.next()
+                    if entry is not None:
+                        self._dispatched(started)
+                        running += 1
+                        return entry
+                    try:
+                        # woken early when a request finishes
+                        await asyncio.wait_for(changed.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+
+            async def worker():
+                nonlocal running
+                while True:
+                    entry = await next_entry()
+                    if entry is None:
+                        return
+
+                    domain, (index, url, attempt, request) = entry
+                    page, retry_in = None, None
+                    try:
+                        page, retry_in = await loop.run_in_executor(
+                            executor, self._fetch_attempt, url, attempt, request
+                        )
+                    finally:
+                        async with changed:
+                            running -= 1
+                            self.scheduler.done(domain)
+                            if page is None and retry_in is not None:
+                                self.scheduler.defer(domain, (index, url, attempt + 1, request), retry_in)
+                            elif page is not None:
+                                self._finish(index, request, page, raw_pages)
+                            changed.notify_all()
+
+            try:
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            finally:
+                stop.set()
+
+        return raw_pages
+
+    def get_stats(self) -> Dict:
+        stats = {
+            "scheduler": self.scheduler.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "bytes": self.http_client.stats(),
+            "pool": self.session_manager.stats(),
+            "telemetry": self.telemetry.stats(),
+            "retries": {
+                "budget": self.retry_budget,
+                **self.retry_counters,
+            },
+            "feed": {"window": self.feed_window, **self.feed_stats},
+        }
+        if self.cache:
+            stats["http_cache"] = self.cache.stats()
+        if self.archive:
+            stats["archive"] = {
+                "path": str(self.archive.path),
+                "records": self.archive.records,
+            }
+        if self.journal:
+            stats["journal"] = self.journal.stats()
+        if self.proxy_pool:
+            stats["proxies"] = self.proxy_pool.stats()
+        if self.cassette:
+            stats["cassette"] = self.cassette.stats()
+        if self.controller:
+            stats["concurrency"] = self.controller.stats()
+        if self.http2:
+            stats["http2"] = self.http2.stats()
+        if self.session_store:
+            stats["session_state"] = self.session_store.stats()
+        if self.block_detector:
+            stats["blocks"] = self.block_detector.stats()
+        return stats
+
     def shutdown(self):
         self.session_manager.close_all()
+        if self.cache:
+            self.cache.close()
+        if self.archive:
+            self.archive.close()
+        if self.journal:
+            self.journal.close()
+        if self.resume_reader:
+            self.resume_reader.close()
+        if self.cassette:
+            self.cassette.close()
+        if self.http2:
+            self.http2.close()
+        if self.session_store:
+            # after close_all, which saved every live cookie jar
+            self.session_store.close()
 
 stats = {
     "start_time": datetime.utcnow().isoformat(),
@@ -0,0 +1,194 @@
+import threading
+import time
+from typing import Dict, Iterator, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.fetch.telemetry import add_phase
+
+try:
+    import httpx
+except ImportError:  # optional backend: pip install "httpx[http2]"
+    httpx = None
+
+
+# connection-specific headers are illegal in HTTP/2 (RFC 9113 §8.2.2)
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+# httpcore trace events → telemetry phases
+TRACE_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "tls",
+}
+
+
+class HTTPXRawStream:
+    """
+    Minimal urllib3-style raw body over an httpx streaming response,
+    so requests.Response.iter_content / close work unchanged.
+    """
+
+    def __init__(self, response: "httpx.Response"):
+        self.response = response
+
+    def stream(self, chunk_size: int, decode_content: bool = True) -> Iterator[bytes]:
+        chunks = self.response.iter_bytes(chunk_size) if decode_content else self.response.iter_raw(chunk_size)
+        for chunk in chunks:
+            yield chunk
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return b"".join(self.stream(amt or 65536))
+
+    def tell(self) -> int:
+        # wire bytes, like urllib3's tell()
+        return self.response.num_bytes_downloaded
+
+    def close(self):
+        self.response.close()
+
+
+class HTTP2Transport:
+    """
+    HTTP/2 fetch backend (httpx).
+    Handles:
+    - one httpx client per origin → one multiplexed connection per host
+    - responses adapted to requests.Response (same downstream handling)
+    - connect / TLS phases into FetchTelemetry via httpcore trace
+    - per-origin request / connection / HTTP version counters
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15.0,
+        max_connections_per_host: int = 1,
+        prior_knowledge: bool = False,
+        verify: bool = True,
+    ):
+        if httpx is None:
+            raise ImportError('HTTP/2 backend requires httpx with HTTP/2 support: pip install "httpx[http2]"')
+
+        self.timeout = timeout
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        # h2c without Upgrade (test servers); real hosts negotiate h2 via ALPN
+        self.prior_knowledge = prior_knowledge
+        self.verify = verify
+
+        self.lock = threading.Lock()
+        self.clients: Dict[str, "httpx.Client"] = {}
+        self.origin_stats: Dict[str, Dict] = {}
+
+    # -----------------------------
+    # Clients
+    # -----------------------------
+    def _origin(self, url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _client(self, origin: str) -> "httpx.Client":
+        with self.lock:
+            client = self.clients.get(origin)
+            if client is None:
+                client = httpx.Client(
+                    http1=not self.prior_knowledge,
+                    http2=True,
+                    timeout=self.timeout,
+                    verify=self.verify,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections_per_host,
+                        max_keepalive_connections=self.max_connections_per_host,
+                    ),
+                )
+                self.clients[origin] = client
+                self.origin_stats[origin] = {"requests": 0, "connections": 0, "http_versions": {}}
+            return client
+
+    def _trace(self, origin: str):
+        started: Dict[str, float] = {}
+
+        def trace(event_name: str, info: Mapping):
+            base, _, stage = event_name.rpartition(".")
+            if stage == "started":
+                started[base] = time.perf_counter()
+            elif stage == "complete" and base in started:
+                if base in TRACE_PHASES:
+                    add_phase(TRACE_PHASES[base], time.perf_counter() - started[base])
+                if base == "connection.connect_tcp":
+                    with self.lock:
+                        self.origin_stats[origin]["connections"] += 1
+
+        return trace
+
+    # -----------------------------
+    # Requests
+    # -----------------------------
+    def _adapt(self, live: "httpx.Response", prepared: requests.PreparedRequest) -> requests.Response:
+        response = requests.Response()
+        response.status_code = live.status_code
+        response.reason = live.reason_phrase
+        response.headers = CaseInsensitiveDict(live.headers.items())
+        response.url = str(live.url)
+        response.raw = HTTPXRawStream(live)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = prepared
+        response.http_version = live.http_version
+
+        history = []
+        for hop in live.history:
+            previous = requests.Response()
+            previous.status_code = hop.status_code
+            previous.headers = CaseInsensitiveDict(hop.headers.items())
+            previous.url = str(hop.url)
+            history.append(previous)
+        response.history = history
+        return response
+
+    def get(self, url: str, headers: Mapping[str, str]) -> requests.Response:
+        """
+        Streaming GET; raises requests exceptions so RetryHandler,
+        the breaker and the proxy / AIMD feedback treat it like HTTP/1.1.
+        """
+        origin = self._origin(url)
+        client = self._client(origin)
+        headers = {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+        request = client.build_request(
+            "GET", url, headers=headers, extensions={"trace": self._trace(origin)}
+        )
+        try:
+            live = client.send(request, stream=True)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+
+        with self.lock:
+            stats = self.origin_stats[origin]
+            stats["requests"] += 1
+            versions = stats["http_versions"]
+            versions[live.http_version] = versions.get(live.http_version, 0) + 1
+
+        return self._adapt(live, requests.Request("GET", url, headers=headers).prepare())
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {
+                origin: {
+                    "requests": s["requests"],
+                    "connections": s["connections"],
+                    "requests_per_connection": round(s["requests"] / s["connections"], 1) if s["connections"] else 0.0,
+                    "http_versions": dict(s["http_versions"]),
+                }
+                for origin, s in self.origin_stats.items()
+            }
+
+    def close(self):
+        with self.lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients.clear()
@@ -0,0 +1,285 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from inputs.url_validator import normalize_url
+
+
+PERMANENT_REDIRECTS = (301, 308)
+MAX_REDIRECT_HOPS = 5
+
+# describe the wire encoding, not the decoded body we store
+TRANSPORT_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class HTTPCache:
+    """
+    Persistent HTTP response cache (SQLite).
+    Handles:
+    - conditional requests (ETag / Last-Modified)
+    - serving cached bodies on 304
+    - permanent redirect memory (301 / 308)
+    - LRU eviction under a size limit
+    - hit / miss / bytes-saved counters
+    """
+
+    def __init__(self, path: str = "output/http_cache.sqlite", max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " headers TEXT,"
+            " encoding TEXT,"
+            " body BLOB,"
+            " size INTEGER,"
+            " last_access REAL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS redirects (source TEXT PRIMARY KEY, target TEXT)"
+        )
+        self.conn.commit()
+
+        row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self.total_bytes = row[0]
+
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "evictions": 0,
+            "bytes_saved": 0,
+            "redirects_skipped": 0,
+        }
+
+    # -----------------------------
+    # Keys / redirects
+    # -----------------------------
+    def canonical(self, url: str) -> str:
+        # http and https pages are cached apart: a site may serve both differently
+        return normalize_url(url, force_https=False) or url
+
+    def resolve_redirect(self, url: str) -> str:
+        """
+        Follow remembered permanent redirects so the hop is skipped.
+        """
+        resolved = url
+        with self.lock:
+            for _ in range(MAX_REDIRECT_HOPS):
+                row = self.conn.execute(
+                    "SELECT target FROM redirects WHERE source = ?",
+                    (self.canonical(resolved),)
+                ).fetchone()
+                if not row:
+                    break
+                resolved = row[0]
+
+            if resolved != url:
+                self.counters["redirects_skipped"] += 1
+
+        return resolved
+
+    def _record_redirects(self, response: requests.Response):
+        hops = list(response.history) + [response]
+        for hop, following in zip(hops, hops[1:]):
+            if hop.status_code in PERMANENT_REDIRECTS:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO redirects (source, target) VALUES (?, ?)",
+                    (self.canonical(hop.url), following.url)
+                )
+
+    # -----------------------------
+    # Conditional requests
+    # -----------------------------
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ?",
+                (self.canonical(url),)
+            ).fetchone()
+
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def handle(self, url: str, response: requests.Response) -> requests.Response:
+        """
+        Post-process a live response:
+        - 304 → rebuild the cached 200 response
+        - 304 with nothing stored → returned as-is; the caller refetches
+          without validators, and that response counts as the miss
+        - 200 with validators → store
+        """
+        key = self.canonical(url)
+
+        with self.lock:
+            self._record_redirects(response)
+
+            if response.status_code == 304:
+                row = self.conn.execute(
+                    "SELECT headers, encoding, body, size FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row:
+                    self.conn.execute(
+                        "UPDATE responses SET last_access = ?,"
+                        " etag = COALESCE(?, etag),"
+                        " last_modified = COALESCE(?, last_modified)"
+                        " WHERE key = ?",
+                        (
+                            time.time(),
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                            key,
+                        )
+                    )
+                    self.conn.commit()
+                    self.counters["hits"] += 1
+                    body = zlib.decompress(row[2])
+                    self.counters["bytes_saved"] += len(body)
+                    return self._build_response(response, row[0], row[1], body)
+
+                self.conn.commit()
+                return response
+
+            self.counters["misses"] += 1
+
+            if response.status_code == 200:
+                # next run requests the permanent target directly
+                permanent = response.history and all(
+                    hop.status_code in PERMANENT_REDIRECTS for hop in response.history
+                )
+                self._store(self.canonical(response.url) if permanent else key, response)
+
+            self.conn.commit()
+
+        return response
+
+    # -----------------------------
+    # Storage
+    # -----------------------------
+    def _store(self, key: str, response: requests.Response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        # never serve a cut-short body as the full page later
+        if getattr(response, "skipped", None) or getattr(response, "partial", False):
+            return
+
+        body = zlib.compress(response.content)
+        size = len(body)
+        if size > self.max_bytes:
+            return
+
+        old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if old:
+            self.total_bytes -= old[0]
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, etag, last_modified, headers, encoding, body, size, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                etag,
+                last_modified,
+                json.dumps(self._body_headers(response.headers)),
+                response.encoding,
+                body,
+                size,
+                time.time(),
+            )
+        )
+        self.total_bytes += size
+        self.counters["stored"] += 1
+        self._evict()
+
+    def _body_headers(self, headers) -> Dict[str, str]:
+        return {
+            k: v for k, v in headers.items()
+            if k.lower() not in TRANSPORT_HEADERS
+        }
+
+    def _evict(self):
+        """
+        Drop least-recently-used entries until under max_bytes.
+        """
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if not row:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self.total_bytes -= row[1]
+            self.counters["evictions"] += 1
+
+    def _build_response(
+        self,
+        live: requests.Response,
+        headers_json: str,
+        encoding: Optional[str],
+        body: bytes,
+    ) -> requests.Response:
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.reason = "OK"
+        cached.headers = CaseInsensitiveDict(json.loads(headers_json))
+        cached.headers.update(self._body_headers(live.headers))
+        cached._content = body
+        cached.encoding = encoding
+        cached.url = live.url
+        cached.request = live.request
+        cached.history = live.history
+        cached.elapsed = live.elapsed
+        cached.from_cache = True
+        # same per-fetch attributes HTTPClient sets on live responses
+        cached.skipped = None
+        cached.partial = False
+        cached.blocked = None
+        if hasattr(live, "timings"):
+            cached.timings = live.timings
+        return cached
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": self.total_bytes,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
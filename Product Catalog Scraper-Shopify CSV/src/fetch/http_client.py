@@ -1,6 +1,19 @@
+import re
+import time
 import random
+import threading
 import requests
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.fetch.http_cache import HTTPCache
+from src.fetch.proxy_pool import ProxyPool
+from src.fetch.cassette import Cassette
+from src.fetch.concurrency_controller import AIMDController
+from src.fetch.http2_client import HTTP2Transport
+from src.fetch.session_store import SessionStore
+from src.fetch.block_detector import BlockDetector, BlockedPageError
+from src.fetch.telemetry import FetchTelemetry, start_phases, take_phases, split_phases
 
 
 # -----------------------------
@@ -37,6 +50,56 @@ BASE_HEADERS = {
 }
 
 
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+LD_JSON_OPEN = re.compile(rb"<script[^>]+application/ld\+json", re.IGNORECASE)
+SCRIPT_CLOSE = re.compile(rb"</script\s*>", re.IGNORECASE)
+HEAD_CLOSE = re.compile(rb"</head\s*>", re.IGNORECASE)
+
+
+class StructuredDataWatcher:
+    """
+    Incremental scanner over a growing body buffer.
+    Done once </head> has been seen and at least one
+    application/ld+json block has been closed.
+    """
+
+    def __init__(self):
+        self.head_closed = False
+        self.head_pos = 0
+        self.pos = 0
+        self.in_block = False
+        self.blocks = 0
+
+    def feed(self, buf: bytearray) -> bool:
+        if not self.head_closed:
+            if HEAD_CLOSE.search(buf, self.head_pos):
+                self.head_closed = True
+            else:
+                self.head_pos = max(0, len(buf) - 16)
+
+        while True:
+            if self.in_block:
+                m = SCRIPT_CLOSE.search(buf, self.pos)
+                if not m:
+                    self.pos = max(self.pos, len(buf) - 16)
+                    break
+                self.in_block = False
+                self.blocks += 1
+            else:
+                m = LD_JSON_OPEN.search(buf, self.pos)
+                if not m:
+                    # tag may be split across chunks
+                    self.pos = max(self.pos, len(buf) - 256)
+                    break
+                self.in_block = True
+            self.pos = m.end()
+
+        return self.head_closed and self.blocks > 0 and not self.in_block
+
+
 class HTTPClient:
     """
     Low-level HTTP client abstraction.
@@ -44,7 +107,15 @@ class HTTPClient:
     - header building
     - user-agent rotation
     - timeout config
-    - proxy support (future ready)
+    - conditional requests via optional HTTPCache
+    - streamed bodies (size cap, non-HTML abort, structured-data early stop)
+    - per-attempt timing phases via optional FetchTelemetry
+    - static proxies, or a health-scored ProxyPool (proxy recorded on response.proxy)
+    - record / replay through an optional Cassette (offline, deterministic runs)
+    - per-attempt status / latency feedback to an optional AIMDController
+    - optional HTTP/2 backend for selected domains (multiplexed, httpx)
+    - bot-block / CAPTCHA detection on the first KB of the body
+      (BlockDetector; raises BlockedPageError before anything is cached)
     """
 
     def __init__(
@@ -52,27 +123,304 @@ class HTTPClient:
         timeout: int = 15,
         base_headers: Optional[Dict[str, str]] = None,
         proxies: Optional[Dict[str, str]] = None,
+        cache: Optional[HTTPCache] = None,
+        max_body_bytes: int = 5 * 1024 * 1024,
+        html_only: bool = True,
+        structured_data_only: bool = False,
+        structured_data_domains: Optional[Tuple[str, ...]] = None,
+        telemetry: Optional[FetchTelemetry] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        cassette: Optional[Cassette] = None,
+        controller: Optional[AIMDController] = None,
+        http2: Optional[HTTP2Transport] = None,
+        http2_domains: Optional[Tuple[str, ...]] = None,
+        session_store: Optional[SessionStore] = None,
+        block_detector: Optional[BlockDetector] = None,
     ):
         self.timeout = timeout
         self.base_headers = base_headers or BASE_HEADERS.copy()
         self.proxies = proxies
+        self.cache = cache
+        self.max_body_bytes = max_body_bytes
+        self.html_only = html_only
+        self.structured_data_only = structured_data_only
+        self.structured_data_domains = set(structured_data_domains or ())
+        self.telemetry = telemetry
+        self.proxy_pool = proxy_pool
+        self.cassette = cassette
+        self.controller = controller
+        self.http2 = http2
+        self.http2_domains = set(http2_domains or ())
+        self.session_store = session_store
+        self.block_detector = block_detector
+
+        self.stats_lock = threading.Lock()
+        self.byte_stats: Dict[str, Dict[str, int]] = {}
 
     def _build_headers(self) -> Dict[str, str]:
         headers = self.base_headers.copy()
         headers["User-Agent"] = random.choice(USER_AGENTS)
         return headers
 
-    def get(self, url: str, session: Optional[requests.Session] = None) -> requests.Response:
+    def _get_domain(self, url: str) -> str:
+        return urlparse(url).netloc.lower().replace("www.", "")
+
+    def uses_http2(self, domain: str) -> bool:
+        if not self.http2:
+            return False
+        # configured as bare hosts; domain keys may carry a port
+        return bool({"*", domain, domain.split(":")[0]} & self.http2_domains)
+
+    def _record_bytes(self, domain: str, **counts: int):
+        with self.stats_lock:
+            d = self.byte_stats.setdefault(domain, {
+                "downloaded": 0,
+                "skipped": 0,
+                "aborted_non_html": 0,
+                "truncated": 0,
+                "stopped_early": 0,
+                "blocked": 0,
+            })
+            for key, value in counts.items():
+                d[key] += value
+
+    def _read_body(
+        self,
+        response: requests.Response,
+        domain: str,
+        allowed_types: Tuple[str, ...],
+        max_bytes: int,
+    ) -> int:
+        """
+        Streams the body into response._content, returns wire bytes read.
+        Sets response.skipped (reason) or response.partial (True)
+        when the body was not read in full, and response.blocked
+        (reason) when the body start looks like a block page.
+        """
+        response.skipped = None
+        response.partial = False
+        response.blocked = None
+        declared = int(response.headers.get("Content-Length") or 0)
+
+        content_type = response.headers.get("Content-Type", "").strip().lower()
+        if response.status_code == 200 and allowed_types and content_type \
+                and not content_type.startswith(allowed_types):
+            response.close()
+            response._content = b""
+            response._content_consumed = True
+            response.skipped = f"content-type: {content_type}"
+            self._record_bytes(domain, skipped=declared, aborted_non_html=1)
+            return 0
+
+        structured = (self.structured_data_only or domain in self.structured_data_domains) \
+            and (not content_type or content_type.startswith(HTML_CONTENT_TYPES))
+        watcher = StructuredDataWatcher() if structured else None
+        buf = bytearray()
+        stop = None
+        detector = self.block_detector
+        sniffed = detector is None
+
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            buf.extend(chunk)
+            if not sniffed and len(buf) >= detector.sniff_bytes:
+                sniffed = True
+                response.blocked = detector.classify(
+                    domain, response.status_code, response.headers, bytes(buf), declared or None
+                )
+                if response.blocked:
+                    stop = "blocked"
+                    break
+            if len(buf) >= max_bytes:
+                del buf[max_bytes:]
+                stop = "truncated"
+                break
+            if watcher and watcher.feed(buf):
+                stop = "stopped_early"
+                break
+
+        if not sniffed:
+            response.blocked = detector.classify(
+                domain, response.status_code, response.headers, bytes(buf),
+                declared or None if stop else len(buf),
+            )
+
+        # wire bytes (compressed when Content-Encoding is set)
+        downloaded = response.raw.tell() if hasattr(response.raw, "tell") else len(buf)
+        response.close()
+        response._content = bytes(buf)
+        response._content_consumed = True
+
+        if stop:
+            response.partial = True
+            self._record_bytes(
+                domain,
+                downloaded=downloaded,
+                skipped=max(0, declared - downloaded),
+                **{stop: 1},
+            )
+        else:
+            self._record_bytes(domain, downloaded=downloaded)
+
+        return downloaded
+
+    def get(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        allowed_types: Optional[Tuple[str, ...]] = None,
+        max_bytes: Optional[int] = None,
+        conditional: bool = True,
+    ) -> requests.Response:
+        """
+        allowed_types: Content-Type prefixes to accept; () accepts any.
+        Defaults to HTML when html_only is set.
+        max_bytes: per-call body cap, defaults to max_body_bytes.
+        conditional: send the cache's validators (If-None-Match etc.).
+        """
+        if allowed_types is None:
+            allowed_types = HTML_CONTENT_TYPES if self.html_only else ()
+
+        if self.cassette and self.cassette.replaying:
+            return self._replay(url, allowed_types, max_bytes)
+
         headers = self._build_headers()
+        # cassettes are keyed by the URL callers ask for (what _replay looks up)
+        requested_url = url
+
+        if self.cache:
+            url = self.cache.resolve_redirect(url)
+        if self.session_store:
+            # temporary (locale / consent) redirects resolved in earlier runs
+            url = self.session_store.resolve(self._get_domain(url), url)
+        if self.cache and conditional:
+            headers.update(self.cache.conditional_headers(url))
 
         client = session if session else requests
+        domain = self._get_domain(url)
+
+        proxy = self.proxy_pool.choose(domain) if self.proxy_pool and not self.uses_http2(domain) else None
+        proxies = {"http": proxy, "https": proxy} if proxy else self.proxies
+
+        if self.telemetry:
+            start_phases()
+        started = time.perf_counter()
+
+        try:
+            if self.uses_http2(domain):
+                # own per-host connection; session / proxies do not apply
+                response = self.http2.get(url, headers)
+            else:
+                response = client.get(
+                    url,
+                    headers=headers,
+                    timeout=self.timeout,
+                    proxies=proxies,
+                    allow_redirects=True,
+                    stream=True,
+                )
+        except requests.RequestException:
+            if proxy:
+                self.proxy_pool.report(proxy, domain, ok=False)
+            if self.controller:
+                self.controller.record(domain, None, None)
+            raise
+
+        headers_at = time.perf_counter()
+        try:
+            downloaded = self._read_body(
+                response, domain, allowed_types, max_bytes or self.max_body_bytes
+            )
+        except Exception:
+            # cut off mid-body: same as a transport error
+            if proxy:
+                self.proxy_pool.report(proxy, domain, ok=False)
+            if self.controller:
+                self.controller.record(domain, None, None)
+            raise
+
+        # reported once the body is in, so body-level outcomes count
+        if response.blocked:
+            # a block page bans this proxy and counts as congestion
+            if proxy:
+                self.proxy_pool.report(proxy, domain, ok=False, banned=True)
+            if self.controller:
+                self.controller.record(domain, None, None)
+        else:
+            if self.controller:
+                self.controller.record(domain, response.status_code, headers_at - started)
+            if proxy:
+                banned = self.proxy_pool.is_ban(response.status_code)
+                self.proxy_pool.report(
+                    proxy,
+                    domain,
+                    ok=response.status_code < 500,
+                    latency=headers_at - started,
+                    banned=banned,
+                )
+
+        if self.telemetry:
+            response.timings = split_phases(
+                take_phases(), started, headers_at, time.perf_counter()
+            )
+            self.telemetry.record_attempt(domain, response.timings, downloaded)
+
+        if response.blocked:
+            response.proxy = proxy
+            raise BlockedPageError(response.blocked, response)
+
+        if self.session_store:
+            self.session_store.record(domain, url, response)
+
+        if self.cache:
+            response = self.cache.handle(url, response)
+            if response.status_code == 304 and conditional:
+                # no stored body to serve it from: fetch the page whole
+                response.close()
+                return self.get(requested_url, session, allowed_types, max_bytes, conditional=False)
+
+        if self.cassette:
+            self.cassette.record(requested_url, response, headers_at - started)
+
+        response.proxy = proxy
+        return response
+
+    def _replay(
+        self,
+        url: str,
+        allowed_types: Tuple[str, ...],
+        max_bytes: Optional[int],
+    ) -> requests.Response:
+        """Serve from the cassette through the same body / telemetry path."""
+        domain = self._get_domain(url)
+        started = time.perf_counter()
+        try:
+            response = self.cassette.replay(url)
+        except requests.RequestException:
+            if self.controller:
+                self.controller.record(domain, None, None)
+            raise
+        headers_at = time.perf_counter()
+        try:
+            downloaded = self._read_body(
+                response, domain, allowed_types, max_bytes or self.max_body_bytes
+            )
+        except Exception:
+            if self.controller:
+                self.controller.record(domain, None, None)
+            raise
+        if self.controller:
+            # block pages count as congestion, as on the live path
+            status = None if response.blocked else response.status_code
+            self.controller.record(domain, status, headers_at - started)
+        if self.telemetry:
+            response.timings = split_phases({}, started, headers_at, time.perf_counter())
+            self.telemetry.record_attempt(domain, response.timings, downloaded)
 
-        response = client.get(
-            url,
-            headers=headers,
-            timeout=self.timeout,
-            proxies=self.proxies,
-            allow_redirects=True,
-        )
+        response.proxy = None
+        if response.blocked:
+            raise BlockedPageError(response.blocked, response)
+        return response
 
-        return response
\ No newline at end of file
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self.stats_lock:
+            return {domain: dict(d) for domain, d in self.byte_stats.items()}
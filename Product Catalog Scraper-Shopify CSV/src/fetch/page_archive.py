@@ -0,0 +1,234 @@
+import gzip
+import mmap
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from http.client import responses as HTTP_REASONS
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from src.fetch.charset import sniff_charset
+
+
+INDEX_SUFFIX = ".idx"
+
+
+class PageArchiveWriter:
+    """
+    Append-only WARC/1.1 response archive.
+    Handles:
+    - one gzip member per record (standard .warc.gz layout)
+    - sidecar offset index (<archive>.idx: offset, length, url)
+    - thread-safe appends
+    """
+
+    def __init__(self, path: str = "output/pages.warc.gz"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.archive = open(self.path, "ab")
+        self.index = open(str(self.path) + INDEX_SUFFIX, "a", encoding="utf-8")
+        self.records = 0
+
+    def write(
+        self,
+        url: str,
+        status: int,
+        headers: Mapping[str, str],
+        body: bytes,
+        timestamp: Optional[str] = None,
+    ) -> Tuple[int, int]:
+        """
+        Appends one response record, returns (offset, length).
+        """
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        reason = HTTP_REASONS.get(status, "")
+
+        http_block = [f"HTTP/1.1 {status} {reason}"]
+        for key, value in headers.items():
+            # body is stored decoded
+            if key.lower() in ("content-encoding", "content-length", "transfer-encoding"):
+                continue
+            http_block.append(f"{key}: {value}")
+        http_block.append(f"Content-Length: {len(body)}")
+        payload = ("\r\n".join(http_block) + "\r\n\r\n").encode("utf-8") + body
+
+        warc_headers = "\r\n".join([
+            "WARC/1.1",
+            "WARC-Type: response",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {timestamp}Z",
+            f"WARC-Target-URI: {url}",
+            "Content-Type: application/http; msgtype=response",
+            f"Content-Length: {len(payload)}",
+        ])
+        record = gzip.compress(
+            warc_headers.encode("utf-8") + b"\r\n\r\n" + payload + b"\r\n\r\n"
+        )
+
+        with self.lock:
+            offset = self.archive.tell()
+            self.archive.write(record)
+            self.archive.flush()
+            self.index.write(f"{offset}\t{len(record)}\t{url}\n")
+            self.index.flush()
+            self.records += 1
+
+        return offset, len(record)
+
+    def close(self):
+        with self.lock:
+            self.archive.close()
+            self.index.close()
+
+
+class PageArchiveReader:
+    """
+    Memory-mapped reader for PageArchiveWriter archives.
+    Yields raw page dicts (same shape as Fetcher output) by URL
+    or in bulk, decompressing one record at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.file = open(self.path, "rb")
+        size = os.path.getsize(self.path)
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        self.entries: List[Tuple[int, int, str]] = self._load_index()
+        self.by_url: Dict[str, Tuple[int, int]] = {
+            url: (offset, length) for offset, length, url in self.entries
+        }
+
+    # -----------------------------
+    # Index
+    # -----------------------------
+    def _load_index(self) -> List[Tuple[int, int, str]]:
+        index_path = Path(str(self.path) + INDEX_SUFFIX)
+        if not index_path.exists():
+            return self._scan_index()
+
+        entries = []
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t", 2)
+                if len(parts) != 3:
+                    # torn final line after a crash
+                    continue
+                offset, length, url = int(parts[0]), int(parts[1]), parts[2]
+                if offset + length <= len(self.mm):
+                    entries.append((offset, length, url))
+        return entries
+
+    def _scan_index(self) -> List[Tuple[int, int, str]]:
+        """
+        Rebuild the index by walking gzip members (no sidecar file).
+        """
+        entries = []
+        offset = 0
+        total = len(self.mm)
+
+        while offset < total:
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            head = b""
+            pos = offset
+            try:
+                # inflate until this member ends; keep only the WARC header part
+                while not inflater.eof and pos < total:
+                    out = inflater.decompress(self.mm[pos:pos + 65536])
+                    if len(head) < 4096:
+                        head += out[:4096 - len(head)]
+                    pos += 65536
+            except zlib.error:
+                break
+            if not inflater.eof:
+                break
+
+            length = min(pos, total) - offset - len(inflater.unused_data)
+            url = self._warc_header(head, "WARC-Target-URI")
+            if url:
+                entries.append((offset, length, url))
+            offset += length
+
+        return entries
+
+    def _warc_header(self, block: bytes, name: str) -> Optional[str]:
+        header_block = block.split(b"\r\n\r\n", 1)[0].decode("utf-8", "replace")
+        for line in header_block.split("\r\n")[1:]:
+            key, _, value = line.partition(":")
+            if key.strip().lower() == name.lower():
+                return value.strip()
+        return None
+
+    # -----------------------------
+    # Records
+    # -----------------------------
+    def _parse(self, offset: int, length: int) -> Tuple[bytes, int, Dict[str, str], bytes]:
+        """(WARC header block, HTTP status, HTTP headers, body) of one record."""
+        record = gzip.decompress(self.mm[offset:offset + length])
+
+        warc_block, _, rest = record.partition(b"\r\n\r\n")
+        http_block, _, body = rest.partition(b"\r\n\r\n")
+        if body.endswith(b"\r\n\r\n"):
+            body = body[:-4]
+
+        http_lines = http_block.decode("iso-8859-1").split("\r\n")
+        status = int(http_lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in http_lines[1:]:
+            key, _, value = line.partition(":")
+            headers[key.strip()] = value.strip()
+
+        return warc_block, status, headers, body
+
+    def _read(self, offset: int, length: int) -> Dict:
+        warc_block, status, headers, body = self._parse(offset, length)
+
+        timestamp = self._warc_header(warc_block, "WARC-Date") or ""
+        return {
+            "url": self._warc_header(warc_block, "WARC-Target-URI"),
+            "content": body,
+            "encoding": sniff_charset(headers.get("Content-Type", ""), body),
+            "status": status,
+            "timestamp": timestamp.rstrip("Z"),
+        }
+
+    def read_at(self, offset: int, length: int) -> Optional[Dict]:
+        """Page stored at a known (offset, length), e.g. from the fetch journal."""
+        if offset + length > len(self.mm):
+            return None
+        return self._read(offset, length)
+
+    def response(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Latest (status, headers, body) stored for `url`, or None."""
+        location = self.by_url.get(url)
+        if not location:
+            return None
+        _, status, headers, body = self._parse(*location)
+        return status, headers, body
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Latest archived page for `url`, or None."""
+        location = self.by_url.get(url)
+        if not location:
+            return None
+        return self._read(*location)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """All pages in archive order (latest copy per URL only)."""
+        for offset, length, url in self.entries:
+            if self.by_url.get(url) == (offset, length):
+                yield self._read(offset, length)
+
+    def __len__(self) -> int:
+        return len(self.by_url)
+
+    def urls(self) -> List[str]:
+        return list(self.by_url)
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self.file.close()
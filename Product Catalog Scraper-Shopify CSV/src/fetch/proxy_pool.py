@@ -0,0 +1,186 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class DomainBans:
+    """Ban signals for one proxy on one target domain."""
+
+    def __init__(self):
+        self.rate = 0.0  # EWMA of ban outcomes
+        self.consecutive = 0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+
+
+class ProxyHealth:
+    """Per-proxy health: success counts, latency EWMA, quarantines."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.successes = 0
+        self.failures = 0
+        self.bans = 0
+        self.latency_ewma: Optional[float] = None
+        self.consecutive_failures = 0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+        self.domain_bans: Dict[str, DomainBans] = {}
+
+
+class ProxyPool:
+    """
+    Health-scored proxy pool.
+    Handles:
+    - success rate (Laplace-smoothed) and latency EWMA per proxy
+    - weighted random choice: score = success_rate^2 / latency,
+      scaled down by the proxy's ban rate on the target domain
+    - per-domain ban signals (403 / 429 / block pages): consecutive bans
+      quarantine that proxy for that domain only
+    - repeated transport failures → proxy quarantined for all domains
+    - exponential cool-off on each repeat quarantine, reset by a success
+    """
+
+    def __init__(
+        self,
+        proxies: List[str],
+        ewma_alpha: float = 0.2,
+        base_cooldown: float = 30.0,
+        max_cooldown: float = 1800.0,
+        failure_threshold: int = 3,
+        ban_threshold: int = 2,
+        ban_statuses: tuple = (403, 429),
+    ):
+        self.proxies = {url: ProxyHealth(url) for url in proxies}
+        self.ewma_alpha = ewma_alpha
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.failure_threshold = failure_threshold
+        self.ban_threshold = ban_threshold
+        self.ban_statuses = ban_statuses
+        self.lock = threading.Lock()
+        self.exhausted = 0
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    # -----------------------------
+    # Selection
+    # -----------------------------
+    def _latency(self, health: ProxyHealth) -> float:
+        if health.latency_ewma is None:
+            # optimistic until measured, so new proxies get tried
+            known = [h.latency_ewma for h in self.proxies.values() if h.latency_ewma is not None]
+            return min(known) if known else 1.0
+        return max(health.latency_ewma, 0.001)
+
+    def score(self, health: ProxyHealth, domain: Optional[str] = None) -> float:
+        success_rate = (health.successes + 1) / (health.successes + health.failures + 2)
+        score = success_rate ** 2 / self._latency(health)
+        bans = health.domain_bans.get(domain)
+        if bans:
+            score *= max(1.0 - bans.rate, 0.01)
+        return score
+
+    def _released_at(self, health: ProxyHealth, domain: str) -> float:
+        bans = health.domain_bans.get(domain)
+        return max(health.quarantined_until, bans.quarantined_until if bans else 0.0)
+
+    def choose(self, domain: str) -> Optional[str]:
+        """
+        Weighted pick among proxies not quarantined for `domain`.
+        When every proxy is quarantined, the one released soonest is used.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if not self.proxies:
+                return None
+            candidates = [h for h in self.proxies.values() if self._released_at(h, domain) <= now]
+            if not candidates:
+                self.exhausted += 1
+                return min(self.proxies.values(), key=lambda h: self._released_at(h, domain)).url
+            weights = [self.score(h, domain) for h in candidates]
+            return random.choices(candidates, weights=weights)[0].url
+
+    # -----------------------------
+    # Feedback
+    # -----------------------------
+    def _cooldown(self, strikes: float) -> float:
+        return min(self.base_cooldown * 2 ** (strikes - 1), self.max_cooldown)
+
+    def is_ban(self, status: Optional[int]) -> bool:
+        return status in self.ban_statuses
+
+    def report(
+        self,
+        proxy: Optional[str],
+        domain: str,
+        ok: bool,
+        latency: Optional[float] = None,
+        banned: bool = False,
+    ):
+        """
+        ok=False without banned = transport error / 5xx from the proxy path.
+        banned=True = the target site refused this proxy.
+        """
+        health = self.proxies.get(proxy)
+        if health is None:
+            return
+        now = time.monotonic()
+
+        with self.lock:
+            if latency is not None:
+                if health.latency_ewma is None:
+                    health.latency_ewma = latency
+                else:
+                    health.latency_ewma += self.ewma_alpha * (latency - health.latency_ewma)
+
+            bans = health.domain_bans.setdefault(domain, DomainBans())
+            bans.rate += self.ewma_alpha * ((1.0 if banned else 0.0) - bans.rate)
+
+            if ok and not banned:
+                health.successes += 1
+                health.consecutive_failures = 0
+                health.strikes = 0
+                bans.consecutive = 0
+                bans.strikes = 0
+                return
+
+            health.failures += 1
+            if banned:
+                health.bans += 1
+                bans.consecutive += 1
+                if bans.consecutive >= self.ban_threshold:
+                    bans.strikes += 1
+                    bans.consecutive = 0
+                    bans.quarantined_until = now + self._cooldown(bans.strikes)
+                return
+
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold:
+                health.strikes += 1
+                health.consecutive_failures = 0
+                health.quarantined_until = now + self._cooldown(health.strikes)
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self.lock:
+            proxies = {}
+            for url, h in self.proxies.items():
+                total = h.successes + h.failures
+                proxies[url] = {
+                    "requests": total,
+                    "success_rate": round(h.successes / total, 3) if total else 0.0,
+                    "latency_ewma_ms": round(h.latency_ewma * 1000, 1) if h.latency_ewma is not None else None,
+                    "bans": h.bans,
+                    "score": round(self.score(h), 3),
+                    "quarantined": h.quarantined_until > now,
+                    "banned_domains": sorted(
+                        d for d, bans in h.domain_bans.items() if bans.quarantined_until > now
+                    ),
+                }
+            return {"proxies": proxies, "exhausted": self.exhausted}
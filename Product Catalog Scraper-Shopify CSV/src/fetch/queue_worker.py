@@ -0,0 +1,139 @@
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.fetch.fetcher import Fetcher
+from src.parse.parser_router import ParserRouter
+
+
+class QueueWorker:
+    """
+    Work-queue consumer:
+    - claims URL batches, fetches + parses them
+    - heartbeats the lease while a batch is in progress
+    - appends parsed products to <output_dir>/<worker>.jsonl
+    - acks fetched URLs, returns failed ones to the queue; blocked
+      pages go back after their domain's cool-off
+    - exits once the queue is drained
+    """
+
+    def __init__(
+        self,
+        queue,
+        fetcher: Fetcher,
+        output_dir: str = "output/parsed",
+        worker_id: str = None,
+        batch_size: int = 50,
+        poll_interval: float = 2.0,
+        heartbeat_interval: float = 30.0,
+    ):
+        self.queue = queue
+        self.fetcher = fetcher
+        self.parser = ParserRouter()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+
+        self.output_path = Path(output_dir) / f"{self.worker_id}.jsonl"
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.counters = {"batches": 0, "acked": 0, "returned": 0, "blocked": 0, "products": 0}
+
+    # -----------------------------
+    # Lease heartbeat
+    # -----------------------------
+    def _heartbeat(self, task_ids: List[int], stop: threading.Event):
+        while not stop.wait(self.heartbeat_interval):
+            self.queue.heartbeat(self.worker_id, task_ids)
+
+    # -----------------------------
+    # Batch
+    # -----------------------------
+    def process(self, batch: List) -> Dict:
+        task_ids = [task_id for task_id, _ in batch]
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(task_ids, stop), daemon=True)
+        beat.start()
+
+        try:
+            urls = [url for _, url in batch]
+            raw_pages = self.fetcher.fetch_urls(urls)
+        finally:
+            stop.set()
+            beat.join()
+
+        fetched = [page for page in raw_pages if page["content"]]
+        parsed = self.parser.parse_pages(fetched)
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            for product in parsed:
+                f.write(json.dumps(product, ensure_ascii=False) + "\n")
+
+        # transport errors / open circuits go back for another worker,
+        # block pages once the domain's cool-off is over
+        done, failed = [], []
+        blocked: Dict[str, List[int]] = {}
+        for (task_id, url), page in zip(batch, raw_pages):
+            if page["status"] == "error":
+                failed.append(task_id)
+            elif page["status"] == "blocked":
+                blocked.setdefault(self.fetcher._get_domain(url), []).append(task_id)
+            else:
+                done.append(task_id)
+
+        acked = self.queue.ack(self.worker_id, done) if done else 0
+        returned = self.queue.nack(self.worker_id, failed) if failed else 0
+        detector = self.fetcher.block_detector
+        for domain, ids in blocked.items():
+            delay = detector.cooloff_remaining(domain) if detector else 0.0
+            returned += self.queue.nack(self.worker_id, ids, delay=delay)
+            self.counters["blocked"] += len(ids)
+
+        self.counters["batches"] += 1
+        self.counters["acked"] += acked
+        self.counters["returned"] += returned
+        self.counters["products"] += len(parsed)
+        return self.counters
+
+    def run(self) -> Dict:
+        while True:
+            batch = self.queue.claim(self.worker_id, self.batch_size)
+            if batch:
+                self.process(batch)
+                continue
+
+            # nothing claimable: done, or other workers still hold leases
+            if not self.queue.stats()["remaining"]:
+                return self.counters
+            time.sleep(self.poll_interval)
+
+
+def format_queue_status(stats: Dict) -> str:
+    """Coordinator view: queue depth + per-worker throughput."""
+    depth = stats["depth"]
+    lines = [
+        f"Queue: queued={depth['queued']} leased={depth['leased']} "
+        f"done={depth['done']} failed={depth['failed']} expired_leases={stats['expired_leases']}",
+        f"{'Worker':<32}{'claimed':>9}{'done':>9}{'returned':>10}{'urls/sec':>10}{'seen':>8}",
+    ]
+    for worker, w in stats["workers"].items():
+        lines.append(
+            f"{worker[:31]:<32}{w['claimed']:>9}{w['done']:>9}{w['returned']:>10}"
+            f"{w['urls_per_sec']:>10}{w['last_seen_sec_ago']:>7}s"
+        )
+    return "\n".join(lines)
+
+
+def run_coordinator(queue, refresh: float = 5.0):
+    """Print queue status every `refresh` seconds until the queue drains."""
+    while True:
+        stats = queue.stats()
+        print(format_queue_status(stats))
+        print()
+        if not stats["remaining"]:
+            return stats
+        time.sleep(refresh)
@@ -1,15 +1,21 @@
 import time
 import random
-from typing import Callable, Any, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
 import requests
 
+from src.fetch.circuit_breaker import CircuitBreaker, CircuitOpenError
+
 
 class RetryHandler:
     """
     Handles:
-    - retry logic
+    - retry logic (inline via run, or one attempt at a time via attempt)
     - exponential backoff
     - jitter
+    - Retry-After (seconds / HTTP-date) on 429 / 503
+    - per-domain circuit breaking
     - network failure recovery
     - status-code based retry
     """
@@ -20,11 +26,15 @@ class RetryHandler:
         base_delay: float = 1.0,
         max_delay: float = 15.0,
         retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504),
+        max_retry_after: float = 120.0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
         self.max_retries = max_retries
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.retry_statuses = retry_statuses
+        self.max_retry_after = max_retry_after
+        self.circuit_breaker = circuit_breaker
 
     def _backoff(self, attempt: int) -> float:
         """
@@ -34,31 +44,101 @@ class RetryHandler:
         jitter = random.uniform(0, delay * 0.2)
         return delay + jitter
 
-    def run(self, func: Callable, *args, **kwargs) -> requests.Response:
+    def _retry_after(self, exc: Exception) -> Optional[float]:
         """
-        Executes a function with retry logic.
-        func should return requests.Response
+        Seconds requested by the server via Retry-After, if any.
+        Accepts both delta-seconds and HTTP-date forms.
         """
-        last_exception = None
+        response = getattr(exc, "response", None)
+        if response is None or response.status_code not in (429, 503):
+            return None
 
-        for attempt in range(self.max_retries + 1):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            seconds = float(value)
+        else:
             try:
-                response = func(*args, **kwargs)
+                when = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            seconds = (when - datetime.now(timezone.utc)).total_seconds()
 
-                if response.status_code in self.retry_statuses:
-                    raise requests.HTTPError(
-                        f"Retryable status code: {response.status_code}"
-                    )
+        return min(max(seconds, 0.0), self.max_retry_after)
 
-                return response
+    def delay_for(self, attempt: int, exc: Exception) -> float:
+        retry_after = self._retry_after(exc)
+        if retry_after is not None:
+            return retry_after
+        return self._backoff(attempt)
 
-            except Exception as e:
-                last_exception = e
+    def is_failure(self, response: requests.Response) -> bool:
+        """Status codes that count against a domain's breaker."""
+        return response.status_code in self.retry_statuses or response.status_code == 403
+
+    def attempt(
+        self,
+        func: Callable,
+        *args,
+        attempt: int = 0,
+        domain: Optional[str] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        A single attempt, never sleeps.
+        Returns the response, or raises with `attempts` set and
+        `retryable` telling the caller whether another try makes sense
+        (it picks the delay via delay_for and schedules the retry).
+        """
+        if self.circuit_breaker and domain:
+            if not self.circuit_breaker.allow(domain):
+                error = CircuitOpenError(domain)
+                error.attempts = max(attempt, 1)
+                error.retryable = False
+                raise error
 
-                if attempt >= self.max_retries:
-                    break
+        try:
+            response = func(*args, **kwargs)
 
-                sleep_time = self._backoff(attempt)
-                time.sleep(sleep_time)
+        except Exception as e:
+            if self.circuit_breaker and domain:
+                self.circuit_breaker.record(domain, False)
+            e.attempts = attempt + 1
+            e.retryable = True
+            raise
 
-        raise last_exception
+        if self.circuit_breaker and domain:
+            self.circuit_breaker.record(domain, not self.is_failure(response))
+
+        if response.status_code not in self.retry_statuses:
+            response.attempts = attempt + 1
+            return response
+
+        # body is not needed; give the connection back before waiting
+        response.close()
+        error = requests.HTTPError(
+            f"Retryable status code: {response.status_code}",
+            response=response,
+        )
+        error.attempts = attempt + 1
+        error.retryable = True
+        raise error
+
+    def run(self, func: Callable, *args, domain: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Executes a function with retry logic, sleeping between attempts.
+        func should return requests.Response
+        domain enables circuit breaking for that domain.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.attempt(func, *args, attempt=attempt, domain=domain, **kwargs)
+            except Exception as e:
+                if not getattr(e, "retryable", False) or attempt >= self.max_retries:
+                    raise
+                time.sleep(self.delay_for(attempt, e))
@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.fetch.concurrency_controller import AIMDController
+from src.fetch.block_detector import BlockDetector
+
+
+class DomainScheduler:
+    """
+    Per-domain politeness scheduler.
+    Handles:
+    - one FIFO queue per domain
+    - minimum interval between requests to the same domain
+    - round-robin dispatch across domains
+    - per-domain in-flight cap (fixed, or adaptive via AIMDController)
+    - deferred retries: a heap ordered by due time, released back into
+      the domain queues when due, so backoff never blocks other work
+    - domain cool-off after a block page (via BlockDetector)
+    - queue depth / wait time stats
+    """
+
+    def __init__(
+        self,
+        default_rate: float = 2.0,
+        domain_rates: Optional[Dict[str, float]] = None,
+        max_in_flight: int = 1,
+        controller: Optional[AIMDController] = None,
+        block_detector: Optional[BlockDetector] = None,
+    ):
+        """
+        Rates are requests/sec per domain; 0 disables the interval.
+        A controller replaces the fixed max_in_flight per domain.
+        """
+        self.default_rate = default_rate
+        self.domain_rates = {k.lower(): v for k, v in (domain_rates or {}).items()}
+        self.max_in_flight = max(1, max_in_flight)
+        self.controller = controller
+        self.block_detector = block_detector
+
+        self.queues: Dict[str, Deque[Tuple[Any, float]]] = {}
+        self.rotation: Deque[str] = deque()
+        self.next_allowed: Dict[str, float] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.domain_stats: Dict[str, Dict] = {}
+        self.deferred: List[Tuple[float, int, str, Any]] = []
+        self.deferred_seq = itertools.count()
+
+    # -----------------------------
+    # Configuration
+    # -----------------------------
+    def in_flight_cap(self, domain: str) -> int:
+        if self.controller:
+            return self.controller.limit(domain)
+        return self.max_in_flight
+
+    def interval(self, domain: str) -> float:
+        rate = self.domain_rates.get(domain.lower(), self.default_rate)
+        if not rate or rate <= 0:
+            return 0.0
+        return 1.0 / rate
+
+    # -----------------------------
+    # Queue API
+    # -----------------------------
+    def add(self, domain: str, item: Any):
+        if domain not in self.queues:
+            self.queues[domain] = deque()
+            self.next_allowed.setdefault(domain, 0.0)
+            self.in_flight.setdefault(domain, 0)
+            self.domain_stats.setdefault(domain, {
+                "dispatched": 0,
+                "queue_depth": 0,
+                "max_queue_depth": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+                "deferred": 0,
+            })
+
+        queue = self.queues[domain]
+        if not queue:
+            self.rotation.append(domain)
+        queue.append((item, time.monotonic()))
+
+        stats = self.domain_stats[domain]
+        stats["queue_depth"] = len(queue)
+        stats["max_queue_depth"] = max(stats["max_queue_depth"], len(queue))
+
+    def defer(self, domain: str, item: Any, delay: float):
+        """Re-queue `item` for `domain` once `delay` seconds have passed."""
+        due = time.monotonic() + max(0.0, delay)
+        heapq.heappush(self.deferred, (due, next(self.deferred_seq), domain, item))
+        if domain in self.domain_stats:
+            self.domain_stats[domain]["deferred"] += 1
+
+    def _release_due(self, now: float):
+        while self.deferred and self.deferred[0][0] <= now:
+            _, _, domain, item = heapq.heappop(self.deferred)
+            self.add(domain, item)
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self.queues.values()) + len(self.deferred)
+
+    def next(self) -> Tuple[Optional[Tuple[str, Any]], Optional[float]]:
+        """
+        Returns ((domain, item), 0) for the next dispatchable request,
+        or (None, seconds_to_wait) when every queued domain is still
+        inside its interval or only deferred retries remain.
+        seconds_to_wait is None when all queued domains are blocked by
+        their in-flight cap only.
+        """
+        now = time.monotonic()
+        self._release_due(now)
+        soonest = None
+        if self.deferred:
+            soonest = self.deferred[0][0] - now
+
+        for _ in range(len(self.rotation)):
+            domain = self.rotation[0]
+            self.rotation.rotate(-1)
+
+            if self.in_flight[domain] >= self.in_flight_cap(domain):
+                continue
+
+            ready_at = self.next_allowed[domain]
+            if self.block_detector:
+                ready_at = max(ready_at, now + self.block_detector.cooloff_remaining(domain))
+            if ready_at > now:
+                wait = ready_at - now
+                soonest = wait if soonest is None else min(soonest, wait)
+                continue
+
+            return (domain, self._dispatch(domain, now)), 0.0
+
+        return None, soonest
+
+    def done(self, domain: str):
+        """Marks a dispatched request for `domain` as finished."""
+        self.in_flight[domain] = max(0, self.in_flight[domain] - 1)
+
+    def _dispatch(self, domain: str, now: float) -> Any:
+        queue = self.queues[domain]
+        item, enqueued_at = queue.popleft()
+
+        if not queue:
+            self.rotation.remove(domain)
+
+        self.next_allowed[domain] = now + self.interval(domain)
+        self.in_flight[domain] += 1
+
+        waited = now - enqueued_at
+        stats = self.domain_stats[domain]
+        stats["dispatched"] += 1
+        stats["queue_depth"] = len(queue)
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+
+        return item
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict]:
+        report = {}
+        for domain, s in self.domain_stats.items():
+            dispatched = s["dispatched"]
+            report[domain] = {
+                "rate_per_sec": self.domain_rates.get(domain.lower(), self.default_rate),
+                "dispatched": dispatched,
+                "queue_depth": s["queue_depth"],
+                "max_queue_depth": s["max_queue_depth"],
+                "avg_wait_sec": round(s["total_wait"] / dispatched, 3) if dispatched else 0.0,
+                "max_wait_sec": round(s["max_wait"], 3),
+                "deferred_retries": s["deferred"],
+            }
+        return report
@@ -1,25 +1,64 @@
+import time
+import threading
+from collections import OrderedDict
 import requests
-from typing import Dict
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Tuple
+
+from src.fetch.session_store import SessionStore
 
 
 class SessionManager:
     """
     Manages HTTP sessions:
     - session pooling
-    - cookie persistence
-    - connection reuse
+    - cookie persistence (across runs with a SessionStore)
+    - connection reuse (tunable adapter pool sizes)
     - domain-level isolation
+    - LRU cap + idle-timeout eviction of sessions
+    - pool statistics (new connections, reuse rate, evictions)
     """
 
-    def __init__(self):
-        self.sessions: Dict[str, requests.Session] = {}
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        max_sessions: int = 256,
+        idle_timeout: float = 300.0,
+        store: Optional[SessionStore] = None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.store = store
+
+        self.lock = threading.Lock()
+        self.sessions: "OrderedDict[str, requests.Session]" = OrderedDict()
+        self.last_used: Dict[str, float] = {}
+
+        # counters harvested from sessions that were already closed
+        self.closed_connections = 0
+        self.closed_requests = 0
+        self.sessions_created = 0
+        self.lru_evictions = 0
+        self.idle_evictions = 0
 
     def get_session(self, domain: str) -> requests.Session:
         """
         Returns a pooled session per domain.
         Creates one if not exists.
         """
-        if domain not in self.sessions:
+        now = time.monotonic()
+
+        with self.lock:
+            self._evict_idle(now)
+
+            if domain in self.sessions:
+                self.sessions.move_to_end(domain)
+                self.last_used[domain] = now
+                return self.sessions[domain]
+
             session = requests.Session()
 
             # Default session headers (can be overridden per request)
@@ -29,12 +68,92 @@ class SessionManager:
                 "Connection": "keep-alive",
             })
 
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.pool_maxsize,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            if self.store:
+                self.store.load_cookies(domain, session.cookies)
+
             self.sessions[domain] = session
+            self.last_used[domain] = now
+            self.sessions_created += 1
+
+            while len(self.sessions) > self.max_sessions:
+                oldest = next(iter(self.sessions))
+                self._close(oldest)
+                self.lru_evictions += 1
+
+            return session
+
+    # -----------------------------
+    # Eviction
+    # -----------------------------
+    def _evict_idle(self, now: float):
+        if not self.idle_timeout:
+            return
+        # OrderedDict is in LRU order, so stop at the first fresh session
+        for domain in list(self.sessions):
+            if now - self.last_used[domain] < self.idle_timeout:
+                break
+            self._close(domain)
+            self.idle_evictions += 1
+
+    def _close(self, domain: str):
+        session = self.sessions.pop(domain)
+        self.last_used.pop(domain, None)
+        connections, requests_sent = self._pool_counts(session)
+        self.closed_connections += connections
+        self.closed_requests += requests_sent
+        if self.store:
+            self.store.save_cookies(domain, session.cookies)
+        session.close()
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def _pool_counts(self, session: requests.Session) -> Tuple[int, int]:
+        """
+        (new connections opened, requests sent) across the session's pools.
+        """
+        connections = 0
+        requests_sent = 0
+        adapters = {id(a): a for a in session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections += getattr(pool, "num_connections", 0)
+                requests_sent += getattr(pool, "num_requests", 0)
+        return connections, requests_sent
+
+    def stats(self) -> Dict:
+        with self.lock:
+            connections = self.closed_connections
+            requests_sent = self.closed_requests
+            for session in self.sessions.values():
+                c, r = self._pool_counts(session)
+                connections += c
+                requests_sent += r
 
-        return self.sessions[domain]
+            reused = max(0, requests_sent - connections)
+            return {
+                "live_sessions": len(self.sessions),
+                "sessions_created": self.sessions_created,
+                "lru_evictions": self.lru_evictions,
+                "idle_evictions": self.idle_evictions,
+                "requests": requests_sent,
+                "new_connections": connections,
+                "reuse_rate": round(reused / requests_sent, 3) if requests_sent else 0.0,
+            }
 
     def close_all(self):
         """Gracefully close all sessions"""
-        for session in self.sessions.values():
-            session.close()
-        self.sessions.clear()
+        with self.lock:
+            for domain in list(self.sessions):
+                self._close(domain)
@@ -0,0 +1,244 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.cookies import RequestsCookieJar, create_cookie
+
+
+MAX_REDIRECT_HOPS = 5
+
+# redirect rule kinds
+ORIGIN_RULE = "origin"
+URL_RULE = "url"
+
+
+class SessionStore:
+    """
+    Persistent per-domain session state (SQLite).
+    Handles:
+    - cookie jars saved when a domain's session closes, reloaded when
+      the next run creates it (consent / locale / bot-check cookies)
+    - expiry: expired cookies are dropped on load; session cookies
+      (no Expires) are kept for session_cookie_ttl after the save
+    - resolved redirects, kept for redirect_ttl: host / scheme only
+      redirects (flipkart.com → www.flipkart.com) as origin rules,
+      anything else (locale / consent hops) per URL
+    - per-domain counters: cookies loaded / saved, redirect hops taken
+      and hops avoided by stored redirects
+    """
+
+    def __init__(
+        self,
+        path: str = "output/session_state.sqlite",
+        session_cookie_ttl: float = 12 * 3600,
+        redirect_ttl: float = 24 * 3600,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.session_cookie_ttl = session_cookie_ttl
+        self.redirect_ttl = redirect_ttl
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cookies ("
+            " domain TEXT,"
+            " name TEXT,"
+            " cookie_domain TEXT,"
+            " path TEXT,"
+            " value TEXT,"
+            " secure INTEGER,"
+            " expires REAL,"
+            " rest TEXT,"
+            " saved_at REAL,"
+            " PRIMARY KEY (domain, cookie_domain, path, name))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS redirects ("
+            " domain TEXT,"
+            " source TEXT,"
+            " target TEXT,"
+            " kind TEXT,"
+            " hops INTEGER,"
+            " expires_at REAL,"
+            " PRIMARY KEY (domain, source))"
+        )
+        now = time.time()
+        self.conn.execute("DELETE FROM redirects WHERE expires_at < ?", (now,))
+        self.conn.execute("DELETE FROM cookies WHERE expires IS NOT NULL AND expires < ?", (now,))
+        self.conn.commit()
+
+        self.domain_stats: Dict[str, Dict[str, int]] = {}
+
+    def _stats(self, domain: str) -> Dict[str, int]:
+        if domain not in self.domain_stats:
+            self.domain_stats[domain] = {
+                "cookies_loaded": 0,
+                "cookies_saved": 0,
+                "redirect_hops": 0,
+                "redirects_resolved": 0,
+                "hops_avoided": 0,
+            }
+        return self.domain_stats[domain]
+
+    # -----------------------------
+    # Cookies
+    # -----------------------------
+    def load_cookies(self, domain: str, jar: RequestsCookieJar) -> int:
+        """Fill `jar` with the domain's unexpired cookies from earlier runs."""
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT name, cookie_domain, path, value, secure, expires, rest, saved_at"
+                " FROM cookies WHERE domain = ?",
+                (domain,)
+            ).fetchall()
+
+            loaded = 0
+            for name, cookie_domain, path, value, secure, expires, rest, saved_at in rows:
+                if expires is not None and expires <= now:
+                    continue
+                if expires is None and now - saved_at > self.session_cookie_ttl:
+                    continue
+                jar.set_cookie(create_cookie(
+                    name,
+                    value,
+                    domain=cookie_domain,
+                    path=path,
+                    secure=bool(secure),
+                    expires=int(expires) if expires is not None else None,
+                    rest=json.loads(rest or "{}"),
+                ))
+                loaded += 1
+
+            self._stats(domain)["cookies_loaded"] += loaded
+        return loaded
+
+    def save_cookies(self, domain: str, jar: RequestsCookieJar):
+        """Replace the domain's stored cookies with the live jar."""
+        now = time.time()
+        rows = []
+        for cookie in jar:
+            if cookie.is_expired(now):
+                continue
+            rows.append((
+                domain,
+                cookie.name,
+                cookie.domain,
+                cookie.path,
+                cookie.value,
+                int(cookie.secure),
+                cookie.expires,
+                json.dumps(getattr(cookie, "_rest", {})),
+                now,
+            ))
+
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM cookies WHERE domain = ?", (domain,))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO cookies"
+                    " (domain, name, cookie_domain, path, value, secure, expires, rest, saved_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self._stats(domain)["cookies_saved"] += len(rows)
+
+    # -----------------------------
+    # Redirects
+    # -----------------------------
+    def _origin(self, url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def resolve(self, domain: str, url: str) -> str:
+        """
+        Rewrite `url` past redirects resolved in earlier runs, so the
+        hops are not taken again.
+        """
+        now = time.time()
+        resolved = url
+        avoided = 0
+
+        with self.lock:
+            for _ in range(MAX_REDIRECT_HOPS):
+                row = self.conn.execute(
+                    "SELECT target, kind, hops FROM redirects"
+                    " WHERE domain = ? AND source IN (?, ?) AND expires_at > ?"
+                    " ORDER BY length(source) DESC LIMIT 1",
+                    (domain, resolved, self._origin(resolved), now)
+                ).fetchone()
+                if not row:
+                    break
+
+                target, kind, hops = row
+                if kind == ORIGIN_RULE:
+                    # keep path / query, swap scheme + host
+                    rule = urlparse(target)
+                    target = urlunparse(urlparse(resolved)._replace(scheme=rule.scheme, netloc=rule.netloc))
+                if target == resolved:
+                    break
+                resolved = target
+                avoided += hops
+
+            if resolved != url:
+                stats = self._stats(domain)
+                stats["redirects_resolved"] += 1
+                stats["hops_avoided"] += avoided
+
+        return resolved
+
+    def record(self, domain: str, url: str, response: requests.Response):
+        """
+        Remember the redirect chain `url` went through, if the final
+        page loaded. Bot walls and errors are not remembered.
+        """
+        hops = len(response.history)
+        if not hops:
+            return
+
+        with self.lock:
+            self._stats(domain)["redirect_hops"] += hops
+
+            final = response.url
+            if response.status_code != 200 or not final or final == url:
+                return
+
+            source, target, kind = url, final, URL_RULE
+            start, end = urlparse(url), urlparse(final)
+            if (start.path, start.query) == (end.path, end.query):
+                source, target, kind = self._origin(url), self._origin(final), ORIGIN_RULE
+                # same-origin hops in between (consent round trips) are the cookie's job
+                chain = [hop.url for hop in response.history] + [final]
+                hops = sum(1 for a, b in zip(chain, chain[1:]) if self._origin(a) != self._origin(b)) or 1
+
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO redirects (domain, source, target, kind, hops, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (domain, source, target, kind, hops, time.time() + self.redirect_ttl)
+                )
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        with self.lock:
+            stored_cookies = self.conn.execute("SELECT COUNT(*) FROM cookies").fetchone()[0]
+            stored_redirects = self.conn.execute("SELECT COUNT(*) FROM redirects").fetchone()[0]
+            return {
+                "path": str(self.path),
+                "stored_cookies": stored_cookies,
+                "stored_redirects": stored_redirects,
+                "domains": {domain: dict(s) for domain, s in self.domain_stats.items()},
+            }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
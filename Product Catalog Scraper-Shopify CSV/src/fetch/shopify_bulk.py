@@ -0,0 +1,221 @@
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+from src.fetch.fetcher import Fetcher, FetchRequest
+from src.parse.parser_router import is_shopify_html
+from src.parse.shopify_json_parser import ShopifyJSONParser
+
+logger = logging.getLogger(__name__)
+
+HANDLE_PATTERN = re.compile(r"/products/([^/?#.]+)")
+JSON_CONTENT_TYPES = ("application/json", "text/javascript")
+JSON_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ShopifyBulkFetcher:
+    """
+    Shopify storefront JSON mode:
+    - detects Shopify stores from one probe page (same markers as ParserRouter)
+    - pulls /products.json?limit=250&page=N for large handle sets
+    - falls back to /products/<handle>.json per handle
+    - maps JSON straight to parsed-product dicts (all variants)
+    - every request is a FetchRequest on the fetcher's scheduler
+      (rate limits, deferred retries), never a blocking call
+    - route() can run once per batch of a streamed input: each store is
+      probed until a page answers, a running catalog pull picks up
+      handles from later batches
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        page_size: int = 250,
+        catalog_threshold: int = 50,
+        max_catalog_pages: int = 400,
+    ):
+        self.fetcher = fetcher
+        self.page_size = page_size
+        self.catalog_threshold = catalog_threshold
+        self.max_catalog_pages = max_catalog_pages
+        self.stats = {
+            "stores_detected": 0,
+            "json_requests": 0,
+            "products": 0,
+            "html_fetches_avoided": 0,
+        }
+        # parsed products from JSON, and HTML pages the probes fetched
+        self.products: List[Dict] = []
+        self.pages: List[Dict] = []
+        # store → is Shopify (cached once a probe page answered)
+        self.store_kinds: Dict[str, bool] = {}
+        # store → URLs waiting on its probe
+        self.probing: Dict[str, List[str]] = {}
+        # store → handle → source URL still wanted from its catalog pull
+        self.pulls: Dict[str, "OrderedDict[str, str]"] = {}
+        # route() runs on the feed (producer thread), callbacks on the fetch loop
+        self.lock = threading.Lock()
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def _store(self, url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _handle(self, url: str) -> Optional[str]:
+        match = HANDLE_PATTERN.search(urlparse(url).path)
+        return match.group(1) if match else None
+
+    def _json_request(self, url: str, on_done) -> FetchRequest:
+        return FetchRequest(
+            url,
+            on_done,
+            allowed_types=JSON_CONTENT_TYPES,
+            max_bytes=JSON_MAX_BYTES,
+        )
+
+    def _json(self, page: Dict) -> Optional[Dict]:
+        self.stats["json_requests"] += 1
+        if page["status"] in ("error", "blocked"):
+            logger.warning(f"Shopify JSON request failed: {page['url']} | {page['error']}")
+        if page["status"] != 200 or not page.get("content"):
+            return None
+        try:
+            data = json.loads(page["content"])
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _emit(self, product: Dict, source_url: str):
+        self.products.append(ShopifyJSONParser(product, source_url).parse())
+        self.stats["products"] += 1
+        self.stats["html_fetches_avoided"] += 1
+
+    # -----------------------------
+    # Endpoints
+    # -----------------------------
+    def _fetch_handles(self, store: str, handles: Dict[str, str]) -> List[FetchRequest]:
+        return [
+            self._json_request(
+                f"{store}/products/{handle}.json",
+                partial(self._handle_done, source_url),
+            )
+            for handle, source_url in handles.items()
+        ]
+
+    def _handle_done(self, source_url: str, page: Dict) -> List[str]:
+        with self.lock:
+            data = self._json(page)
+            if data and isinstance(data.get("product"), dict):
+                self._emit(data["product"], source_url)
+                return []
+            return [source_url]
+
+    def _catalog_page(self, store: str, page_num: int) -> FetchRequest:
+        return self._json_request(
+            f"{store}/products.json?limit={self.page_size}&page={page_num}",
+            partial(self._catalog_done, store, page_num),
+        )
+
+    def _catalog_done(self, store: str, page_num: int, page: Dict) -> List[FetchRequest]:
+        """
+        One /products.json page in; the next page is requested until
+        every wanted handle has been seen, then leftovers go per handle.
+        """
+        with self.lock:
+            wanted = self.pulls[store]
+            products = (self._json(page) or {}).get("products") or []
+
+            for product in products:
+                handle = product.get("handle") if isinstance(product, dict) else None
+                if handle in wanted:
+                    self._emit(product, wanted.pop(handle))
+
+            if wanted and len(products) == self.page_size and page_num < self.max_catalog_pages:
+                return [self._catalog_page(store, page_num + 1)]
+
+            del self.pulls[store]
+            return self._fetch_handles(store, wanted)
+
+    # -----------------------------
+    # Stores
+    # -----------------------------
+    def _probe_done(self, store: str, page: Dict) -> List[Union[str, FetchRequest]]:
+        with self.lock:
+            waiting = self.probing.pop(store)
+            if page["status"] != 200 or not page.get("content"):
+                # transient failure: the next batch probes again
+                self.pages.append(page)
+                return waiting
+
+            if not is_shopify_html(page["content"]):
+                self.store_kinds[store] = False
+                self.pages.append(page)
+                return waiting
+
+            self.store_kinds[store] = True
+            self.stats["stores_detected"] += 1
+            logger.info(f"Shopify store detected, using JSON endpoints: {store}")
+            if self._handle(page["url"]):
+                return self._route_store(store, [page["url"]] + waiting)
+            # the probe already is this URL's HTML page
+            self.pages.append(page)
+            return self._route_store(store, waiting)
+
+    def _route_store(self, store: str, store_urls: List[str]) -> List[Union[str, FetchRequest]]:
+        """Requests for a known Shopify store's URLs."""
+        handles: "OrderedDict[str, str]" = OrderedDict()
+        items: List[Union[str, FetchRequest]] = []
+        for url in store_urls:
+            handle = self._handle(url)
+            if handle:
+                handles.setdefault(handle, url)
+            else:
+                # non-product URLs on a Shopify store still go through HTML
+                items.append(url)
+
+        if store in self.pulls:
+            for handle, url in handles.items():
+                self.pulls[store].setdefault(handle, url)
+        elif len(handles) > self.catalog_threshold:
+            self.pulls[store] = handles
+            items.append(self._catalog_page(store, 1))
+        else:
+            items.extend(self._fetch_handles(store, handles))
+        return items
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def route(self, urls: List[str]) -> List[Union[str, FetchRequest]]:
+        """
+        Returns what to feed the fetcher for urls: plain URLs to fetch
+        as HTML, and FetchRequests for probes and JSON endpoints.
+        Parsed products collect in self.products, probe pages that
+        stand as HTML results in self.pages, as their requests finish.
+        """
+        by_store: "OrderedDict[str, List[str]]" = OrderedDict()
+        for url in urls:
+            by_store.setdefault(self._store(url), []).append(url)
+
+        items: List[Union[str, FetchRequest]] = []
+        with self.lock:
+            for store, store_urls in by_store.items():
+                kind = self.store_kinds.get(store)
+                if kind is False or not any(self._handle(url) for url in store_urls):
+                    items.extend(store_urls)
+                elif kind:
+                    items.extend(self._route_store(store, store_urls))
+                elif store in self.probing:
+                    self.probing[store].extend(store_urls)
+                else:
+                    self.probing[store] = store_urls[1:]
+                    # journaled like an HTML page: it is one for other stores
+                    items.append(FetchRequest(store_urls[0], partial(self._probe_done, store), record=True))
+        return items
@@ -0,0 +1,307 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import requests
+
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    """
+    Shared URL work queue (SQLite file, WAL) with lease semantics.
+    Handles:
+    - idempotent enqueue (one row per URL)
+    - atomic batch claims across processes on one host (BEGIN IMMEDIATE);
+      WAL needs shared memory, so the file must not sit on a network
+      filesystem: other machines go through WorkQueueServer instead
+    - leases with heartbeat extension; expired leases are re-queued, or
+      marked failed once out of attempts (a URL that kills its worker)
+    - ack / return (nack) guarded by the lease owner; a returned URL
+      can be held back for a delay (queued row's lease_expires is then
+      the time it becomes claimable again)
+    - per-worker throughput + queue depth stats
+    """
+
+    def __init__(
+        self,
+        path: str = "output/work_queue.sqlite",
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+
+        # autocommit mode; claims open their own IMMEDIATE transaction
+        self.conn = sqlite3.connect(
+            str(self.path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id INTEGER PRIMARY KEY,"
+            " url TEXT UNIQUE,"
+            " state TEXT,"
+            " worker TEXT,"
+            " lease_expires REAL,"
+            " attempts INTEGER DEFAULT 0)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks(state, lease_expires)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            " worker TEXT PRIMARY KEY,"
+            " started REAL,"
+            " last_seen REAL,"
+            " claimed INTEGER DEFAULT 0,"
+            " done INTEGER DEFAULT 0,"
+            " returned INTEGER DEFAULT 0)"
+        )
+
+    # -----------------------------
+    # Producer
+    # -----------------------------
+    def enqueue(self, urls: Iterable[str]) -> int:
+        rows = [(url, QUEUED) for url in urls]
+        with self._write():
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO tasks (url, state) VALUES (?, ?)", rows)
+            return self.conn.total_changes - before
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def _touch(self, worker: str, now: float, **counts):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO workers (worker, started, last_seen) VALUES (?, ?, ?)",
+            (worker, now, now),
+        )
+        sets = ", ".join(f"{name} = {name} + ?" for name in counts)
+        self.conn.execute(
+            f"UPDATE workers SET last_seen = ?{', ' + sets if sets else ''} WHERE worker = ?",
+            (now, *counts.values(), worker),
+        )
+
+    @contextmanager
+    def _write(self):
+        """One IMMEDIATE write transaction, rolled back on error."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _requeue_expired(self, now: float):
+        self.conn.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+            " worker = NULL, lease_expires = NULL"
+            " WHERE state = ? AND lease_expires < ?",
+            (self.max_attempts, FAILED, QUEUED, LEASED, now),
+        )
+
+    def claim(self, worker: str, batch_size: int = 50) -> List[Tuple[int, str]]:
+        """Lease up to batch_size queued URLs to `worker`."""
+        now = time.time()
+        with self._write():
+            self._requeue_expired(now)
+            rows = self.conn.execute(
+                "SELECT id, url FROM tasks WHERE state = ?"
+                " AND (lease_expires IS NULL OR lease_expires <= ?) ORDER BY id LIMIT ?",
+                (QUEUED, now, batch_size),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE tasks SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                [(LEASED, worker, now + self.lease_seconds, task_id) for task_id, _ in rows],
+            )
+            self._touch(worker, now, claimed=len(rows))
+        return [(task_id, url) for task_id, url in rows]
+
+    def heartbeat(self, worker: str, task_ids: List[int]) -> int:
+        """Extend the worker's leases; returns how many are still held."""
+        now = time.time()
+        with self._write():
+            held = self.conn.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND state = ?",
+                [(now + self.lease_seconds, task_id, worker, LEASED) for task_id in task_ids],
+            ).rowcount
+            self._touch(worker, now)
+        return held
+
+    def ack(self, worker: str, task_ids: List[int]) -> int:
+        now = time.time()
+        with self._write():
+            acked = self.conn.executemany(
+                "UPDATE tasks SET state = ?, lease_expires = NULL WHERE id = ? AND worker = ? AND state = ?",
+                [(DONE, task_id, worker, LEASED) for task_id in task_ids],
+            ).rowcount
+            self._touch(worker, now, done=acked)
+        return acked
+
+    def nack(self, worker: str, task_ids: List[int], delay: float = 0.0) -> int:
+        """
+        Return URLs to the queue; ones out of attempts are marked failed.
+        delay: seconds before the URLs can be claimed again.
+        """
+        now = time.time()
+        not_before = now + delay if delay > 0 else None
+        with self._write():
+            returned = self.conn.executemany(
+                "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+                " worker = NULL, lease_expires = ?"
+                " WHERE id = ? AND worker = ? AND state = ?",
+                [
+                    (self.max_attempts, FAILED, QUEUED, not_before, task_id, worker, LEASED)
+                    for task_id in task_ids
+                ],
+            ).rowcount
+            self._touch(worker, now, returned=returned)
+        return returned
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict:
+        now = time.time()
+        with self.lock:
+            depth = dict.fromkeys((QUEUED, LEASED, DONE, FAILED), 0)
+            for state, count in self.conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state"):
+                depth[state] = count
+            expired = self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE state = ? AND lease_expires < ?",
+                (LEASED, now),
+            ).fetchone()[0]
+            workers = {}
+            for worker, started, last_seen, claimed, done, returned in self.conn.execute(
+                "SELECT worker, started, last_seen, claimed, done, returned FROM workers ORDER BY worker"
+            ):
+                elapsed = max(last_seen - started, 1e-6)
+                workers[worker] = {
+                    "claimed": claimed,
+                    "done": done,
+                    "returned": returned,
+                    "urls_per_sec": round(done / elapsed, 2) if done else 0.0,
+                    "last_seen_sec_ago": round(now - last_seen, 1),
+                }
+        return {
+            "depth": depth,
+            "expired_leases": expired,
+            "remaining": depth[QUEUED] + depth[LEASED],
+            "workers": workers,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Local stand-in queue server (testing / single-host multi-process)
+# ---------------------------------------------------------------------------
+
+QUEUE_METHODS = ("enqueue", "claim", "heartbeat", "ack", "nack", "stats")
+
+
+class WorkQueueServer:
+    """
+    Serves a WorkQueue over HTTP: POST /<method> with JSON kwargs,
+    JSON result back. Stands in for a real queue service in tests.
+    """
+
+    def __init__(self, queue: WorkQueue, host: str = "127.0.0.1", port: int = 8765):
+        self.queue = queue
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(handler):
+                method = handler.path.strip("/")
+                if method not in QUEUE_METHODS:
+                    handler.send_error(404)
+                    return
+                length = int(handler.headers.get("Content-Length") or 0)
+                kwargs = json.loads(handler.rfile.read(length) or b"{}")
+                result = json.dumps(getattr(queue, method)(**kwargs)).encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "application/json")
+                handler.send_header("Content-Length", str(len(result)))
+                handler.end_headers()
+                handler.wfile.write(result)
+
+            def log_message(handler, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self) -> "WorkQueueServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RemoteWorkQueue:
+    """WorkQueue client for a WorkQueueServer (same method signatures)."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _call(self, method: str, **kwargs):
+        response = self.session.post(f"{self.url}/{method}", json=kwargs, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        return self._call("enqueue", urls=list(urls))
+
+    def claim(self, worker: str, batch_size: int = 50) -> List[Tuple[int, str]]:
+        return [tuple(row) for row in self._call("claim", worker=worker, batch_size=batch_size)]
+
+    def heartbeat(self, worker: str, task_ids: List[int]) -> int:
+        return self._call("heartbeat", worker=worker, task_ids=task_ids)
+
+    def ack(self, worker: str, task_ids: List[int]) -> int:
+        return self._call("ack", worker=worker, task_ids=task_ids)
+
+    def nack(self, worker: str, task_ids: List[int], delay: float = 0.0) -> int:
+        return self._call("nack", worker=worker, task_ids=task_ids, delay=delay)
+
+    def stats(self) -> Dict:
+        return self._call("stats")
+
+    def close(self):
+        self.session.close()
+
+
+def open_queue(target: str, **kwargs):
+    """SQLite path → WorkQueue, http(s):// URL → RemoteWorkQueue."""
+    if target.startswith(("http://", "https://")):
+        return RemoteWorkQueue(target)
+    return WorkQueue(target, **kwargs)
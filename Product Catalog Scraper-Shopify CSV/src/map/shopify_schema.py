@@ -13,6 +13,10 @@ SHOPIFY_COLUMNS = [
 
     "Option1 Name",
     "Option1 Value",
+    "Option2 Name",
+    "Option2 Value",
+    "Option3 Name",
+    "Option3 Value",
 
     "Variant SKU",
     "Variant Price",
@@ -6,7 +6,7 @@ class VariantBuilder:
     Builds Shopify variant rows.
     Supports:
     - single-variant products
-    - future multi-variant expansion
+    - multi-variant products (product["variants"], up to 3 options)
     """
 
     @staticmethod
@@ -15,6 +15,9 @@ class VariantBuilder:
         Returns list of variant dicts (Shopify row format partial)
         """
 
+        if product.get("variants"):
+            return VariantBuilder._build_variants(product)
+
         price = product.get("price")
         sku = product.get("sku")
 
@@ -34,3 +37,36 @@ class VariantBuilder:
         }
 
         return [variant]
+
+    @staticmethod
+    def _build_variants(product: Dict) -> List[Dict]:
+        """
+        One row per source variant, options mapped to Option1-3.
+        """
+        rows = []
+
+        for variant in product["variants"]:
+            options = list((variant.get("options") or {}).items())[:3]
+            if not options:
+                options = [("Title", "Default Title")]
+
+            row = {
+                "Variant SKU": variant.get("sku") or product.get("sku"),
+                "Variant Price": variant.get("price") if variant.get("price") is not None else product.get("price"),
+                "Variant Inventory Qty": 999,   # default stock buffer
+                "Variant Inventory Policy": "continue",
+                "Variant Fulfillment Service": "manual",
+                "Variant Requires Shipping": True,
+                "Variant Taxable": True,
+                "Variant Barcode": variant.get("barcode") or "",
+                "Variant Weight": "",
+                "Variant Weight Unit": "kg"
+            }
+
+            for position, (name, value) in enumerate(options, start=1):
+                row[f"Option{position} Name"] = name
+                row[f"Option{position} Value"] = value
+
+            rows.append(row)
+
+        return rows
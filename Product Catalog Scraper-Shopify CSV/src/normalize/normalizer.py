@@ -41,6 +41,14 @@ class Normalizer:
         for item in product:
             item["sku"] = SKUNormalizer.normalize(item.get("sku"))
 
+        # -----------------------------
+        # Variants (JSON-sourced products)
+        # -----------------------------
+        for item in product:
+            for variant in item.get("variants", []):
+                variant["price"] = PriceNormalizer.normalize_price(variant.get("price"))
+                variant["sku"] = SKUNormalizer.normalize(variant.get("sku"))
+
         # -----------------------------
         # Category Standardization
         # -----------------------------
@@ -73,9 +73,9 @@ class AmazonParser(BaseParser):
 
         # Currency
         if not data["currency"]:
-            if "₹" in self.html:
+            if self._contains("₹"):
                 data["currency"] = "INR"
-            elif "$" in self.html:
+            elif self._contains("$"):
                 data["currency"] = "USD"
 
         # Images
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from bs4 import BeautifulSoup
 import json
 import re
@@ -15,10 +15,19 @@ class BaseParser(ABC):
     - schema utilities
     """
 
-    def __init__(self, html: str, url: str):
+    def __init__(self, html: Union[str, bytes], url: str, encoding: Optional[str] = None):
+        """
+        html: decoded text, or the raw body bytes with their sniffed
+        encoding (parsed as-is, no intermediate str).
+        """
         self.html = html
         self.url = url
-        self.soup = BeautifulSoup(html, "lxml")
+        self.encoding = encoding
+        self.soup = BeautifulSoup(
+            html,
+            "lxml",
+            from_encoding=encoding if isinstance(html, bytes) else None,
+        )
 
     # -----------------------------
     # Abstract contract
@@ -31,6 +40,15 @@ class BaseParser(ABC):
     # Helpers
     # -----------------------------
 
+    def _contains(self, text: str) -> bool:
+        """Substring test on the raw page, str or bytes."""
+        if isinstance(self.html, str):
+            return text in self.html
+        try:
+            return text.encode(self.encoding or "utf-8") in self.html
+        except UnicodeEncodeError:
+            return False
+
     def _clean_text(self, text: Optional[str]) -> Optional[str]:
         if not text:
             return None
@@ -86,11 +86,11 @@ class GenericParser(BaseParser):
         # Currency detection
         # -----------------------------
         if not data["currency"]:
-            if "₹" in self.html:
+            if self._contains("₹"):
                 data["currency"] = "INR"
-            elif "$" in self.html:
+            elif self._contains("$"):
                 data["currency"] = "USD"
-            elif "€" in self.html:
+            elif self._contains("€"):
                 data["currency"] = "EUR"
 
         return data
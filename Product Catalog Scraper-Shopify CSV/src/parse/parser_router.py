@@ -1,3 +1,4 @@
+from typing import Optional, Union
 from urllib.parse import urlparse
 
 from .amazon_parser import AmazonParser
@@ -5,6 +6,31 @@ from .shopify_parser import ShopifyParser
 from .generic_parser import GenericParser
 
 
+SHOPIFY_INDICATORS = [
+    "cdn.shopify.com",
+    "Shopify.theme",
+    "Shopify.shop",
+    "ShopifyAnalytics",
+    "id=\"ProductJson\"",
+    "var meta = Shopify"
+]
+
+
+SHOPIFY_INDICATORS_BYTES = [indicator.encode("ascii") for indicator in SHOPIFY_INDICATORS]
+
+
+def is_shopify_html(html: Union[str, bytes]) -> bool:
+    """
+    Shopify detection heuristics:
+    - Shopify CDN
+    - Shopify globals
+    - Shopify product JSON
+    Works on decoded text or raw (ASCII-compatible) bytes.
+    """
+    indicators = SHOPIFY_INDICATORS_BYTES if isinstance(html, bytes) else SHOPIFY_INDICATORS
+    return any(indicator in html for indicator in indicators)
+
+
 class ParserRouter:
     """
     Detects site type and routes HTML to correct parser.
@@ -19,51 +45,41 @@ class ParserRouter:
     def _is_amazon(self, domain: str) -> bool:
         return "amazon." in domain
 
-    def _is_shopify(self, html: str) -> bool:
-        """
-        Shopify detection heuristics:
-        - Shopify CDN
-        - Shopify globals
-        - Shopify product JSON
-        """
-        indicators = [
-            "cdn.shopify.com",
-            "Shopify.theme",
-            "Shopify.shop",
-            "ShopifyAnalytics",
-            "id=\"ProductJson\"",
-            "var meta = Shopify"
-        ]
-        return any(indicator in html for indicator in indicators)
-
-    def route(self, html: str, url: str):
+    def _is_shopify(self, html: Union[str, bytes]) -> bool:
+        return is_shopify_html(html)
+
+    def route(self, html: Union[str, bytes], url: str, encoding: Optional[str] = None):
         domain = self._get_domain(url)
 
         # Amazon
         if self._is_amazon(domain):
-            return AmazonParser(html, url)
+            return AmazonParser(html, url, encoding)
 
         # Shopify
         if self._is_shopify(html):
-            return ShopifyParser(html, url)
+            return ShopifyParser(html, url, encoding)
 
         # Fallback
-        return GenericParser(html, url)
+        return GenericParser(html, url, encoding)
 
-    def parse(self, html: str, url: str) -> dict:
+    def parse(self, html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> dict:
         """
         High-level API:
-        input: raw html + url
+        input: raw html (str, or body bytes + encoding) + url
         output: structured product dict
         """
-        parser = self.route(html, url)
+        parser = self.route(html, url, encoding)
         return parser.parse()
 
     def parse_pages(self, raw_pages: list[dict]) -> list[dict]:
         """
         Parse multiple raw pages.
+        Pages carry the raw body ("content") and its sniffed "encoding";
+        pages without a body (errors, skipped, block pages) are left out.
         """
         parsed_data = []
         for page in raw_pages:
-            parsed_data.append(self.parse(page["html"], page["url"]))
+            if not page.get("content"):
+                continue
+            parsed_data.append(self.parse(page["content"], page["url"], page.get("encoding")))
         return parsed_data
@@ -0,0 +1,87 @@
+from typing import Dict, List
+from .base_parser import BaseParser
+
+
+class ShopifyJSONParser(BaseParser):
+    """
+    Shopify storefront JSON parser
+    Maps one product object from /products.json or
+    /products/<handle>.json straight into the parsed-product shape.
+    Keeps every variant (no HTML involved).
+    """
+
+    def __init__(self, product: Dict, url: str):
+        # no HTML: skip BaseParser's BeautifulSoup setup, keep its helpers
+        self.product = product
+        self.url = url
+        self.html = ""
+        self.encoding = None
+        self.soup = None
+
+    def parse(self) -> Dict:
+        product = self.product
+
+        data = {
+            "source_url": self.url,
+            "title": self._clean_text(product.get("title")),
+            "description": product.get("body_html"),
+            "price": None,
+            "currency": None,
+            "images": [],
+            "sku": None,
+            "availability": None,
+            "category": self._clean_text(product.get("product_type")),
+            "vendor": self._clean_text(product.get("vendor")),
+            "brand": self._clean_text(product.get("vendor")),
+            "handle": product.get("handle"),
+            "variants": []
+        }
+
+        # -----------------------------
+        # Images
+        # -----------------------------
+        for image in product.get("images", []):
+            src = image.get("src") if isinstance(image, dict) else image
+            if src:
+                data["images"].append(src)
+
+        # -----------------------------
+        # Variants
+        # -----------------------------
+        option_names = self._option_names(product.get("options", []))
+
+        for variant in product.get("variants", []):
+            options = {}
+            for position, name in enumerate(option_names, start=1):
+                value = variant.get(f"option{position}")
+                if value:
+                    options[name] = value
+
+            data["variants"].append({
+                "sku": variant.get("sku"),
+                "price": self._safe_float(variant.get("price")),
+                "compare_at_price": self._safe_float(variant.get("compare_at_price")),
+                "available": variant.get("available"),
+                "barcode": variant.get("barcode"),
+                "grams": variant.get("grams"),
+                "options": options
+            })
+
+        # First variant drives the product-level fields
+        if data["variants"]:
+            first = data["variants"][0]
+            data["sku"] = first["sku"]
+            data["price"] = first["price"]
+            if first["available"] is not None:
+                data["availability"] = "InStock" if first["available"] else "OutOfStock"
+
+        return data
+
+    def _option_names(self, options: List) -> List[str]:
+        names = []
+        for option in options:
+            if isinstance(option, dict):
+                names.append(option.get("name") or f"Option{len(names) + 1}")
+            elif isinstance(option, str):
+                names.append(option)
+        return names
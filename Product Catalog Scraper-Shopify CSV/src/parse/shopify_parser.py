@@ -100,11 +100,11 @@ class ShopifyParser(BaseParser):
         # Currency fallback
         # -----------------------------
         if not data["currency"]:
-            if "₹" in self.html:
+            if self._contains("₹"):
                 data["currency"] = "INR"
-            elif "$" in self.html:
+            elif self._contains("$"):
                 data["currency"] = "USD"
-            elif "€" in self.html:
+            elif self._contains("€"):
                 data["currency"] = "EUR"
 
         return data